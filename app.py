@@ -1,99 +1,1644 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, stream_template, request, redirect, url_for, session, flash, get_flashed_messages, jsonify, Response, g, has_request_context
 import mysql.connector
 from mysql.connector import Error
-from collections import defaultdict
+from mysql.connector.errors import (ConnectionTimeoutError, DatabaseError, IntegrityError, NotSupportedError,
+                                    OperationalError, PoolError, ReadTimeoutError, WriteTimeoutError)
+from itsdangerous import BadSignature, URLSafeSerializer
+from jinja2 import FileSystemBytecodeCache
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+try:
+    import redis
+except ImportError:
+    redis = None
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import atexit
+import click
+import cProfile
+import csv
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import queue
+import random
+import re
+import socket
+import sqlite3
+import struct
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import tracemalloc
+import zipfile
+import zlib
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
 
+# Scratch space for caches, profiles, report cards and the cache bus. Keyed by
+# the app root, so two checkouts on one host never share it, and kept out of
+# the source tree. Directories below it are created when first written to.
+RUNTIME_DIR = os.environ.get('CAPSTONE_RUNTIME_DIR', os.path.join(
+    tempfile.gettempdir(), 'capstone-%s' % hashlib.sha1(app.root_path.encode()).hexdigest()[:12]))
+
+# -----------------------------
+# Templates
+# -----------------------------
+# Compiled templates are cached on disk so workers share one compile; run
+# `flask precompile-templates` at deploy time to fill the cache up front.
+TEMPLATE_CACHE_DIR = os.environ.get('CAPSTONE_TEMPLATE_CACHE', os.path.join(RUNTIME_DIR, 'jinja_cache'))
+STREAM_CHUNK_SIZE = 8192  # bytes of rendered HTML per streamed chunk
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """FileSystemBytecodeCache that creates its directory on the first write."""
+
+    def dump_bytecode(self, bucket):
+        os.makedirs(self.directory, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            super().clear()
+
+
+app.jinja_options = dict(app.jinja_options, bytecode_cache=TemplateBytecodeCache(TEMPLATE_CACHE_DIR))
+
+
+@app.cli.command('precompile-templates')
+def precompile_templates():
+    """Compile every template into the shared bytecode cache."""
+    app.jinja_env.bytecode_cache.clear()
+    names = app.jinja_env.list_templates(extensions=['html'])
+    for name in names:
+        app.jinja_env.get_template(name)
+    click.echo("Compiled %d templates into %s" % (len(names), TEMPLATE_CACHE_DIR))
+
+
+def stream_page(template_name, **context):
+    """Render a large page as a stream, so the browser gets the head and first
+    tabs while the rest is still rendering."""
+    # the session cookie goes out with the headers, before the body renders, so
+    # pop flashed messages now; the template then reads the per-request copy
+    get_flashed_messages()
+
+    pieces = stream_template(template_name, **context)
+
+    def chunks():
+        buffered, size = [], 0
+        for piece in pieces:
+            buffered.append(piece)
+            size += len(piece)
+            if size >= STREAM_CHUNK_SIZE:
+                yield ''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield ''.join(buffered)
+    return Response(chunks(), mimetype='text/html')
+
 # -----------------------------
 # DB config - change if needed
 # -----------------------------
+DB_CONNECT_TIMEOUT = int(os.environ.get('CAPSTONE_DB_CONNECT_TIMEOUT', '3'))  # seconds to open a connection
+# seconds a socket read/write may block; keep it above innodb_lock_wait_timeout (50)
+DB_QUERY_TIMEOUT = int(os.environ.get('CAPSTONE_DB_QUERY_TIMEOUT', '60'))
 db_config = {
     'host': 'localhost',
     'user': 'root',
     'password': 'sql123',
-    'database': 'capstoneprojectdb'
+    'database': 'capstoneprojectdb',
+    'connection_timeout': DB_CONNECT_TIMEOUT,
+    'read_timeout': DB_QUERY_TIMEOUT,
+    'write_timeout': DB_QUERY_TIMEOUT,
 }
 
-def get_db_connection():
-    try:
-        return mysql.connector.connect(**db_config)
-    except Error as e:
-        print("DB connect error:", e)
+# Read replicas (same credentials as db_config). For local testing run a second
+# MySQL instance replicating from the first and set e.g.
+#   CAPSTONE_DB_REPLICAS=127.0.0.1:3307
+replica_configs = [
+    dict(db_config, host=host, port=int(port or 3306))
+    for host, _, port in (
+        dsn.strip().partition(':') for dsn in os.environ.get('CAPSTONE_DB_REPLICAS', '').split(',') if dsn.strip()
+    )
+]
+
+REPLICA_MAX_LAG = 5             # seconds behind the primary before a replica is skipped
+REPLICA_LAG_CHECK_INTERVAL = 2  # seconds a lag reading is trusted
+REPLICA_DOWN_RETRY = 30         # seconds an unreachable replica is left alone
+READ_YOUR_WRITES_SECONDS = 5    # reads go to the primary this long after a POST
+
+DB_POOL_SIZE = 10               # connections per server
+DB_POOL_TIMEOUT = 5             # seconds to wait for a free connection
+DB_POOL_PING_AFTER = 30         # idle seconds before a connection is pinged on checkout
+PREPARED_CACHE_SIZE = 32        # prepared statements kept per connection
+
+
+class _PoolEntry:
+    """A raw connection plus its LRU cache of prepared cursors (statement name -> cursor)."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.statements = OrderedDict()
+        self.idle_since = time.monotonic()
+
+    def prepared(self, name):
+        cursor = self.statements.get(name)
+        if cursor is not None:
+            self.statements.move_to_end(name)
+            return cursor
+        cursor = self.raw.cursor(prepared=True)
+        self.statements[name] = cursor
+        while len(self.statements) > PREPARED_CACHE_SIZE:
+            _, evicted = self.statements.popitem(last=False)
+            try:
+                evicted.close()  # deallocates the statement on the server
+            except Error:
+                pass
+        return cursor
+
+    def discard(self):
+        self.statements.clear()
+        try:
+            self.raw.close()
+        except Error:
+            pass
+
+
+class ConnectionPool:
+    """Fixed-size pool of connections to one server. Prepared statements live
+    as long as the server session, so each pooled connection keeps its own
+    statement cache across checkouts."""
+
+    def __init__(self, config, size=DB_POOL_SIZE):
+        self.config = config
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self, timeout=DB_POOL_TIMEOUT):
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolError("No free connection to %s" % self.config['host'])
+        try:
+            entry = self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        return PooledConnection(self, entry)
+
+    def _checkout(self):
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return _PoolEntry(mysql.connector.connect(**self.config))
+            if time.monotonic() - entry.idle_since < DB_POOL_PING_AFTER or entry.raw.is_connected():
+                return entry
+            entry.discard()
+
+    def _release(self, entry, healthy):
+        if healthy:
+            entry.idle_since = time.monotonic()
+            self._idle.put(entry)
+        else:
+            entry.discard()
+        self._slots.release()
+
+
+class PooledConnection:
+    """Proxy handed out by ConnectionPool; close() returns the connection
+    to the pool instead of disconnecting."""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        return getattr(self._entry.raw, name)
+
+    def prepared_cursor(self, name):
+        return self._entry.prepared(name)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return
+        healthy = True
+        try:
+            # end the implicit transaction so the next user doesn't read an old snapshot;
+            # a rollback keeps prepared statements, unlike a session reset
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+        except Error:
+            healthy = False
+        self._pool._release(entry, healthy)
+
+    def discard(self):
+        """Give the slot back but drop the connection (it is known to be dead)."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, False)
+
+    def __del__(self):
+        # routes that bail out early without closing still give the slot back
+        if self.__dict__.get('_entry') is not None:
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+class ReplicaRouter:
+    """Picks a connection target: writes always hit the primary, reads go to a
+    healthy replica unless the session recently wrote something."""
+
+    def __init__(self, primary, replicas):
+        self.primary = primary
+        self.replicas = replicas
+        self._pool = ConnectionPool(primary)
+        self._replica_pools = [ConnectionPool(cfg) for cfg in replicas]
+        self._lock = threading.Lock()
+        self._next = 0
+        self._lag = {}         # index -> (checked_at, seconds behind or None)
+        self._down_until = {}  # index -> monotonic time
+
+    def connect(self, read_only=False):
+        if read_only and self.replicas and not self._pinned_to_primary():
+            for index in self._candidates():
+                try:
+                    conn = self._replica_pools[index].get()
+                except PoolError:
+                    continue  # busy, not broken
+                except Error as e:
+                    print("Replica connect error:", e)
+                    self._down_until[index] = time.monotonic() + REPLICA_DOWN_RETRY
+                    continue
+                if self._lag_ok(index, conn):
+                    return conn
+                conn.close()
+        return self._pool.get()
+
+    def _candidates(self):
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        order = [(start + i) % len(self.replicas) for i in range(len(self.replicas))]
+        return [i for i in order if self._down_until.get(i, 0) <= now]
+
+    def _lag_ok(self, index, conn):
+        checked_at, lag = self._lag.get(index, (0, None))
+        if time.monotonic() - checked_at > REPLICA_LAG_CHECK_INTERVAL:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+                status = cursor.fetchone() or {}
+                lag = status.get('Seconds_Behind_Source')
+            except Error:
+                lag = None
+            finally:
+                cursor.close()
+            self._lag[index] = (time.monotonic(), lag)
+        # NULL lag means replication is stopped or broken
+        return lag is not None and lag <= REPLICA_MAX_LAG
+
+    @staticmethod
+    def _pinned_to_primary():
+        return has_request_context() and session.get('primary_until', 0) > time.time()
+
+
+# -----------------------------
+# Storage backends
+# -----------------------------
+# get_db_connection() asks `storage` for a connection; anything with a
+# connect(read_only=False) returning a connector-like connection will do.
+# CAPSTONE_DB_BACKEND=memory swaps the MySQL router for an in-process SQLite
+# database built from db.sql: the table definitions are translated, the
+# sample data is loaded, and the trigger rules the routes rely on (team size,
+# mentor in panel, max marks, meeting mentor, evaluation tombstones,
+# Updated_At bumps) are re-stated below. Stored procedures, JSON_TABLE,
+# FULLTEXT and MySQL date arithmetic are not emulated; statements using them
+# fail with a DatabaseError like any other query error. It exists so route
+# logic can be exercised and profiled without a server (see bench-routes).
+STORAGE_BACKEND = os.environ.get('CAPSTONE_DB_BACKEND', 'mysql')  # 'mysql' or 'memory'
+SCHEMA_FILE = os.path.join(app.root_path, 'db.sql')
+
+MEMORY_TRIGGERS = """
+CREATE TRIGGER trg_team_size_limit BEFORE INSERT ON Team_Student
+BEGIN
+    SELECT RAISE(ABORT, 'A team cannot have more than 4 members')
+    WHERE (SELECT COUNT(*) FROM Team_Student WHERE Team_ID = NEW.Team_ID) >= 4;
+END;
+
+CREATE TRIGGER trg_check_marks BEFORE INSERT ON Evaluation
+BEGIN
+    SELECT RAISE(ABORT, 'Marks exceed maximum allowed for this rubric')
+    WHERE NEW.Marks > (SELECT Max_Marks FROM Rubric WHERE Rubric_ID = NEW.Rubric_ID);
+END;
+
+CREATE TRIGGER trg_mentor_in_panel BEFORE INSERT ON Review_Panel
+BEGIN
+    SELECT RAISE(ABORT, 'The mentor must be included in the review panel')
+    FROM Review r JOIN Team t ON t.Team_ID = r.Team_ID
+    WHERE r.Review_ID = NEW.Review_ID AND t.Faculty_ID IS NOT NULL AND t.Faculty_ID <> NEW.Faculty_ID
+      AND NOT EXISTS (SELECT 1 FROM Review_Panel rp WHERE rp.Review_ID = NEW.Review_ID AND rp.Faculty_ID = t.Faculty_ID);
+END;
+
+CREATE TRIGGER trg_check_meeting_mentor BEFORE INSERT ON Meeting
+BEGIN
+    SELECT RAISE(ABORT, 'Team has no mentor assigned')
+    WHERE (SELECT Faculty_ID FROM Team WHERE Team_ID = NEW.Team_ID) IS NULL;
+    SELECT RAISE(ABORT, 'Faculty is not the mentor of this team')
+    WHERE NEW.Faculty_ID <> (SELECT Faculty_ID FROM Team WHERE Team_ID = NEW.Team_ID);
+END;
+
+CREATE TRIGGER trg_eval_tombstone AFTER DELETE ON Evaluation
+BEGIN
+    INSERT OR REPLACE INTO Evaluation_Tombstone (Evaluation_ID, Faculty_ID, Review_ID)
+    VALUES (OLD.Evaluation_ID, OLD.Faculty_ID, OLD.Review_ID);
+END;
+"""
+
+_MYSQL_PARAM_RE = re.compile(r"%\((\w+)\)s|%s|%%")
+_LOCKING_READ_RE = re.compile(r"\s+FOR\s+(UPDATE|SHARE)(\s+OF\s+\w+)?\s*$", re.IGNORECASE)
+_GROUP_CONCAT_RE = re.compile(
+    r"GROUP_CONCAT\(((?:[^()]|\([^()]*\))*?)(\s+ORDER BY [^()]*?)?(?:\s+SEPARATOR\s+('[^']*'))?\)", re.IGNORECASE)
+_FORMAT_RE = re.compile(r"(?:DATE|TIME)_FORMAT\(([^,()]+),\s*'([^']*)'\)", re.IGNORECASE)
+_DATETIME_TEXT_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+_INTERVAL_RE = re.compile(r"(\w+\(\)|[\w.]+|\?)\s*([+-])\s*INTERVAL\s+(\S+)\s+(SECOND|MINUTE|HOUR|DAY)\b", re.IGNORECASE)
+
+
+def sqlite_schema(sql_text):
+    """Translate db.sql's table definitions and sample data to SQLite statements."""
+    tables = sql_text.split('-- TABLES', 1)[1].split('-- INITIAL SAMPLE DATA', 1)[0]
+    data = sql_text.split('-- INITIAL SAMPLE DATA', 1)[1].split('-- FUNCTIONS', 1)[0]
+    statements, extra = [], []
+    for stmt in tables.split(';'):
+        match = re.search(r'CREATE TABLE IF NOT EXISTS (\w+) \(', stmt)
+        if not match:
+            continue
+        table, lines = match.group(1), []
+        for line in stmt[match.start():].splitlines():
+            key = re.match(r'\s*(UNIQUE |FULLTEXT )?KEY (\w+) \(([^)]*)\)', line)
+            if key:
+                if key.group(1) == 'UNIQUE ':
+                    lines.append(f"  UNIQUE ({key.group(3)}),")
+                elif not key.group(1):
+                    extra.append(f"CREATE INDEX {table}_{key.group(2)} ON {table} ({key.group(3)})")
+                continue
+            touched = re.match(r'\s*(\w+) TIMESTAMP .*ON UPDATE CURRENT_TIMESTAMP', line)
+            if touched:
+                column = touched.group(1)
+                extra.append(
+                    f"CREATE TRIGGER trg_{table}_touch AFTER UPDATE ON {table} WHEN NEW.{column} IS OLD.{column} "
+                    f"BEGIN UPDATE {table} SET {column} = datetime('now', 'localtime') WHERE rowid = NEW.rowid; END"
+                )
+            lines.append(line.split(' -- ')[0])
+        body = '\n'.join(lines)
+        body = re.sub(r'\b(BIG)?INT NOT NULL AUTO_INCREMENT PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT', body)
+        body = re.sub(r"ENUM\([^)]*\)", 'TEXT', body)
+        body = body.replace(' ON UPDATE CURRENT_TIMESTAMP', '')
+        body = body.replace('DEFAULT CURRENT_TIMESTAMP', "DEFAULT (datetime('now', 'localtime'))")
+        body = re.sub(r'\)\s*PARTITION BY .*$', ')', body, flags=re.S)
+        body = re.sub(r',(\s*)\)\s*$', r'\1)', body)
+        statements.append(body)
+    statements += extra
+    statements += MEMORY_TRIGGERS.strip().split('\n\n')
+    data = re.sub(r'(?m)^--.*$|;\s*--.*$', lambda m: ';' if m.group(0).startswith(';') else '', data)
+    statements += [stmt[stmt.index('INSERT INTO'):] for stmt in data.split(';\n') if 'INSERT INTO' in stmt]
+    return statements
+
+
+def _sqlite_error(e):
+    error = IntegrityError if isinstance(e, sqlite3.IntegrityError) else DatabaseError
+    return error(msg=str(e))
+
+
+class MemoryCursor:
+    """The slice of the connector cursor API the routes use, over sqlite3."""
+
+    def __init__(self, conn, dictionary=False):
+        self._raw = conn.cursor()
+        self._dictionary = dictionary
+        self.column_names = ()
+        self.rowcount = -1
+        self.lastrowid = None
+
+    @staticmethod
+    def _translate(sql):
+        sql = _MYSQL_PARAM_RE.sub(lambda m: ':' + m.group(1) if m.group(1) else ('?' if m.group(0) == '%s' else '%'), sql)
+        sql = re.sub(r'^\s*INSERT IGNORE', 'INSERT OR IGNORE', sql, flags=re.IGNORECASE)
+        # SQLite 3.40 has no ORDER BY inside aggregates; DISTINCT takes no separator
+        sql = _GROUP_CONCAT_RE.sub(
+            lambda m: f"group_concat({m.group(1)}, {m.group(3)})" if m.group(3) else f"group_concat({m.group(1)})", sql)
+        sql = _FORMAT_RE.sub(lambda m: f"strftime('{m.group(2).replace('%i', '%M').replace('%s', '%S')}', {m.group(1)})", sql)
+        sql = _INTERVAL_RE.sub(lambda m: f"datetime({m.group(1)}, '{m.group(2)}' || {m.group(3)} || ' {m.group(4)}')", sql)
+        return _LOCKING_READ_RE.sub('', sql.rstrip().rstrip(';'))
+
+    def execute(self, sql, params=()):
+        try:
+            self._raw.execute(self._translate(sql), params or ())
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+        self._after()
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._raw.executemany(self._translate(sql), seq_params)
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+        self._after()
+
+    def _after(self):
+        description = self._raw.description
+        self.column_names = tuple(col[0] for col in description) if description else ()
+        self.rowcount = self._raw.rowcount
+        self.lastrowid = self._raw.lastrowid
+
+    def _row(self, row):
+        if row is None:
+            return row
+        # declared columns are converted by sqlite3; computed ones (NOW() - INTERVAL ...)
+        # arrive as text, where MySQL would return a datetime
+        row = tuple(datetime.fromisoformat(v) if isinstance(v, str) and _DATETIME_TEXT_RE.match(v) else v
+                    for v in row)
+        return dict(zip(self.column_names, row)) if self._dictionary else row
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    @property
+    def with_rows(self):
+        return bool(self.column_names)
+
+    def fetchone(self):
+        return self._row(self._raw.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._raw.fetchall()]
+
+    def nextset(self):
         return None
 
+    def callproc(self, procname, args=()):
+        raise NotSupportedError(msg=f"Stored procedure {procname} needs the MySQL backend")
+
+    def stored_results(self):
+        return iter(())
+
+    def close(self):
+        self._raw.close()
+
+
+class MemoryConnection:
+    """A connection to the shared in-memory database, shaped like a pooled MySQL one."""
+
+    def __init__(self, backend):
+        self._raw = backend.open()
+        self._prepared = {}
+
+    def cursor(self, dictionary=False, prepared=False, **kwargs):
+        return MemoryCursor(self._raw, dictionary=dictionary)
+
+    def prepared_cursor(self, name):
+        if name not in self._prepared:
+            self._prepared[name] = self.cursor()
+        return self._prepared[name]
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.rollback()
+            self._raw.close()
+            self._raw = None
+
+    discard = close
+
+
+class MemoryBackend:
+    """Shared-cache in-memory SQLite database for this process, schema from db.sql.
+
+    One anchor connection keeps the database alive; every connect() opens
+    another one on it. SQLite's shared cache locks per table, so concurrent
+    writers fail fast with "database table is locked" instead of waiting."""
+
+    def __init__(self, schema_file, name=None):
+        # one database per name; tests pass their own to start from a fresh copy
+        self.uri = 'file:%s?mode=memory&cache=shared' % (name or 'capstone-%d' % os.getpid())
+        for sql_type, convert in (('DATE', lambda b: datetime.strptime(b.decode(), '%Y-%m-%d').date()),
+                                  ('DATETIME', lambda b: datetime.fromisoformat(b.decode())),
+                                  ('TIMESTAMP', lambda b: datetime.fromisoformat(b.decode())),
+                                  ('TIME', lambda b: datetime.strptime(b.decode(), '%H:%M:%S') - datetime(1900, 1, 1)),
+                                  ('DECIMAL', lambda b: Decimal(b.decode()))):
+            sqlite3.register_converter(sql_type, convert)
+        sqlite3.register_adapter(Decimal, str)
+        sqlite3.register_adapter(datetime, lambda v: v.isoformat(' '))
+        sqlite3.register_adapter(type(datetime.min.date()), lambda v: v.isoformat())
+        sqlite3.register_adapter(type(datetime.min.time()), lambda v: v.isoformat())
+        sqlite3.register_adapter(timedelta, lambda v: '%02d:%02d:%02d' % (v.seconds // 3600, v.seconds // 60 % 60, v.seconds % 60))
+        self._anchor = self.open()
+        with open(schema_file) as f:
+            for stmt in sqlite_schema(f.read()):
+                self._anchor.execute(stmt)
+        self._anchor.commit()
+
+    def open(self):
+        raw = sqlite3.connect(self.uri, uri=True, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        raw.create_function('CURDATE', 0, lambda: datetime.now().strftime('%Y-%m-%d'))
+        raw.create_function('CONCAT', -1, lambda *parts: None if None in parts else ''.join(map(str, parts)))
+        return raw
+
+    def connect(self, read_only=False):
+        return MemoryConnection(self)
+
+
+BENCH_LOGINS = {
+    'admin': {'role': 'admin'},
+    'faculty': {'role': 'faculty', 'faculty_id': '101'},
+    'student': {'role': 'student', 'srn': 'PES1UG21CS001'},
+}
+BENCH_ROUTES = [  # (role, path) pages exercised by `flask bench-routes`, sample data ids
+    ('admin', '/admin/dashboard'),
+    ('admin', '/admin/get_students'),
+    ('admin', '/admin/get_review_details/1'),
+    ('admin', '/admin/results/releases'),
+    ('faculty', '/faculty/dashboard'),
+    ('faculty', '/faculty/get_students_by_review/1'),
+    ('faculty', '/faculty/workspace'),
+    ('faculty', '/faculty/workspace/reviews/1'),
+    ('student', '/student/dashboard'),
+]
+
+
+@app.cli.command('bench-routes')
+@click.option('--repeat', default=100, show_default=True, help='Requests per route.')
+def bench_routes(repeat):
+    """Drive the main pages through the test client and report requests per second.
+
+    Uses whichever backend is configured, so the same run checks the route
+    logic in milliseconds with CAPSTONE_DB_BACKEND=memory and measures it
+    against MySQL otherwise. Fails if any route answers with a 5xx."""
+    clients = {}
+    for role, form in BENCH_LOGINS.items():
+        clients[role] = app.test_client()
+        clients[role].post('/login', data=form)
+
+    click.echo("backend: %s" % STORAGE_BACKEND)
+    click.echo("%-40s %10s  %s" % ('route', 'req/s', 'statuses'))
+    failed = []
+    for role, path in BENCH_ROUTES:
+        statuses = defaultdict(int)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            response = clients[role].get(path)
+            response.get_data()
+            response.close()
+            statuses[response.status_code] += 1
+        elapsed = time.perf_counter() - started
+        click.echo("%-40s %10.1f  %s" % (path, repeat / elapsed, dict(statuses)))
+        if any(code >= 500 for code in statuses):
+            failed.append(path)
+    if failed:
+        raise click.ClickException("Server errors from: %s" % ', '.join(failed))
+
+
+if STORAGE_BACKEND == 'memory':
+    storage = MemoryBackend(SCHEMA_FILE)
+else:
+    storage = ReplicaRouter(db_config, replica_configs)
+
+
+@app.after_request
+def pin_session_to_primary(response):
+    # read-your-writes: after a successful write, keep this session's reads on the primary
+    if request.method == 'POST' and response.status_code < 500 and replica_configs:
+        session['primary_until'] = time.time() + READ_YOUR_WRITES_SECONDS
+    return response
+
+
 # -----------------------------
-# Home / Index
+# Database circuit breaker
 # -----------------------------
-@app.route('/')
-def home():
-    return render_template('index.html')
+# Every connection checkout and every statement goes through one breaker per
+# worker. Outage errors (can't connect, server gone, socket timeouts - not SQL
+# errors) are counted over a sliding window; past the threshold the breaker
+# opens and get_db_connection() fails at once with DatabaseUnavailable instead
+# of each request waiting out the connect timeout. After a cool-off a single
+# half-open probe is let through: a live connection closes the breaker, a
+# failure re-opens it for twice as long. Connect failures are retried with
+# full jitter, but only within a budget proportional to recent traffic, so
+# retries can't multiply the load on a struggling server. While the breaker
+# is open, the read-only pages in STALE_PAGE_ENDPOINTS are served from the
+# last good copy this worker rendered for the same user and URL.
+BREAKER_FAILURE_THRESHOLD = 5    # outage errors within the window that open the breaker
+BREAKER_WINDOW = 10              # seconds; also the retry budget's accounting period
+BREAKER_OPEN_SECONDS = 5         # first cool-off before a half-open probe
+BREAKER_MAX_OPEN_SECONDS = 60    # cool-off doubles per failed probe up to this
+BREAKER_HALF_OPEN_PROBES = 1     # requests let through at once while half-open
+DB_RETRY_ATTEMPTS = 2            # extra connect attempts per request
+DB_RETRY_BACKOFF = 0.05          # seconds; attempt n sleeps uniform(0, backoff * 2**n)
+DB_RETRY_BUDGET = 0.1            # retries per first attempt in the window...
+DB_RETRY_BUDGET_MIN = 3          # ...plus this many, so a quiet worker can still retry
+DB_OUTAGE_ERRNOS = {1040, 1053, 2002, 2003, 2005, 2006, 2013, 2055}  # too many connections, shutdown, unreachable, lost
+DB_UNAVAILABLE_MESSAGE = "The database is temporarily unavailable, please try again shortly."
+
+STALE_PAGE_ENDPOINTS = {
+    'student_dashboard', 'faculty_dashboard', 'admin_dashboard', 'admin_get_students',
+    'admin_get_review_details', 'faculty_get_students_by_review', 'admin_analytics', 'calendar_feed',
+}
+STALE_PAGE_MAX_AGE = 3600        # seconds a copy may be served after it was rendered
+STALE_PAGE_MAX_ENTRIES = 256     # per worker
+STALE_PAGE_MAX_BYTES = 2 << 20   # larger pages are not kept
+
+
+class DatabaseUnavailable(Error):
+    """get_db_connection() could not hand out a connection; answered with a 503."""
+
+    def __init__(self, msg, retry_after):
+        super().__init__(msg=msg)
+        self.retry_after = retry_after
+
+
+def is_db_outage(exc):
+    """True for errors that say the server is unreachable or stuck, not that the SQL was wrong."""
+    return (isinstance(exc, (ConnectionTimeoutError, ReadTimeoutError, WriteTimeoutError))
+            or getattr(exc, 'errno', None) in DB_OUTAGE_ERRNOS)
+
+
+class CircuitBreaker:
+    """closed -> open after too many outage errors in the window; open ->
+    half_open once the cool-off has passed; the half-open probe closes it
+    again or re-opens it with a longer cool-off."""
+
+    def __init__(self, threshold, window, open_seconds, max_open_seconds, probes):
+        self.threshold = threshold
+        self.window = window
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probes = probes
+        self.state = 'closed'
+        self.changed_at = time.time()
+        self.last_error = None
+        self._failures = deque()  # monotonic times of recent outage errors
+        self._cooloff = open_seconds
+        self._opened_at = 0
+        self._probing = 0
+        self._budget_since = time.monotonic()
+        self._budget_calls = 0
+        self._budget_retries = 0
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0,
+                      'probes': 0, 'retries': 0, 'retries_denied': 0}
+
+    def admit(self, retry=False):
+        """Returns True when this call is a half-open probe; raises DatabaseUnavailable when rejected."""
+        with self._lock:
+            now = time.monotonic()
+            self.stats['calls'] += 1
+            if not retry:
+                self._roll_budget(now)
+                self._budget_calls += 1
+            if self.state == 'open' and now - self._opened_at >= self._cooloff:
+                self._set('half_open')
+            if self.state == 'closed':
+                return False
+            if self.state == 'half_open' and self._probing < self.probes:
+                self._probing += 1
+                self.stats['probes'] += 1
+                return True
+            self.stats['rejected'] += 1
+            raise DatabaseUnavailable("Database unavailable (circuit %s)" % self.state.replace('_', '-'),
+                                      self.retry_after())
+
+    def record_success(self, probe=False):
+        with self._lock:
+            self.stats['successes'] += 1
+            if probe:
+                self._probing = max(self._probing - 1, 0)
+                if self.state == 'half_open':
+                    self._failures.clear()
+                    self._cooloff = self.open_seconds
+                    self._set('closed')
+
+    def record_failure(self, exc, probe=False):
+        with self._lock:
+            if probe:
+                self._probing = max(self._probing - 1, 0)
+            if not is_db_outage(exc):
+                return
+            now = time.monotonic()
+            self.stats['failures'] += 1
+            self.last_error = str(exc)
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if self.state == 'half_open':
+                self._cooloff = min(self._cooloff * 2, self.max_open_seconds)
+                self._open(now)
+            elif self.state == 'closed' and len(self._failures) >= self.threshold:
+                self._open(now)
+
+    def retry_allowed(self):
+        """Spend one retry from the budget, if the breaker is still closed and any is left."""
+        with self._lock:
+            self._roll_budget(time.monotonic())
+            if self.state != 'closed' or self._budget_retries >= DB_RETRY_BUDGET_MIN + DB_RETRY_BUDGET * self._budget_calls:
+                self.stats['retries_denied'] += 1
+                return False
+            self._budget_retries += 1
+            self.stats['retries'] += 1
+            return True
+
+    def retry_after(self):
+        """Whole seconds until the next probe (at least 1)."""
+        if self.state != 'open':
+            return 1
+        return max(int(self._opened_at + self._cooloff - time.monotonic()) + 1, 1)
+
+    def _open(self, now):
+        self._opened_at = now
+        self._probing = 0
+        self.stats['opened'] += 1
+        self._set('open')
+        print("DB circuit breaker open for %ds: %s" % (self._cooloff, self.last_error))
+
+    def _set(self, state):
+        self.state = state
+        self.changed_at = time.time()
+
+    def _roll_budget(self, now):
+        if now - self._budget_since > self.window:
+            self._budget_since, self._budget_calls, self._budget_retries = now, 0, 0
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            return dict(self.stats, state=self.state, state_since=self.changed_at,
+                        recent_failures=sum(1 for t in self._failures if now - t <= self.window),
+                        threshold=self.threshold, window=self.window, cooloff=self._cooloff,
+                        retry_after=self.retry_after(), last_error=self.last_error,
+                        retry_budget={'calls': self._budget_calls, 'retries': self._budget_retries})
+
+
+db_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_WINDOW, BREAKER_OPEN_SECONDS,
+                            BREAKER_MAX_OPEN_SECONDS, BREAKER_HALF_OPEN_PROBES)
+
+
+def _guarded(fn, on_outage=None):
+    """fn, reporting connector errors to the breaker."""
+    def call(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Error as e:
+            db_breaker.record_failure(e)
+            if on_outage is not None and is_db_outage(e):
+                on_outage()
+            raise
+    return call
+
+
+class GuardedCursor:
+    """Cursor proxy whose statements and fetches report outages to the breaker."""
+
+    GUARDED = frozenset(('execute', 'executemany', 'callproc', 'fetchone', 'fetchmany', 'fetchall', 'nextset'))
+
+    def __init__(self, raw, on_outage):
+        self._raw = raw
+        self._on_outage = on_outage
+
+    def __getattr__(self, name):
+        attr = getattr(self._raw, name)
+        return _guarded(attr, self._on_outage) if name in self.GUARDED else attr
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class GuardedConnection:
+    """What get_db_connection() returns: the storage connection with guarded
+    cursors. One that hit an outage is dropped on close() rather than pooled."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._broken = False
+        self.commit = _guarded(conn.commit, self._mark_broken)
+        self.rollback = _guarded(conn.rollback, self._mark_broken)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def _mark_broken(self):
+        self._broken = True
+
+    def cursor(self, *args, **kwargs):
+        return GuardedCursor(self._conn.cursor(*args, **kwargs), self._mark_broken)
+
+    def prepared_cursor(self, name):
+        return GuardedCursor(self._conn.prepared_cursor(name), self._mark_broken)
+
+    def close(self):
+        if self._broken:
+            self._conn.discard()
+        else:
+            self._conn.close()
+
+
+def get_db_connection(read_only=False):
+    """A connection from `storage`, through the circuit breaker.
+
+    Raises DatabaseUnavailable (a connector Error) when the breaker is open
+    or the server could not be reached within the retry budget."""
+    for attempt in itertools.count():
+        probe = db_breaker.admit(retry=attempt > 0)
+        try:
+            conn = storage.connect(read_only=read_only)
+            if probe and not conn.is_connected():  # a pooled connection proves nothing until pinged
+                conn.discard()
+                raise OperationalError(msg="Probe connection is not usable", errno=2013)
+        except Error as e:
+            db_breaker.record_failure(e, probe)
+            if attempt < DB_RETRY_ATTEMPTS and is_db_outage(e) and db_breaker.retry_allowed():
+                time.sleep(random.uniform(0, DB_RETRY_BACKOFF * 2 ** attempt))
+                continue
+            print("DB connect error:", e)
+            raise DatabaseUnavailable(str(e), db_breaker.retry_after()) from e
+        db_breaker.record_success(probe)
+        return GuardedConnection(conn)
+
+
+class StalePages:
+    """Last good copy of each read-only page per (endpoint, user, URL), LRU-bounded."""
+
+    def __init__(self, max_entries, max_age, max_bytes):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._pages = OrderedDict()  # key -> (stored_at, mimetype, body)
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'served': 0, 'missing': 0}
+
+    @staticmethod
+    def key():
+        user = session.get('srn') or session.get('faculty_id')
+        return (request.endpoint, session.get('role'), user, request.full_path)
+
+    def capture(self, response):
+        key, mimetype = self.key(), response.mimetype
+        if not response.is_streamed:
+            self._put(key, mimetype, response.get_data())
+            return response
+        response.response = self._tee(key, mimetype, response.response)
+        return response
+
+    def _tee(self, key, mimetype, chunks):
+        parts, size = [], 0
+        for chunk in chunks:
+            yield chunk
+            if parts is not None:
+                parts.append(chunk.encode() if isinstance(chunk, str) else chunk)
+                size += len(parts[-1])
+                if size > self.max_bytes:
+                    parts = None
+        if parts is not None:  # only a page that streamed to the end is worth keeping
+            self._put(key, mimetype, b''.join(parts))
+
+    def _put(self, key, mimetype, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._pages[key] = (time.time(), mimetype, body)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        self.stats['stored'] += 1
+
+    def get(self):
+        """(age in seconds, mimetype, body) of this request's page, or None."""
+        with self._lock:
+            page = self._pages.get(self.key())
+        if page is None or time.time() - page[0] > self.max_age:
+            self.stats['missing'] += 1
+            return None
+        self.stats['served'] += 1
+        return (time.time() - page[0],) + page[1:]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._pages), bytes=sum(len(p[2]) for p in self._pages.values()))
+
+
+stale_pages = StalePages(STALE_PAGE_MAX_ENTRIES, STALE_PAGE_MAX_AGE, STALE_PAGE_MAX_BYTES)
+
+
+@app.after_request
+def keep_stale_copy(response):
+    if (request.method == 'GET' and request.endpoint in STALE_PAGE_ENDPOINTS and response.status_code == 200
+            and not g.get('served_stale') and not response.direct_passthrough):
+        return stale_pages.capture(response)
+    return response
+
+
+@app.errorhandler(DatabaseUnavailable)
+def database_unavailable(e):
+    page = stale_pages.get() if request.method == 'GET' and request.endpoint in STALE_PAGE_ENDPOINTS else None
+    if page is not None:
+        age, mimetype, body = page
+        g.served_stale = True
+        return Response(body, 200, mimetype=mimetype,
+                        headers={'Age': str(int(age)), 'Warning': '110 - "Response is Stale"'})
+    return Response(DB_UNAVAILABLE_MESSAGE, 503, mimetype='text/plain', headers={'Retry-After': str(e.retry_after)})
+
+
+@app.route('/admin/db-breaker')
+def admin_db_breaker():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify({'worker': os.getpid(), 'breaker': db_breaker.snapshot(), 'stale_pages': stale_pages.snapshot()})
+
 
 # -----------------------------
-# Login
+# Admission control
 # -----------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
+# Every request passes a gate for its route (if it has a limit of its own) and
+# then the process-wide gate sized to the DB pool. A full gate parks the
+# request in a bounded priority queue; admin and faculty writes go ahead of
+# everything else. When the queue is full, or the wait runs out, the client
+# gets an immediate 503 with Retry-After instead of a slow timeout.
+ADMISSION_LIMITS = {               # endpoint -> (concurrent requests, waiting requests)
+    'student_dashboard': (6, 40),
+    'faculty_dashboard': (4, 20),
+    'admin_dashboard': (3, 10),
+    'calendar_feed': (4, 20),
+}
+ADMISSION_GLOBAL_LIMIT = (DB_POOL_SIZE, 200)
+ADMISSION_WAIT_TIMEOUT = 3         # seconds a request may queue in total
+ADMISSION_RETRY_AFTER = 5          # base Retry-After; jittered up to 2x so retries spread out
+ADMISSION_EXEMPT = {'static', 'admin_admission', 'admin_review_stream', 'admin_db_breaker'}
+
+PRIORITY_WRITE = 0                 # admin/faculty POSTs
+PRIORITY_NORMAL = 1
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded wait queue ordered by (priority, arrival)."""
+
+    def __init__(self, name, limit, max_waiting):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.active = 0
+        self._waiting = []  # heap of (priority, seq) tickets
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0, 'peak_waiting': 0}
+
+    def acquire(self, priority, timeout):
+        with self._cond:
+            if self.active < self.limit and not self._waiting:
+                self.active += 1
+                self.stats['admitted'] += 1
+                return True
+            # priority writes are rare and must not be turned away by a read flood
+            if len(self._waiting) >= self.max_waiting and priority != PRIORITY_WRITE:
+                self.stats['rejected'] += 1
+                return False
+
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            self.stats['queued'] += 1
+            self.stats['peak_waiting'] = max(self.stats['peak_waiting'], len(self._waiting))
+            deadline = time.monotonic() + timeout
+            while not (self.active < self.limit and self._waiting[0] == ticket):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self.stats['timed_out'] += 1
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(remaining)
+            heapq.heappop(self._waiting)
+            self.active += 1
+            self.stats['admitted'] += 1
+            self._cond.notify_all()  # the next ticket may fit too
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, limit=self.limit, max_waiting=self.max_waiting,
+                        active=self.active, waiting=len(self._waiting))
+
+
+admission_gates = {endpoint: AdmissionGate(endpoint, *limits) for endpoint, limits in ADMISSION_LIMITS.items()}
+admission_global = AdmissionGate('global', *ADMISSION_GLOBAL_LIMIT)
+
+
+@app.before_request
+def admit_request():
+    if request.endpoint in ADMISSION_EXEMPT or request.endpoint is None:
+        return None
+    write = request.method == 'POST' and session.get('role') in ('admin', 'faculty')
+    priority = PRIORITY_WRITE if write else PRIORITY_NORMAL
+    deadline = time.monotonic() + ADMISSION_WAIT_TIMEOUT
+
+    g.admitted = []
+    for gate in (admission_gates.get(request.endpoint), admission_global):
+        if gate is None:
+            continue
+        if not gate.acquire(priority, max(deadline - time.monotonic(), 0)):
+            release_admission()
+            retry_after = random.randint(ADMISSION_RETRY_AFTER, 2 * ADMISSION_RETRY_AFTER)
+            return Response("The server is busy, please try again shortly.", 503,
+                            mimetype='text/plain', headers={'Retry-After': str(retry_after)})
+        g.admitted.append(gate)
+    return None
+
+
+@app.teardown_request
+def release_admission(exc=None):
+    for gate in g.pop('admitted', ()):
+        gate.release()
+
+
+@app.route('/admin/admission')
+def admin_admission():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    gates = [admission_global] + list(admission_gates.values())
+    return jsonify({gate.name: gate.snapshot() for gate in gates})
+
+# -----------------------------
+# Request profiling
+# -----------------------------
+# An admin can profile one request by sending `X-Profile: 1` (or adding
+# `?_profile=1`); CAPSTONE_PROFILE_RATE profiles that fraction of all
+# requests. A profiled request runs under cProfile while a sampler thread
+# records its stack every few milliseconds, from before the view until the
+# last byte of a streamed response. The pstats dump, the collapsed stacks
+# (for flamegraph.pl / speedscope) and a small JSON summary are written to
+# PROFILE_DIR, which keeps only the newest PROFILE_KEEP profiles.
+PROFILE_DIR = os.environ.get('CAPSTONE_PROFILE_DIR', os.path.join(RUNTIME_DIR, 'profiles'))
+PROFILE_KEEP = 50                 # profiles kept on disk; older ones are deleted
+PROFILE_SAMPLE_RATE = float(os.environ.get('CAPSTONE_PROFILE_RATE', '0'))  # 0..1 of all requests
+PROFILE_SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+PROFILE_EXEMPT = {'static', 'admin_profiles', 'admin_profile_download'}
+PROFILE_KINDS = {'pstats': 'application/octet-stream', 'folded': 'text/plain', 'json': 'application/json'}
+PROFILE_ID_RE = re.compile(r'^\d+-[0-9a-f]{8}$')
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack and counts collapsed stacks ("a;b;c" -> hits)."""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name='profile-sampler')
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = defaultdict(int)
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {hits}\n" for stack, hits in sorted(self.stacks.items()))
+
+
+class RequestProfile:
+    """cProfile plus a stack sampler around one request."""
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.id = '%d-%s' % (time.time() * 1000, os.urandom(4).hex())
+        self.started = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+        self.sampler.start()
+        try:
+            self.profiler.enable()
+        except ValueError:  # Python 3.12+ allows one cProfile per process: keep the samples only
+            self.profiler = None
+        self.finished = False
+
+    def finish(self, summary):
+        if self.finished:
+            return
+        self.finished = True
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.sampler.stop()
+        summary = dict(summary, id=self.id, trigger=self.trigger,
+                       duration_ms=round((time.perf_counter() - self.started) * 1000, 2),
+                       samples=sum(self.sampler.stacks.values()))
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.id)
+        if self.profiler is not None:
+            self.profiler.dump_stats(base + '.pstats')
+        with open(base + '.folded', 'w') as f:
+            f.write(self.sampler.collapsed())
+        with open(base + '.json', 'w') as f:  # written last: its presence marks a complete profile
+            json.dump(summary, f)
+        prune_profiles()
+
+
+def profile_ids():
+    """Ids of the complete profiles on disk, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    ids = [name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith('.json')]
+    return sorted(ids, key=lambda pid: int(pid.split('-')[0]), reverse=True)
+
+
+def prune_profiles():
+    for pid in profile_ids()[PROFILE_KEEP:]:
+        for kind in PROFILE_KINDS:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{pid}.{kind}"))
+            except FileNotFoundError:
+                pass
+
+
+@app.before_request
+def start_profile():
+    if request.endpoint in PROFILE_EXEMPT or request.endpoint is None:
+        return None
+    if session.get('role') == 'admin' and (request.headers.get('X-Profile') == '1' or request.args.get('_profile') == '1'):
+        trigger = 'admin'
+    elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        trigger = 'sampled'
+    else:
+        return None
+    g.profile = RequestProfile(trigger)
+    return None
+
+
+@app.after_request
+def finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    summary = {'method': request.method, 'path': request.full_path.rstrip('?'), 'endpoint': request.endpoint,
+               'status': response.status_code, 'at': datetime.now().isoformat(timespec='seconds')}
+    # streamed pages render while the body is sent; stop once it has been
+    response.call_on_close(lambda: profile.finish(summary))
+    response.headers['X-Profile-Id'] = profile.id
+    return response
+
+
+@app.teardown_request
+def abandon_profile(exc=None):
+    # the view raised, so finish_profile never ran
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.finish({'method': request.method, 'path': request.full_path.rstrip('?'),
+                        'endpoint': request.endpoint, 'status': 500, 'error': repr(exc),
+                        'at': datetime.now().isoformat(timespec='seconds')})
+
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    profiles = []
+    for pid in profile_ids():
+        try:
+            with open(os.path.join(PROFILE_DIR, pid + '.json')) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # pruned by another worker meanwhile
+    return jsonify(profiles)
+
+
+@app.route('/admin/profiles/<profile_id>.<kind>')
+def admin_profile_download(profile_id, kind):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    if kind not in PROFILE_KINDS or not PROFILE_ID_RE.match(profile_id):
+        return jsonify({'error': 'Profile not found'}), 404
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.{kind}"), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(data, mimetype=PROFILE_KINDS[kind], headers={
+        'Content-Disposition': f'attachment; filename=profile_{profile_id}.{kind}'
+    })
+
+# -----------------------------
+# Shared cache and invalidation bus
+# -----------------------------
+# Each worker caches hot, rarely-changing reads in its own memory. Entries are
+# tagged with the version of their namespace on a bus shared by all workers;
+# a write route bumps the namespace (see CACHE_INVALIDATED_BY) and every worker
+# sees the new version on its next lookup. The default bus is a small mmap'd
+# file of counters, so an invalidation is visible to the other processes on
+# the same host immediately. Set CAPSTONE_CACHE_BUS=redis://... to share
+# versions across hosts instead (counters in Redis, pushed to workers via
+# pub/sub).
+CACHE_NAMESPACES = ('counts', 'projects', 'rubrics', 'meetings', 'schedule', 'review_types')  # append only
+CACHE_BUS_URL = os.environ.get('CAPSTONE_CACHE_BUS', os.path.join(RUNTIME_DIR, 'cache-bus'))
+CACHE_MAX_ENTRIES = 2048  # per worker
+CACHE_REDIS_CHANNEL = 'capstone:cache-invalidate'
+FACULTY_MEETINGS_TTL = 60  # seconds; bounds how late a meeting moves from upcoming to past
+
+
+class MmapVersionBus:
+    """One 8-byte counter per namespace in a shared file mapping. Reads are
+    plain loads; bumps serialise on an flock across processes."""
+
+    SLOT = struct.Struct('Q')
+
+    def __init__(self, path, namespaces):
+        self._slots = {name: i * self.SLOT.size for i, name in enumerate(namespaces)}
+        size = self.SLOT.size * len(namespaces)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def version(self, namespace):
+        return self.SLOT.unpack_from(self._map, self._slots[namespace])[0]
+
+    def bump(self, namespace):
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                version = self.version(namespace) + 1
+                self.SLOT.pack_into(self._map, self._slots[namespace], version)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return version
+
+
+class RedisVersionBus:
+    """Counters live in Redis; a listener thread applies every published bump
+    to a local copy, so lookups never leave the process."""
+
+    def __init__(self, url, namespaces):
+        if redis is None:
+            raise RuntimeError("CAPSTONE_CACHE_BUS points at Redis but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._namespaces = namespaces
+        self._versions = {}
+        self._reload()
+        threading.Thread(target=self._listen, name='cache-bus', daemon=True).start()
+
+    def _reload(self):
+        values = self._client.mget(['capstone:cache:' + name for name in self._namespaces])
+        self._versions = {name: int(value or 0) for name, value in zip(self._namespaces, values)}
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CACHE_REDIS_CHANNEL)
+                self._reload()  # catch up on anything missed while disconnected
+                for message in pubsub.listen():
+                    name, _, version = message['data'].decode().partition(':')
+                    if int(version) > self._versions.get(name, 0):
+                        self._versions[name] = int(version)
+            except redis.RedisError as e:
+                print("Cache bus error:", e)
+                time.sleep(1)
+
+    def version(self, namespace):
+        return self._versions[namespace]
+
+    def bump(self, namespace):
+        version = self._client.incr('capstone:cache:' + namespace)
+        self._client.publish(CACHE_REDIS_CHANNEL, f'{namespace}:{version}')
+        self._versions[namespace] = max(version, self._versions.get(namespace, 0))
+        return version
+
+
+class SharedCache:
+    """Per-worker LRU of loader results, invalidated through the version bus."""
+
+    def __init__(self, bus):
+        self.bus = bus
+        self._entries = OrderedDict()  # (namespace, key) -> (version, expires_at, value)
+        self._lock = threading.Lock()
+        self.stats = {name: {'hits': 0, 'misses': 0, 'stale': 0, 'invalidations': 0} for name in CACHE_NAMESPACES}
+
+    def get(self, namespace, key, loader, ttl=None):
+        """Cached value for key, calling loader() on a miss, after an
+        invalidation of namespace, or once ttl seconds have passed."""
+        version = self.bus.version(namespace)  # read before loading, so a racing bump still wins
+        stats = self.stats[namespace]
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry and entry[0] == version and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end((namespace, key))
+                stats['hits'] += 1
+                return entry[2]
+        stats['stale' if entry else 'misses'] += 1
+        value = loader()
+        with self._lock:
+            self._entries[(namespace, key)] = (version, time.monotonic() + ttl if ttl else None, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.bus.bump(namespace)
+            self.stats[namespace]['invalidations'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            sizes = defaultdict(int)
+            for namespace, _ in self._entries:
+                sizes[namespace] += 1
+        report = {}
+        for namespace, stats in self.stats.items():
+            lookups = stats['hits'] + stats['misses'] + stats['stale']
+            report[namespace] = dict(stats, entries=sizes[namespace], version=self.bus.version(namespace),
+                                     hit_rate=round(stats['hits'] / lookups, 3) if lookups else None)
+        return report
+
+
+cache_bus = (RedisVersionBus(CACHE_BUS_URL, CACHE_NAMESPACES) if CACHE_BUS_URL.startswith('redis://')
+             else MmapVersionBus(CACHE_BUS_URL, CACHE_NAMESPACES))
+shared_cache = SharedCache(cache_bus)
+
+
+def load_from_primary(fn, *args):
+    """fn(conn, *args) on a primary connection. Cache fills must not read a
+    replica: a lagging one would store old rows under the new version."""
     conn = get_db_connection()
+    try:
+        return fn(conn, *args)
+    finally:
+        conn.close()
+
+
+def fetch_dicts(conn, sql, params=()):
     cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
 
-    # populate dropdowns
-    cursor.execute("SELECT Name, Faculty_ID FROM Faculty")
-    faculty_list = cursor.fetchall()
-    cursor.execute("SELECT Name, SRN FROM Student")
-    student_list = cursor.fetchall()
+# Successful write routes -> namespaces they invalidate on every worker
+CACHE_INVALIDATED_BY = {
+    'admin_add_student': ('counts',),
+    'admin_delete_student': ('counts',),
+    'admin_add_faculty': ('counts',),
+    'admin_delete_faculty': ('counts', 'meetings', 'schedule'),
+    'admin_add_project': ('counts', 'projects'),
+    'admin_edit_project': ('projects', 'meetings'),
+    'admin_delete_project': ('counts', 'projects'),
+    'add_project': ('counts', 'projects'),
+    'admin_add_team': ('counts',),
+    'add_teammate': ('counts',),
+    'admin_delete_team': ('counts', 'projects', 'meetings', 'schedule'),
+    'admin_assign_faculty': ('meetings',),
+    'faculty_claim_team': ('meetings',),
+    'admin_assign_project': ('projects', 'meetings'),
+    'admin_schedule_review': ('counts', 'schedule'),
+    'admin_edit_review': ('schedule',),
+    'admin_delete_review': ('counts', 'schedule'),
+    'faculty_schedule_meeting': ('meetings', 'schedule'),
+    'faculty_add_feedback': ('meetings',),
+    'admin_batch': ('counts', 'projects', 'meetings', 'schedule'),
+}
 
-    cursor.close()
-    conn.close()
 
-    if request.method == 'POST':
-        role = request.form.get('role')
-        if role == 'faculty':
-            faculty_id = request.form.get('faculty_id')
-            session['role'] = 'faculty'
-            session['faculty_id'] = faculty_id
-            flash("Logged in as Faculty", "success")
-            return redirect(url_for('faculty_dashboard'))
-        elif role == 'student':
-            srn = request.form.get('srn')
-            session['role'] = 'student'
-            session['srn'] = srn
-            flash("Logged in as Student", "success")
-            return redirect(url_for('student_dashboard'))
-        elif role == 'admin':
-            session['role'] = 'admin'
-            flash("Logged in as Admin", "success")
-            return redirect(url_for('admin_dashboard'))
-        else:
-            flash("Select a valid role", "danger")
+@app.after_request
+def publish_invalidations(response):
+    namespaces = CACHE_INVALIDATED_BY.get(request.endpoint)
+    # form routes redirect on failure too, so any non-error response may have written
+    if namespaces and request.method == 'POST' and response.status_code < 400:
+        shared_cache.invalidate(*namespaces)
+        if 'schedule' in namespaces:
+            schedule_index.published(cache_bus.version('schedule'))
+    return response
+
+
+@app.route('/admin/cache')
+def admin_cache_stats():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify({'worker': os.getpid(), 'bus': type(cache_bus).__name__, 'namespaces': shared_cache.snapshot()})
+
+
+@app.cli.command('cache-invalidate')
+@click.argument('namespaces', nargs=-1)
+def cache_invalidate(namespaces):
+    """Invalidate cache namespaces on every worker (all of them by default)."""
+    unknown = set(namespaces) - set(CACHE_NAMESPACES)
+    if unknown:
+        raise click.BadParameter("unknown namespace(s): " + ', '.join(sorted(unknown)))
+    shared_cache.invalidate(*(namespaces or CACHE_NAMESPACES))
+    click.echo("Invalidated: " + ', '.join(namespaces or CACHE_NAMESPACES))
 
-    return render_template('login.html', faculty_list=faculty_list, student_list=student_list)
 
 # -----------------------------
-# Logout (explicit endpoint so url_for('logout') works)
+# Compact rows
 # -----------------------------
-@app.route('/logout')
-def logout():
-    session.clear()
-    flash("Logged out", "info")
-    return redirect(url_for('login'))
+# A dict cursor builds a hash table per row. Big read-only results are fetched
+# from plain tuple cursors instead (decoded in C when mysql.connector.HAVE_CEXT)
+# and wrapped in per-query namedtuple records, which have no per-instance dict
+# and keep the attribute access the templates already use. Bulk views go one
+# step further and keep each column in a single list or typed array.
+COLUMN_FETCH_BATCH = 500
+
+_record_types = {}
+
+
+def record_type(name, columns):
+    """namedtuple class for a query's column list, created once per shape."""
+    key = (name, tuple(columns))
+    cls = _record_types.get(key)
+    if cls is None:
+        cls = _record_types[key] = namedtuple(name, columns, rename=True)
+    return cls
+
+
+def fetch_records(cursor, name):
+    """Fetch the rest of a tuple cursor's result as a list of records."""
+    make = record_type(name, cursor.column_names)._make
+    return [make(row) for row in cursor.fetchall()]
+
+
+class ColumnStore:
+    """Column-major result set. Integer and float columns without NULLs are
+    packed into array('q') / array('d'); everything else is a plain list.
+    Iterating yields records, so templates treat it like a list of rows."""
+
+    __slots__ = ('columns', 'record', '_data', '_len')
+
+    def __init__(self, name, columns, data):
+        self.columns = tuple(columns)
+        self.record = record_type(name, self.columns)
+        self._data = [self._pack(values) for values in data]
+        self._len = len(data[0]) if data else 0
+
+    @classmethod
+    def from_cursor(cls, cursor, name):
+        columns = cursor.column_names
+        data = [[] for _ in columns]
+        appends = [values.append for values in data]
+        while True:
+            rows = cursor.fetchmany(COLUMN_FETCH_BATCH)
+            if not rows:
+                break
+            for row in rows:
+                for append, value in zip(appends, row):
+                    append(value)
+        return cls(name, columns, data)
+
+    @staticmethod
+    def _pack(values):
+        if values and all(type(v) is int for v in values):
+            try:
+                return array('q', values)
+            except OverflowError:
+                return values
+        if values and all(type(v) is float for v in values):
+            return array('d', values)
+        return values
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return map(self.record._make, zip(*self._data))
+
+    def __getitem__(self, index):
+        return self.record._make(values[index] for values in self._data)
+
+    def column(self, name):
+        return self._data[self.columns.index(name)]
+
+    def iter_dicts(self):
+        columns = self.columns
+        for row in zip(*self._data):
+            yield dict(zip(columns, row))
+
+
+def fetch_columns(conn, name, sql, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return ColumnStore.from_cursor(cursor, name)
+    finally:
+        cursor.close()
+
+
+@app.cli.command('bench-rows')
+@click.option('--repeat', default=20, show_default=True, help='Fetches per representation.')
+def bench_rows(repeat):
+    """Compare dict rows, tuple records and column storage on the large results."""
+    try:
+        conn = get_db_connection()
+    except DatabaseUnavailable as e:
+        raise click.ClickException("Could not connect to the database: %s" % e)
+    click.echo("connection class: %s" % type(conn._entry.raw).__name__)
+    queries = {
+        'students': ("SELECT * FROM Student ORDER BY Name", ()),
+        # every faculty's evaluations, for a larger sample than one dashboard
+        'evaluations': (PREPARED_STATEMENTS['faculty_evaluations'].sql.replace('%s', 'e.Faculty_ID'), ()),
+    }
+
+    def as_dicts(sql, params):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def as_records(sql, params):
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = fetch_records(cursor, 'bench')
+        cursor.close()
+        return rows
+
+    def as_columns(sql, params):
+        return fetch_columns(conn, 'bench', sql, params)
+
+    click.echo("%-12s %-8s %7s %10s %12s" % ('query', 'layout', 'rows', 'ms/fetch', 'retained KiB'))
+    try:
+        for label, (sql, params) in queries.items():
+            for layout, fetch in (('dict', as_dicts), ('records', as_records), ('columns', as_columns)):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    fetch(sql, params)
+                elapsed = (time.perf_counter() - started) * 1000 / repeat
+
+                tracemalloc.start()
+                before = tracemalloc.get_traced_memory()[0]
+                result = fetch(sql, params)
+                retained = tracemalloc.get_traced_memory()[0] - before
+                tracemalloc.stop()
+                click.echo("%-12s %-8s %7d %10.2f %12.1f" % (label, layout, len(result), elapsed, retained / 1024))
+                del result
+    finally:
+        conn.close()
+
 
 # -----------------------------
-# Faculty routes
+# Prepared statements
 # -----------------------------
-@app.route('/faculty/dashboard')
-def faculty_dashboard():
-    if session.get('role') != 'faculty':
-        flash("Access denied", "danger")
-        return redirect(url_for('login'))
-
-    faculty_id = session.get('faculty_id')
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+# The heaviest dashboard queries are executed as server-side prepared
+# statements, so MySQL parses them once per pooled connection rather than on
+# every page load. `params` names the sample values `flask bench-prepared` uses.
+HotStatement = namedtuple('HotStatement', 'route params sql')
 
-    # Teams mentored
-    cursor.execute("""
+PREPARED_STATEMENTS = {
+    'faculty_teams': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT 
             t.Team_ID,
             GROUP_CONCAT(s.Name SEPARATOR ', ') AS Members,
@@ -106,11 +1651,8 @@ def faculty_dashboard():
         LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
         WHERE t.Faculty_ID = %s
         GROUP BY t.Team_ID, p.Title, p.Status
-    """, (faculty_id,))
-    teams = cursor.fetchall()
-
-    # Upcoming meetings (DateTime column)
-    cursor.execute("""
+    """),
+    'faculty_upcoming_meetings': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT m.Meeting_ID, t.Team_ID, p.Title AS ProjectTitle, m.DateTime, m.Feedback
         FROM Meeting m
         JOIN Team t ON m.Team_ID = t.Team_ID
@@ -118,11 +1660,8 @@ def faculty_dashboard():
         LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
         WHERE t.Faculty_ID = %s AND m.DateTime >= NOW()
         ORDER BY m.DateTime ASC
-    """, (faculty_id,))
-    upcoming_meetings = cursor.fetchall()
-
-    # Past meetings
-    cursor.execute("""
+    """),
+    'faculty_past_meetings': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT m.Meeting_ID, t.Team_ID, p.Title AS ProjectTitle, m.DateTime, m.Feedback
         FROM Meeting m
         JOIN Team t ON m.Team_ID = t.Team_ID
@@ -130,11 +1669,8 @@ def faculty_dashboard():
         LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
         WHERE t.Faculty_ID = %s AND m.DateTime < NOW()
         ORDER BY m.DateTime DESC
-    """, (faculty_id,))
-    past_meetings = cursor.fetchall()
-
-    # Reviews created by this faculty (where team belongs to them)
-    cursor.execute("""
+    """),
+    'faculty_reviews': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT r.Review_ID, r.ReviewType_ID, t.Team_ID, p.Title AS ProjectTitle, r.Date, r.Venue
         FROM Review r
         JOIN Team t ON r.Team_ID = t.Team_ID
@@ -142,11 +1678,8 @@ def faculty_dashboard():
         LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
         WHERE t.Faculty_ID = %s
         ORDER BY r.Date DESC
-    """, (faculty_id,))
-    reviews = cursor.fetchall()
-
-    # Panel reviews where faculty is part of review panel
-    cursor.execute("""
+    """),
+    'faculty_panel_reviews': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT r.Review_ID, r.Team_ID, p.Title AS ProjectTitle, r.Date, r.Venue
         FROM Review r
         JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
@@ -154,19 +1687,8 @@ def faculty_dashboard():
         LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
         WHERE rp.Faculty_ID = %s
         ORDER BY r.Date DESC
-    """, (faculty_id,))
-    panel_reviews = cursor.fetchall()
-
-    # unassigned teams
-    cursor.execute("SELECT Team_ID FROM Team WHERE Faculty_ID IS NULL")
-    unassigned_teams = cursor.fetchall()
-
-    # Fetch all rubrics
-    cursor.execute("SELECT Rubric_ID, Rubric_Name, Max_Marks FROM Rubric")
-    rubrics = cursor.fetchall()
-
-    # Fetch all evaluations submitted by this faculty
-    cursor.execute("""
+    """),
+    'faculty_evaluations': HotStatement('faculty_dashboard', ('faculty_id',), """
         SELECT 
             e.Evaluation_ID,
             e.Review_ID,
@@ -180,55 +1702,704 @@ def faculty_dashboard():
             JOIN Student s ON e.SRN = s.SRN
             JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
             WHERE e.Faculty_ID = %s
-            ORDER BY e.Created_At DESC;
-    """, (faculty_id,))
-    evaluations = cursor.fetchall()
-
-    grouped_evals = defaultdict(lambda: defaultdict(list))
-    for ev in evaluations:
-        grouped_evals[ev['Review_ID']][ev['SRN']].append(ev)
+            ORDER BY e.Created_At DESC
+    """),
+    'student_info': HotStatement('student_dashboard', ('srn',), """
+        SELECT s.SRN, s.Name AS StudentName, t.Team_ID, f.Name AS FacultyName,
+               p.Title AS ProjectTitle, p.Status AS ProjectStatus, p.Description AS ProjectDescription
+        FROM Student s
+        LEFT JOIN Team_Student ts ON s.SRN = ts.SRN
+        LEFT JOIN Team t ON ts.Team_ID = t.Team_ID
+        LEFT JOIN Faculty f ON t.Faculty_ID = f.Faculty_ID
+        LEFT JOIN Team_Project tp ON t.Team_ID = tp.Team_ID
+        LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
+        WHERE s.SRN = %s
+        LIMIT 1
+    """),
+    'student_review_totals': HotStatement('student_dashboard', ('srn',), """
+        SELECT 
+            rt.Review_Name AS ReviewType,
+            r.Review_ID,
+            ROUND(SUM(avg_marks),2) AS TotalMarks,
+            ROUND(SUM(MaxTotal),2) AS MaxMarks
+        FROM (
+            SELECT 
+                e.Review_ID,
+                e.Rubric_ID,
+                AVG(e.Marks) AS avg_marks,
+                r2.Max_Marks AS MaxTotal
+            FROM Evaluation e
+            JOIN Rubric r2 ON e.Rubric_ID = r2.Rubric_ID
+            WHERE e.SRN = %s
+            GROUP BY e.Review_ID, e.Rubric_ID
+        ) sub
+        JOIN Review r ON r.Review_ID = sub.Review_ID
+        JOIN Review_Type rt ON rt.ReviewType_ID = r.ReviewType_ID
+        GROUP BY rt.Review_Name, r.Review_ID
+        ORDER BY r.Review_ID
+    """),
+    'student_published_results': HotStatement('student_dashboard', ('srn',), """
+        SELECT rr.Release_ID, rr.Published_At, rs.Payload
+        FROM Result_Release rr
+        LEFT JOIN Result_Snapshot rs ON rs.Release_ID = rr.Release_ID AND rs.SRN = %s
+        ORDER BY rr.Release_ID DESC
+        LIMIT 1
+    """),
+    'student_upcoming_reviews': HotStatement('student_dashboard', ('team_id',), """
+        SELECT r.Review_ID, r.ReviewType_ID, r.Date, r.Venue,
+               GROUP_CONCAT(CONCAT(f.Faculty_ID, ' - ', f.Name) SEPARATOR '; ') AS FacultyPanel
+        FROM Review r
+        LEFT JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
+        LEFT JOIN Faculty f ON rp.Faculty_ID = f.Faculty_ID
+        WHERE r.Team_ID = %s AND r.Date >= CURDATE()
+        GROUP BY r.Review_ID
+        ORDER BY r.Date ASC
+    """),
+    'admin_reviews': HotStatement('admin_dashboard', (), """
+        SELECT 
+            r.Review_ID,
+            rt.Review_Name AS ReviewType,
+            r.Date,
+            TIME_FORMAT(r.Start_Time, '%H:%i') AS StartTime,
+            r.Venue,
+            GROUP_CONCAT(DISTINCT rp.Faculty_ID ORDER BY rp.Faculty_ID ASC) AS FacultyPanel,
+            t.Team_ID,
+            p.Title AS ProjectTitle
+        FROM Review r
+        LEFT JOIN Review_Type rt ON r.ReviewType_ID = rt.ReviewType_ID
+        LEFT JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
+        LEFT JOIN Team t ON r.Team_ID = t.Team_ID
+        LEFT JOIN Team_Project tp ON t.Team_ID = tp.Team_ID
+        LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
+        GROUP BY r.Review_ID, rt.Review_Name, r.Date, r.Start_Time, r.Venue, t.Team_ID, p.Title
+        ORDER BY r.Date DESC
+    """),
+}
 
-    cursor.close()
-    conn.close()
 
-    return render_template(
-        'faculty_dashboard.html',
-        teams=teams,
-        faculty_id=faculty_id,
-        upcoming_meetings=upcoming_meetings,
-        past_meetings=past_meetings,
-        reviews=reviews,
-        panel_reviews=panel_reviews,
-        unassigned_teams=unassigned_teams,
-        rubrics=rubrics,
-        grouped_evals=grouped_evals
-    )
+def run_prepared(conn, name, params=(), records=False):
+    """Execute a registered statement on the connection's cached prepared cursor
+    and return all rows, as dicts or (records=True) as compact records. The
+    cursor re-prepares only when handed a different string object, so always
+    pass the registry's own SQL."""
+    cursor = conn.prepared_cursor(name)
+    cursor.execute(PREPARED_STATEMENTS[name].sql, params)
+    if records:
+        return fetch_records(cursor, name)
+    columns = cursor.column_names
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
-@app.route('/faculty/schedule_meeting', methods=['POST'])
-def faculty_schedule_meeting():
-    if session.get('role') != 'faculty':
-        flash("Access denied", "danger")
-        return redirect(url_for('login'))
-    
-    faculty_id = request.form.get('faculty_id')
-    team_id = request.form.get('team_id')
-    datetime = request.form.get('datetime')
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@app.cli.command('bench-prepared')
+@click.option('--repeat', default=200, show_default=True, help='Executions per statement and mode.')
+def bench_prepared(repeat):
+    """Time the hot statements over the text protocol vs. prepared cursors."""
     try:
-        cursor.execute(
-            "INSERT INTO Meeting (Faculty_ID, Team_ID, DateTime, Feedback) VALUES (%s, %s, %s, NULL)",
-            (faculty_id, team_id, datetime)
-        )
-        conn.commit()
-        flash("Meeting scheduled successfully!", "success")
-    except Error as e:
-        flash("Error scheduling meeting: " + str(e), "danger")
-    finally:
+        conn = get_db_connection()
+    except DatabaseUnavailable as e:
+        raise click.ClickException("Could not connect to the database: %s" % e)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT ts.SRN AS srn, ts.Team_ID AS team_id, t.Faculty_ID AS faculty_id
+            FROM Team_Student ts JOIN Team t ON t.Team_ID = ts.Team_ID
+            WHERE t.Faculty_ID IS NOT NULL
+            LIMIT 1
+        """)
+        sample = cursor.fetchone()
+        if sample is None:
+            raise click.ClickException("Need at least one team with a mentor and a member")
+
+        per_route = defaultdict(lambda: [0.0, 0.0])
+        click.echo("%-28s %12s %12s %8s" % ('statement', 'text ms', 'prepared ms', 'saved'))
+        for name, statement in PREPARED_STATEMENTS.items():
+            params = tuple(sample[key] for key in statement.params)
+            run_prepared(conn, name, params)  # prepare outside the timed loop
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                cursor.execute(statement.sql, params)
+                cursor.fetchall()
+            text = (time.perf_counter() - started) * 1000 / repeat
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run_prepared(conn, name, params)
+            prepared = (time.perf_counter() - started) * 1000 / repeat
+
+            per_route[statement.route][0] += text
+            per_route[statement.route][1] += prepared
+            click.echo("%-28s %12.3f %12.3f %7.1f%%" % (name, text, prepared, 100 * (text - prepared) / text))
+
+        click.echo("")
+        for route, (text, prepared) in per_route.items():
+            click.echo("%-28s %12.3f %12.3f %7.1f%%" % (route, text, prepared, 100 * (text - prepared) / text))
+    finally:
+        cursor.close()
+        conn.close()
+
+# -----------------------------
+# Scheduling conflict index
+# -----------------------------
+# Upcoming meetings and reviews are kept in per-resource (faculty, team, venue)
+# interval trees, so a schedule call checks for overlaps in O(log n) instead of
+# range-scanning Meeting/Review. Reviews without a start time have no known
+# slot yet and are not checked or indexed. When another worker publishes a
+# 'schedule' invalidation, only the rows whose Updated_At moved since the last
+# load are re-read (plus the ids of upcoming rows, to drop deleted ones). A
+# worker's own bump is not a reason to reload when it already applied the
+# write to its index. The index is rebuilt in full every SCHEDULE_INDEX_TTL
+# seconds, which drops past bookings and picks up anything no write route
+# touched Updated_At for.
+MEETING_DURATION_MIN = 30
+REVIEW_DURATION_MIN = 60
+SCHEDULE_DAY_START = 9   # working hours used for slot suggestions
+SCHEDULE_DAY_END = 18
+SCHEDULE_SLOT_STEP_MIN = 30
+SCHEDULE_INDEX_TTL = 60     # seconds between full rebuilds
+SCHEDULE_INDEX_OVERLAP = 2  # seconds re-read by each delta load to catch late commits
+
+
+class _IntervalNode:
+    __slots__ = ('key', 'end', 'ref', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, key, end, ref):
+        self.key = key
+        self.end = end
+        self.ref = ref
+        self.priority = random.random()
+        self.left = self.right = None
+        self.max_end = end
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals in a treap ordered by start, each node
+    carrying the largest end in its subtree. add/remove are O(log n)
+    expected; overlapping() is O(log n + matches) because it skips every
+    subtree that ends before the query starts or begins after it ends."""
+
+    def __init__(self):
+        self._root = None
+        self._keys = {}                # ref -> (start, seq) node key
+        self._seq = itertools.count()  # tie-breaker for equal starts
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, start, end, ref):
+        if ref in self._keys:
+            self.remove(ref)
+        key = self._keys[ref] = (start, next(self._seq))
+        left, right = self._split(self._root, key)
+        self._root = self._merge(self._merge(left, _IntervalNode(key, end, ref)), right)
+
+    def remove(self, ref):
+        self._root = self._delete(self._root, self._keys.pop(ref))
+
+    def overlapping(self, start, end):
+        """Refs of intervals overlapping [start, end)."""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.key[0] < end:  # the right subtree starts even later
+                if node.end > start:
+                    found.append(node.ref)
+                stack.append(node.right)
+        return found
+
+    @staticmethod
+    def _update(node):
+        node.max_end = node.end
+        for child in (node.left, node.right):
+            if child is not None and child.max_end > node.max_end:
+                node.max_end = child.max_end
+        return node
+
+    @classmethod
+    def _split(cls, node, key):
+        """(nodes with key < key, the rest)."""
+        if node is None:
+            return None, None
+        if node.key < key:
+            node.right, right = cls._split(node.right, key)
+            return cls._update(node), right
+        left, node.left = cls._split(node.left, key)
+        return left, cls._update(node)
+
+    @classmethod
+    def _merge(cls, left, right):
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = cls._merge(left.right, right)
+            return cls._update(left)
+        right.left = cls._merge(left, right.left)
+        return cls._update(right)
+
+    @classmethod
+    def _delete(cls, node, key):
+        if node.key == key:
+            return cls._merge(node.left, node.right)
+        if key < node.key:
+            node.left = cls._delete(node.left, key)
+        else:
+            node.right = cls._delete(node.right, key)
+        return cls._update(node)
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = defaultdict(IntervalIndex)  # ('faculty'|'team'|'venue', id) -> IntervalIndex
+        self._bookings = {}                          # ref -> (keys, start, end)
+        self._loaded_at = None                       # monotonic time of the last full load
+        self._version = None                         # cache_bus 'schedule' version loaded
+        self._since = None                           # DB time the last load started
+
+    @staticmethod
+    def keys_for(faculty_ids=(), team_id=None, venue=None):
+        keys = {('faculty', str(fid)) for fid in faculty_ids if fid}
+        if team_id:
+            keys.add(('team', str(team_id)))
+        if venue and venue.strip():
+            keys.add(('venue', venue.strip().lower()))
+        return keys
+
+    def conflicts(self, keys, start, end, ignore=None):
+        """[(key, ref)] for every booking on one of `keys` overlapping [start, end)."""
+        self._ensure_fresh()
+        with self._lock:
+            return [(key, ref) for key in keys
+                    for ref in self._indexes[key].overlapping(start, end) if ref != ignore]
+
+    def book(self, ref, keys, start, end):
+        self._ensure_fresh()
+        with self._lock:
+            self._book(ref, keys, start, end)
+        self._applied()
+
+    def cancel(self, ref):
+        with self._lock:
+            self._cancel(ref)
+        self._applied()
+
+    def published(self, version):
+        """This worker bumped 'schedule' to `version` after a request that
+        kept the index up to date itself; take the version as loaded unless
+        another worker bumped in between."""
+        if not (has_request_context() and g.get('schedule_index_applied')):
+            return
+        with self._lock:
+            if self._version == version - 1:
+                self._version = version
+
+    @staticmethod
+    def _applied():
+        if has_request_context():
+            g.schedule_index_applied = True
+
+    def free_slots(self, keys, day, duration, count=3, ignore=None):
+        """Up to `count` start times on `day` (and the following days) within
+        working hours where every resource in `keys` is free."""
+        self._ensure_fresh()
+        slots = []
+        step = timedelta(minutes=SCHEDULE_SLOT_STEP_MIN)
+        for offset in range(7):
+            current = datetime.combine(day + timedelta(days=offset), datetime.min.time()).replace(hour=SCHEDULE_DAY_START)
+            day_end = current.replace(hour=SCHEDULE_DAY_END)
+            while current + duration <= day_end and len(slots) < count:
+                if current >= datetime.now() and not self.conflicts(keys, current, current + duration, ignore):
+                    slots.append(current)
+                current += step
+            if len(slots) >= count:
+                break
+        return slots
+
+    def _book(self, ref, keys, start, end):
+        self._cancel(ref)
+        for key in keys:
+            self._indexes[key].add(start, end, ref)
+        self._bookings[ref] = (keys, start, end)
+
+    def _cancel(self, ref):
+        booking = self._bookings.pop(ref, None)
+        if booking:
+            for key in booking[0]:
+                self._indexes[key].remove(ref)
+
+    def _ensure_fresh(self):
+        version = cache_bus.version('schedule')
+        if not self._loaded_at or time.monotonic() - self._loaded_at >= SCHEDULE_INDEX_TTL:
+            self._load(version)
+        elif self._version != version:
+            self._load(version, since=self._since - timedelta(seconds=SCHEDULE_INDEX_OVERLAP))
+
+    def _load(self, version, since=None):
+        """Rebuild from the upcoming Meeting/Review rows, or with `since`,
+        re-read only the rows updated from then on and drop deleted ones."""
+        changed, params = ("", ()) if since is None else (" AND {}Updated_At >= %s", (since,))
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT NOW() AS now")
+            now = cursor.fetchone()['now']
+            cursor.execute("""
+                SELECT Meeting_ID, Faculty_ID, Team_ID, DateTime
+                FROM Meeting
+                WHERE DateTime >= CURDATE()
+            """ + changed.format(''), params)
+            meetings = cursor.fetchall()
+            cursor.execute("""
+                SELECT r.Review_ID, r.Team_ID, r.Venue, r.Date, r.Start_Time,
+                       GROUP_CONCAT(rp.Faculty_ID) AS Panel
+                FROM Review r
+                LEFT JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
+                WHERE r.Date >= CURDATE()""" + changed.format('r.') + """
+                GROUP BY r.Review_ID
+            """, params)
+            reviews = cursor.fetchall()
+            live = None
+            if since is not None:
+                cursor.execute("SELECT Meeting_ID AS id FROM Meeting WHERE DateTime >= CURDATE()")
+                live = {('meeting', row['id']) for row in cursor.fetchall()}
+                cursor.execute("SELECT Review_ID AS id FROM Review WHERE Date >= CURDATE()")
+                live.update(('review', row['id']) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            if live is None:
+                self._indexes = defaultdict(IntervalIndex)
+                self._bookings = {}
+            else:
+                for ref in [ref for ref in self._bookings if ref not in live]:
+                    self._cancel(ref)
+            for m in meetings:
+                start, end = meeting_interval(m['DateTime'])
+                self._book(('meeting', m['Meeting_ID']), self.keys_for([m['Faculty_ID']], m['Team_ID']), start, end)
+            for r in reviews:
+                if r['Start_Time'] is None:
+                    self._cancel(('review', r['Review_ID']))  # time not set (or cleared), nothing to collide with
+                    continue
+                start, end = review_interval(r['Date'], r['Start_Time'])
+                panel = (r['Panel'] or '').split(',')
+                self._book(('review', r['Review_ID']), self.keys_for(panel, r['Team_ID'], r['Venue']), start, end)
+            if live is None:
+                self._loaded_at = time.monotonic()
+            self._since = now
+            self._version = version
+
+
+schedule_index = ScheduleIndex()
+
+
+def parse_form_datetime(value):
+    """Parse <input type=datetime-local> values (with or without seconds)."""
+    value = (value or '').strip().replace('T', ' ')
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def meeting_interval(start):
+    return start, start + timedelta(minutes=MEETING_DURATION_MIN)
+
+
+def parse_review_slot(date, start_time):
+    """(date, time or None) from the review forms, or None when either is malformed.
+    The time may carry seconds (browsers send them when the input has a step)."""
+    try:
+        day = datetime.strptime((date or '').strip(), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    if not start_time:
+        return day, None
+    for fmt in ('%H:%M', '%H:%M:%S'):
+        try:
+            return day, datetime.strptime(start_time.strip(), fmt).time()
+        except ValueError:
+            pass
+    return None
+
+
+def review_interval(day, start_time):
+    """[start, end) of a review; None when its start time is not set (an
+    unknown slot is neither checked for conflicts nor indexed)."""
+    if start_time is None:
+        return None
+    if isinstance(start_time, timedelta):  # MySQL TIME columns come back as timedelta
+        start = datetime.combine(day, datetime.min.time()) + start_time
+    else:
+        start = datetime.combine(day, start_time)
+    return start, start + timedelta(minutes=REVIEW_DURATION_MIN)
+
+
+def describe_conflicts(conflicts):
+    labels = {'faculty': 'Faculty', 'team': 'Team', 'venue': 'Venue'}
+    parts = sorted({f"{labels[kind]} {ident} is booked ({ref[0]} {ref[1]})" for (kind, ident), ref in conflicts})
+    return '; '.join(parts)
+
+
+def describe_slots(slots):
+    return ', '.join(s.strftime('%a %d %b %H:%M') for s in slots) or 'none this week'
+
+
+def flash_schedule_conflict(conflicts, keys, day, duration, ignore=None):
+    slots = schedule_index.free_slots(keys, day, duration, ignore=ignore)
+    flash(f"Scheduling conflict: {describe_conflicts(conflicts)}. Free slots: {describe_slots(slots)}", "warning")
+
+
+class ScheduleConflict(Exception):
+    def __init__(self, conflicts):
+        super().__init__(describe_conflicts(conflicts))
+        self.conflicts = conflicts
+
+
+def check_schedule_locked(cursor, keys, start, end, ignore=None):
+    """Repeat schedule_index.conflicts() against the committed rows, inside
+    the transaction that writes the booking; raises ScheduleConflict.
+
+    The index can miss a booking another worker committed after it was
+    loaded. The Faculty and Team rows in `keys` are locked first, in id
+    order, so two bookings of the same person or team run one after the
+    other, and the locking reads below see what the first one committed."""
+    faculty_ids = sorted(int(ident) for kind, ident in keys if kind == 'faculty' and ident.isdigit())
+    team_ids = sorted(int(ident) for kind, ident in keys if kind == 'team' and ident.isdigit())
+    if faculty_ids:
+        cursor.execute("SELECT Faculty_ID FROM Faculty WHERE Faculty_ID IN (%s) ORDER BY Faculty_ID FOR UPDATE"
+                       % ','.join(['%s'] * len(faculty_ids)), faculty_ids)
+        cursor.fetchall()
+    if team_ids:
+        cursor.execute("SELECT Team_ID FROM Team WHERE Team_ID IN (%s) ORDER BY Team_ID FOR UPDATE"
+                       % ','.join(['%s'] * len(team_ids)), team_ids)
+        cursor.fetchall()
+
+    booked = []  # (ref, keys, start, end)
+    cursor.execute("""
+        SELECT Meeting_ID, Faculty_ID, Team_ID, DateTime FROM Meeting
+        WHERE DateTime > %s AND DateTime < %s FOR SHARE
+    """, (start - timedelta(minutes=MEETING_DURATION_MIN), end))
+    for meeting_id, faculty_id, team_id, at in cursor.fetchall():
+        booked.append((('meeting', meeting_id), ScheduleIndex.keys_for([faculty_id], team_id), *meeting_interval(at)))
+    cursor.execute("""
+        SELECT Review_ID, Team_ID, Venue, Date, Start_Time FROM Review
+        WHERE Date BETWEEN %s AND %s AND Start_Time IS NOT NULL FOR SHARE
+    """, ((start - timedelta(minutes=REVIEW_DURATION_MIN)).date(), end.date()))
+    reviews = cursor.fetchall()
+    panels = defaultdict(list)
+    if reviews:
+        cursor.execute("SELECT Review_ID, Faculty_ID FROM Review_Panel WHERE Review_ID IN (%s) FOR SHARE"
+                       % ','.join(['%s'] * len(reviews)), [r[0] for r in reviews])
+        for review_id, faculty_id in cursor.fetchall():
+            panels[review_id].append(faculty_id)
+    for review_id, team_id, venue, day, start_time in reviews:
+        booked.append((('review', review_id), ScheduleIndex.keys_for(panels[review_id], team_id, venue),
+                       *review_interval(day, start_time)))
+
+    conflicts = [(key, ref) for ref, booked_keys, booked_start, booked_end in booked
+                 if ref != ignore and booked_start < end and start < booked_end
+                 for key in sorted(keys & booked_keys)]
+    if conflicts:
+        raise ScheduleConflict(conflicts)
+
+
+@app.route('/schedule/check')
+def schedule_check():
+    """Conflict check + suggested free slots for a prospective meeting or review.
+
+    Query args: kind (meeting|review), start (YYYY-MM-DDTHH:MM), team_id,
+    faculty_ids (comma separated), venue, ignore_review_id.
+    """
+    if session.get('role') not in ('admin', 'faculty'):
+        return jsonify({'error': 'Access denied'}), 403
+
+    kind = request.args.get('kind', 'meeting')
+    start = parse_form_datetime(request.args.get('start'))
+    if kind not in ('meeting', 'review') or not start:
+        return jsonify({'error': 'kind must be meeting|review and start a valid datetime'}), 400
+
+    faculty_ids = [f.strip() for f in request.args.get('faculty_ids', '').split(',') if f.strip()]
+    keys = ScheduleIndex.keys_for(faculty_ids, request.args.get('team_id'), request.args.get('venue'))
+    minutes = MEETING_DURATION_MIN if kind == 'meeting' else REVIEW_DURATION_MIN
+    ignore = ('review', request.args.get('ignore_review_id', type=int))
+
+    conflicts = schedule_index.conflicts(keys, start, start + timedelta(minutes=minutes), ignore)
+    suggestions = schedule_index.free_slots(keys, start.date(), timedelta(minutes=minutes), ignore=ignore) \
+        if conflicts else []
+    return jsonify({
+        'conflicts': [{'resource': kind_, 'id': ident, 'booking': ref[0], 'booking_id': ref[1]}
+                      for (kind_, ident), ref in conflicts],
+        'suggestions': [s.strftime('%Y-%m-%dT%H:%M') for s in suggestions],
+    })
+
+# -----------------------------
+# Home / Index
+# -----------------------------
+@app.route('/')
+def home():
+    return render_template('index.html')
+
+# -----------------------------
+# Login
+# -----------------------------
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+
+    # populate dropdowns
+    cursor.execute("SELECT Name, Faculty_ID FROM Faculty")
+    faculty_list = cursor.fetchall()
+    cursor.execute("SELECT Name, SRN FROM Student")
+    student_list = cursor.fetchall()
+
+    cursor.close()
+    conn.close()
+
+    if request.method == 'POST':
+        role = request.form.get('role')
+        if role == 'faculty':
+            faculty_id = request.form.get('faculty_id')
+            session['role'] = 'faculty'
+            session['faculty_id'] = faculty_id
+            flash("Logged in as Faculty", "success")
+            return redirect(url_for('faculty_dashboard'))
+        elif role == 'student':
+            srn = request.form.get('srn')
+            session['role'] = 'student'
+            session['srn'] = srn
+            flash("Logged in as Student", "success")
+            return redirect(url_for('student_dashboard'))
+        elif role == 'admin':
+            session['role'] = 'admin'
+            flash("Logged in as Admin", "success")
+            return redirect(url_for('admin_dashboard'))
+        else:
+            flash("Select a valid role", "danger")
+
+    return render_template('login.html', faculty_list=faculty_list, student_list=student_list)
+
+# -----------------------------
+# Logout (explicit endpoint so url_for('logout') works)
+# -----------------------------
+@app.route('/logout')
+def logout():
+    session.clear()
+    flash("Logged out", "info")
+    return redirect(url_for('login'))
+
+# -----------------------------
+# Faculty routes
+# -----------------------------
+@app.route('/faculty/dashboard')
+def faculty_dashboard():
+    if session.get('role') != 'faculty':
+        flash("Access denied", "danger")
+        return redirect(url_for('login'))
+
+    faculty_id = session.get('faculty_id')
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+
+    # Teams mentored
+    teams = run_prepared(conn, 'faculty_teams', (faculty_id,))
+
+    # Upcoming / past meetings (DateTime column); the TTL moves meetings across NOW()
+    upcoming_meetings = shared_cache.get(
+        'meetings', ('upcoming', faculty_id),
+        lambda: load_from_primary(run_prepared, 'faculty_upcoming_meetings', (faculty_id,)), ttl=FACULTY_MEETINGS_TTL)
+    past_meetings = shared_cache.get(
+        'meetings', ('past', faculty_id),
+        lambda: load_from_primary(run_prepared, 'faculty_past_meetings', (faculty_id,)), ttl=FACULTY_MEETINGS_TTL)
+
+    # Reviews created by this faculty (where team belongs to them)
+    reviews = run_prepared(conn, 'faculty_reviews', (faculty_id,))
+
+    # Panel reviews where faculty is part of review panel
+    panel_reviews = run_prepared(conn, 'faculty_panel_reviews', (faculty_id,))
+
+    # unassigned teams
+    cursor.execute("SELECT Team_ID FROM Team WHERE Faculty_ID IS NULL")
+    unassigned_teams = cursor.fetchall()
+
+    # Fetch all rubrics
+    rubrics = shared_cache.get('rubrics', 'all', lambda: load_from_primary(
+        fetch_dicts, "SELECT Rubric_ID, Rubric_Name, Max_Marks FROM Rubric"))
+
+    # Fetch all evaluations submitted by this faculty
+    evaluations = run_prepared(conn, 'faculty_evaluations', (faculty_id,), records=True)
+
+    grouped_evals = defaultdict(lambda: defaultdict(list))
+    for ev in evaluations:
+        grouped_evals[ev.Review_ID][ev.SRN].append(ev)
+
+    cursor.close()
+    conn.close()
+
+    return stream_page(
+        'faculty_dashboard.html',
+        teams=teams,
+        faculty_id=faculty_id,
+        upcoming_meetings=upcoming_meetings,
+        past_meetings=past_meetings,
+        reviews=reviews,
+        panel_reviews=panel_reviews,
+        unassigned_teams=unassigned_teams,
+        rubrics=rubrics,
+        grouped_evals=grouped_evals,
+        calendar_url=calendar_feed_url('faculty', faculty_id)
+    )
+
+@app.route('/faculty/schedule_meeting', methods=['POST'])
+def faculty_schedule_meeting():
+    if session.get('role') != 'faculty':
+        flash("Access denied", "danger")
+        return redirect(url_for('login'))
+    
+    faculty_id = request.form.get('faculty_id')
+    team_id = request.form.get('team_id')
+    meeting_time = parse_form_datetime(request.form.get('datetime'))
+    if not meeting_time:
+        flash("Invalid meeting date/time", "warning")
+        return redirect(url_for('faculty_dashboard'))
+
+    start, end = meeting_interval(meeting_time)
+    keys = ScheduleIndex.keys_for([faculty_id], team_id)
+    conflicts = schedule_index.conflicts(keys, start, end)
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, start.date(), end - start)
+        return redirect(url_for('faculty_dashboard'))
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        check_schedule_locked(cursor, keys, start, end)
+        cursor.execute(
+            "INSERT INTO Meeting (Faculty_ID, Team_ID, DateTime, Feedback) VALUES (%s, %s, %s, NULL)",
+            (faculty_id, team_id, meeting_time)
+        )
+        conn.commit()
+        schedule_index.book(('meeting', cursor.lastrowid), keys, start, end)
+        flash("Meeting scheduled successfully!", "success")
+    except ScheduleConflict as e:  # booked by another worker since the index was loaded
+        conn.rollback()
+        conflicts = e.conflicts
+    except Error as e:
+        flash("Error scheduling meeting: " + str(e), "danger")
+    finally:
         cursor.close()
         conn.close()
 
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, start.date(), end - start)
     return redirect(url_for('faculty_dashboard'))
 
 @app.route('/faculty/add_feedback', methods=['POST'])
@@ -258,7 +2429,7 @@ def faculty_add_feedback():
 def faculty_get_students_by_review(review_id):
     if session.get('role') != 'faculty':
         return jsonify([])
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     cursor = conn.cursor(dictionary=True)
     cursor.execute("""
         SELECT s.SRN, s.Name
@@ -308,6 +2479,8 @@ def faculty_evaluate_student():
             """, (faculty_id, student_srn, rubric_id, review_id, mark, comment, student_srn))
 
         conn.commit()
+        audit('evaluate', 'student', student_srn, review_id=review_id,
+              marks={rubric_id: mark for rubric_id, mark in zip(rubric_ids, marks)})
         flash("Evaluation submitted successfully", "success")
     except Error as e:
         flash(f"Error submitting evaluation: {e}", "danger")
@@ -333,6 +2506,7 @@ def faculty_claim_team():
         cursor.execute("UPDATE Team SET Faculty_ID = %s WHERE Team_ID = %s AND Faculty_ID IS NULL", (faculty_id, team_id))
         conn.commit()
         if cursor.rowcount:
+            audit('assign_faculty', 'team', team_id, faculty_id=faculty_id)
             flash("Team claimed", "success")
         else:
             flash("Team already assigned", "warning")
@@ -353,23 +2527,12 @@ def student_dashboard():
         return redirect(url_for('login'))
 
     srn = session.get('srn')
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     cursor = conn.cursor(dictionary=True)
 
     # ✅ Student info
-    cursor.execute("""
-        SELECT s.SRN, s.Name AS StudentName, t.Team_ID, f.Name AS FacultyName,
-               p.Title AS ProjectTitle, p.Status AS ProjectStatus, p.Description AS ProjectDescription
-        FROM Student s
-        LEFT JOIN Team_Student ts ON s.SRN = ts.SRN
-        LEFT JOIN Team t ON ts.Team_ID = t.Team_ID
-        LEFT JOIN Faculty f ON t.Faculty_ID = f.Faculty_ID
-        LEFT JOIN Team_Project tp ON t.Team_ID = tp.Team_ID
-        LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
-        WHERE s.SRN = %s
-        LIMIT 1
-    """, (srn,))
-    student_info = cursor.fetchone()
+    rows = run_prepared(conn, 'student_info', (srn,))
+    student_info = rows[0] if rows else None
 
     # ✅ Team members
     team_members = []
@@ -393,54 +2556,29 @@ def student_dashboard():
         """, (student_info['Team_ID'],))
         meetings = cursor.fetchall()
 
-    # ✅ Evaluations (no Evaluation_Date)
-    cursor.execute("""
-        SELECT e.Marks AS Score, f.Name AS FacultyName, e.Comments, e.Project_ID, e.Review_ID
-        FROM Evaluation e
-        LEFT JOIN Faculty f ON e.Faculty_ID = f.Faculty_ID
-        WHERE e.SRN = %s
-    """, (srn,))
-    evaluations = cursor.fetchall()
-
-     # ---- Review-wise total marks computation ----
-    cursor.execute("""
-        SELECT 
-            rt.Review_Name AS ReviewType,
-            r.Review_ID,
-            ROUND(SUM(avg_marks),2) AS TotalMarks,
-            ROUND(SUM(MaxTotal),2) AS MaxMarks
-        FROM (
-            SELECT 
-                e.Review_ID,
-                e.Rubric_ID,
-                AVG(e.Marks) AS avg_marks,
-                r2.Max_Marks AS MaxTotal
+    # Results are served from the latest published snapshot; they are only
+    # computed live until results have been published for the first time
+    published = run_prepared(conn, 'student_published_results', (srn,))
+    if published:
+        results = load_result_payload(published[0]['Payload'])
+        evaluations, review_totals = results['evaluations'], results['review_totals']
+    else:
+        # ✅ Evaluations (no Evaluation_Date)
+        cursor.execute("""
+            SELECT e.Marks AS Score, f.Name AS FacultyName, e.Comments, e.Project_ID, e.Review_ID
             FROM Evaluation e
-            JOIN Rubric r2 ON e.Rubric_ID = r2.Rubric_ID
+            LEFT JOIN Faculty f ON e.Faculty_ID = f.Faculty_ID
             WHERE e.SRN = %s
-            GROUP BY e.Review_ID, e.Rubric_ID
-        ) sub
-        JOIN Review r ON r.Review_ID = sub.Review_ID
-        JOIN Review_Type rt ON rt.ReviewType_ID = r.ReviewType_ID
-        GROUP BY rt.Review_Name, r.Review_ID
-        ORDER BY r.Review_ID;
-    """, (srn,))
-    review_totals = cursor.fetchall()
+        """, (srn,))
+        evaluations = cursor.fetchall()
+
+        # ---- Review-wise total marks computation ----
+        review_totals = run_prepared(conn, 'student_review_totals', (srn,))
 
     # ✅ Upcoming reviews
     upcoming_reviews = []
     if student_info and student_info.get('Team_ID'):
-        cursor.execute("""
-            SELECT r.Review_ID, r.ReviewType_ID, r.Date, r.Venue,
-                   GROUP_CONCAT(CONCAT(f.Faculty_ID, ' - ', f.Name) SEPARATOR '; ') AS FacultyPanel
-            FROM Review r
-            LEFT JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
-            LEFT JOIN Faculty f ON rp.Faculty_ID = f.Faculty_ID
-            WHERE r.Team_ID = %s AND r.Date >= CURDATE()
-            GROUP BY r.Review_ID
-            ORDER BY r.Date ASC
-        """, (student_info['Team_ID'],))
-        upcoming_reviews = cursor.fetchall()
+        upcoming_reviews = run_prepared(conn, 'student_upcoming_reviews', (student_info['Team_ID'],))
 
     cursor.execute("""
         SELECT Team_ID FROM Team_Student WHERE SRN = %s
@@ -493,7 +2631,8 @@ def student_dashboard():
                            is_in_team=is_in_team,
                            has_project=has_project,
                            available_teams=available_teams,
-                           review_totals=review_totals)
+                           review_totals=review_totals,
+                           calendar_url=calendar_feed_url('student', srn))
 
 
 @app.route('/student/add_teammate', methods=['POST'])
@@ -510,76 +2649,15 @@ def add_teammate():
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # Fetch current student
-        cursor.execute("SELECT SRN, Sem FROM Student WHERE SRN = %s", (srn,))
-        student = cursor.fetchone()
-        if not student:
-            flash("Your record was not found.", "danger")
-            return redirect(url_for('student_dashboard'))
-
-        # Check if already in a team
-        cursor.execute("SELECT Team_ID FROM Team_Student WHERE SRN = %s", (srn,))
-        my_team = cursor.fetchone()
-
-        # Fetch teammate if provided
-        teammate = None
-        if teammate_srn:
-            cursor.execute("SELECT SRN, Sem FROM Student WHERE SRN = %s", (teammate_srn,))
-            teammate = cursor.fetchone()
-            if not teammate:
-                flash("Teammate SRN not found.", "danger")
-                return redirect(url_for('student_dashboard'))
-
-            if teammate["Sem"] != student["Sem"]:
-                flash("Teammate must be in your semester.", "warning")
-                return redirect(url_for('student_dashboard'))
-
-            cursor.execute("SELECT Team_ID FROM Team_Student WHERE SRN = %s", (teammate_srn,))
-            their_team = cursor.fetchone()
-            if their_team:
-                flash("That student is already in another team.", "warning")
-                return redirect(url_for('student_dashboard'))
-
-        # CASE 1️⃣: Student already in a team → Add teammate
-        if my_team:
-            team_id = my_team["Team_ID"]
-
-            cursor.execute("SELECT COUNT(*) AS cnt FROM Team_Student WHERE Team_ID = %s", (team_id,))
-            if cursor.fetchone()["cnt"] >= 4:
-                flash("Your team already has 4 members.", "warning")
-                return redirect(url_for('student_dashboard'))
-
-            if teammate:
-                cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, teammate_srn))
-                conn.commit()
-                flash(f"{teammate_srn} added to your team!", "success")
-
-        # CASE 2️⃣: Student not in a team → Join existing or create new
-        else:
-            if join_team_id:
-                # Joining an existing team
-                cursor.execute("SELECT COUNT(*) AS cnt FROM Team_Student WHERE Team_ID = %s", (join_team_id,))
-                count = cursor.fetchone()["cnt"]
-                if count >= 4:
-                    flash("That team is already full (4 members).", "warning")
-                    return redirect(url_for('student_dashboard'))
-
-                cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (join_team_id, srn))
-                conn.commit()
-                flash("You have successfully joined the team!", "success")
-
+        # Checks and writes run server side in one round trip
+        row = call_routine(cursor, 'StudentAddTeammate', (srn, teammate_srn or None, join_team_id or None))[0]
+        if row['Status'] in TEAM_STATUS_CHANGED:
+            conn.commit()
+            if row['Status'] == 'CREATED':
+                audit('create', 'team', row['Team_ID'], members=[srn] + ([teammate_srn] if teammate_srn else []))
             else:
-                # Creating new team
-                cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (NULL)")
-                team_id = cursor.lastrowid
-                cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, srn))
-
-                # Optionally add teammate if given
-                if teammate:
-                    cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, teammate_srn))
-
-                conn.commit()
-                flash("New team created successfully!", "success")
+                audit('add_member', 'team', row['Team_ID'], srn=row['Detail'])
+        flash_team_status(STUDENT_TEAM_MESSAGES, row)
 
     except Error as e:
         conn.rollback()
@@ -618,9 +2696,12 @@ def add_project():
             # map team to project
             cursor.execute("INSERT INTO Team_Project (Team_ID, Project_ID) VALUES (%s, %s)", (team_id, project_id))
             conn.commit()
+            audit('create', 'project', project_id, title=title)
+            audit('assign_project', 'team', team_id, project_id=project_id)
             flash("Project added & assigned to your team", "success")
         else:
             conn.commit()
+            audit('create', 'project', project_id, title=title)
             flash("Project added but you're not in a team - please create or join a team", "warning")
     except Error as e:
         flash("Error adding project: " + str(e), "danger")
@@ -638,22 +2719,18 @@ def admin_dashboard():
         flash("Access denied", "danger")
         return redirect(url_for('login'))
 
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     cursor = conn.cursor(dictionary=True)
 
-    cursor.execute("SELECT COUNT(*) AS total_students FROM Student")
-    total_students = cursor.fetchone()['total_students']
-    cursor.execute("SELECT COUNT(*) AS total_faculty FROM Faculty")
-    total_faculty = cursor.fetchone()['total_faculty']
-    cursor.execute("SELECT COUNT(*) AS total_projects FROM Project")
-    total_projects = cursor.fetchone()['total_projects']
-    cursor.execute("SELECT COUNT(*) AS total_teams FROM Team")
-    total_teams = cursor.fetchone()['total_teams']
-    cursor.execute("SELECT COUNT(*) AS total_reviews FROM Review")
-    total_reviews = cursor.fetchone()['total_reviews']
-
-    cursor.execute("SELECT * FROM Student ORDER BY Name")
-    students = cursor.fetchall()
+    def load_totals(primary):
+        totals = {}
+        for key, table in (('students', 'Student'), ('faculty', 'Faculty'), ('projects', 'Project'),
+                           ('teams', 'Team'), ('reviews', 'Review')):
+            totals[key] = fetch_dicts(primary, f"SELECT COUNT(*) AS n FROM {table}")[0]['n']
+        return totals
+    totals = shared_cache.get('counts', 'admin_totals', lambda: load_from_primary(load_totals))
+
+    students = fetch_columns(conn, 'StudentRow', "SELECT * FROM Student ORDER BY Name")
     # Fetch all faculty with teams they mentor
     cursor.execute("""
         SELECT f.Faculty_ID, f.Name, f.Email,
@@ -665,13 +2742,12 @@ def admin_dashboard():
     """)
     faculty = cursor.fetchall()
 
-    cursor.execute("""
+    projects = shared_cache.get('projects', 'admin_projects', lambda: load_from_primary(fetch_dicts, """
         SELECT pr.Project_ID, pr.Title, pr.Status, pr.Description, tp.Team_ID
         FROM Project pr
         LEFT JOIN Team_Project tp ON pr.Project_ID = tp.Project_ID
         ORDER BY pr.Title
-    """)
-    projects = cursor.fetchall()
+    """))
     cursor.execute("""
         SELECT t.Team_ID, t.Faculty_ID, GROUP_CONCAT(s.Name SEPARATOR ', ') AS Members
         FROM Team t
@@ -703,50 +2779,26 @@ def admin_dashboard():
     unassigned_teams = cursor.fetchall()
 
     # Fetch all reviews with team, review type, faculty panel, date, and marks
-    cursor.execute("""
-        SELECT 
-            r.Review_ID,
-            rt.Review_Name AS ReviewType,
-            r.Date,
-            r.Venue,
-            GROUP_CONCAT(DISTINCT rp.Faculty_ID ORDER BY rp.Faculty_ID ASC) AS FacultyPanel,
-            t.Team_ID,
-            p.Title AS ProjectTitle
-        FROM Review r
-        LEFT JOIN Review_Type rt ON r.ReviewType_ID = rt.ReviewType_ID
-        LEFT JOIN Review_Panel rp ON r.Review_ID = rp.Review_ID
-        LEFT JOIN Team t ON r.Team_ID = t.Team_ID
-        LEFT JOIN Team_Project tp ON t.Team_ID = tp.Team_ID
-        LEFT JOIN Project p ON tp.Project_ID = p.Project_ID
-        GROUP BY r.Review_ID, rt.Review_Name, r.Date, r.Venue, t.Team_ID, p.Title
-        ORDER BY r.Date DESC;
-    """)
-    reviews = cursor.fetchall()
+    reviews = run_prepared(conn, 'admin_reviews')
 
     # Fetch review types for the dropdown
-    cursor.execute("SELECT * FROM Review_Type")
-    review_types = cursor.fetchall()
+    review_types = shared_cache.get('review_types', 'all', lambda: load_from_primary(
+        fetch_dicts, "SELECT * FROM Review_Type"))
 
 
     cursor.close()
     conn.close()
 
-    return render_template('admin_dashboard.html',
-                           totals={
-                               'students': total_students,
-                               'faculty': total_faculty,
-                               'projects': total_projects,
-                               'teams': total_teams,
-                               'reviews': total_reviews
-                           },
-                           students=students,
-                           faculty=faculty,
-                           projects=projects,
-                           teams=teams,
-                           unassigned_students=unassigned_students,
-                           unassigned_teams=unassigned_teams,
-                           reviews=reviews,
-                           review_types=review_types)
+    return stream_page('admin_dashboard.html',
+                       totals=totals,
+                       students=students,
+                       faculty=faculty,
+                       projects=projects,
+                       teams=teams,
+                       unassigned_students=unassigned_students,
+                       unassigned_teams=unassigned_teams,
+                       reviews=reviews,
+                       review_types=review_types)
 
 @app.route('/admin/add_student', methods=['POST'])
 def admin_add_student():
@@ -777,6 +2829,7 @@ def admin_add_student():
             (srn, name, email, sem)
         )
         conn.commit()
+        audit('create', 'student', srn, name=name, email=email, sem=sem)
         flash("Student added successfully", "success")
     except Error as e:
         flash("Error adding student: " + str(e), "danger")
@@ -796,6 +2849,7 @@ def admin_edit_student():
     try:
         cursor.execute("UPDATE Student SET Name=%s, Email=%s WHERE SRN=%s", (name, email, srn))
         conn.commit(); flash("Student updated", "success")
+        audit('update', 'student', srn, name=name, email=email)
     except Error as e:
         flash("Error updating student: " + str(e), "danger")
     finally:
@@ -813,6 +2867,7 @@ def admin_delete_student():
         cursor.execute("DELETE FROM Evaluation WHERE SRN = %s", (srn,))
         cursor.execute("DELETE FROM Student WHERE SRN = %s", (srn,))
         conn.commit(); flash("Student deleted", "success")
+        audit('delete', 'student', srn)
     except Error as e:
         flash("Error deleting student: " + str(e), "danger")
     finally:
@@ -842,6 +2897,7 @@ def admin_add_faculty():
             (faculty_id, name, email)
         )
         conn.commit()
+        audit('create', 'faculty', faculty_id, name=name, email=email)
         flash("Faculty added successfully", "success")
     except Error as e:
         flash("Error adding faculty: " + str(e), "danger")
@@ -861,6 +2917,7 @@ def admin_edit_faculty():
     try:
         cursor.execute("UPDATE Faculty SET Name=%s, Email=%s WHERE Faculty_ID=%s", (name, email, fid))
         conn.commit(); flash("Faculty updated", "success")
+        audit('update', 'faculty', fid, name=name, email=email)
     except Error as e:
         flash("Error updating faculty: " + str(e), "danger")
     finally:
@@ -878,6 +2935,7 @@ def admin_delete_faculty():
         cursor.execute("DELETE FROM Review_Panel WHERE Faculty_ID = %s", (fid,))
         cursor.execute("DELETE FROM Faculty WHERE Faculty_ID = %s", (fid,))
         conn.commit(); flash("Faculty removed", "success")
+        audit('delete', 'faculty', fid)
     except Error as e:
         flash("Error deleting faculty: " + str(e), "danger")
     finally:
@@ -924,6 +2982,8 @@ def admin_add_project():
         """, (team_id, project_id))
 
         conn.commit()
+        audit('create', 'project', project_id, title=title, status=status)
+        audit('assign_project', 'team', team_id, project_id=project_id)
         flash(f"Project '{title}' added and assigned to Team {team_id}.", "success")
 
     except Error as e:
@@ -946,6 +3006,7 @@ def admin_edit_project():
     try:
         cursor.execute("UPDATE Project SET Title=%s, Description=%s, Status=%s WHERE Project_ID=%s", (title, desc, status, pid))
         conn.commit(); flash("Project updated", "success")
+        audit('update', 'project', pid, title=title, status=status)
     except Error as e:
         flash("Error updating project: " + str(e), "danger")
     finally:
@@ -963,6 +3024,7 @@ def admin_delete_project():
         cursor.execute("DELETE FROM Evaluation WHERE Project_ID = %s", (pid,))
         cursor.execute("DELETE FROM Project WHERE Project_ID = %s", (pid,))
         conn.commit(); flash("Project deleted", "success")
+        audit('delete', 'project', pid)
     except Error as e:
         flash("Error deleting project: " + str(e), "danger")
     finally:
@@ -976,7 +3038,7 @@ def admin_add_team():
         return redirect(url_for('login'))
 
     faculty_id = request.form.get('faculty_id') or None
-    student_srns = request.form.getlist('student_srns')  # because <select multiple>
+    student_srns = list(dict.fromkeys(request.form.getlist('student_srns')))  # <select multiple>, deduplicated
 
     if not student_srns or len(student_srns) == 0:
         flash("Select at least one student to form a team.", "warning")
@@ -990,29 +3052,11 @@ def admin_add_team():
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # Validate students are still unassigned (no race condition)
-        cursor.execute("""
-            SELECT SRN FROM Team_Student WHERE SRN IN (%s)
-        """ % ','.join(['%s'] * len(student_srns)), tuple(student_srns))
-        already_assigned = [row['SRN'] for row in cursor.fetchall()]
-
-        if already_assigned:
-            flash(f"Cannot create team. These students are already assigned to a team: {', '.join(already_assigned)}", "danger")
-            return redirect(url_for('admin_dashboard'))
-
-        # Create team
-        if faculty_id:
-            cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (%s)", (faculty_id,))
-        else:
-            cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (NULL)")
-        team_id = cursor.lastrowid
-
-        # Add students to Team_Student
-        for srn in student_srns:
-            cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, srn))
-
-        conn.commit()
-        flash(f"Team {team_id} created successfully with {len(student_srns)} member(s).", "success")
+        row = call_routine(cursor, 'AdminCreateTeam', (faculty_id, json.dumps(student_srns)))[0]
+        if row['Status'] in TEAM_STATUS_CHANGED:
+            conn.commit()
+            audit('create', 'team', row['Team_ID'], faculty_id=faculty_id, members=student_srns)
+        flash_team_status(ADMIN_TEAM_MESSAGES, row)
 
     except Error as e:
         conn.rollback()
@@ -1041,24 +3085,11 @@ def admin_add_team_member():
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # Check if team already has 4 members
-        cursor.execute("SELECT COUNT(*) AS cnt FROM Team_Student WHERE Team_ID = %s", (team_id,))
-        count = cursor.fetchone()['cnt']
-        if count >= 4:
-            flash(f"Team {team_id} already has 4 members. Cannot add more.", "warning")
-            return redirect(url_for('admin_dashboard'))
-
-        # Check if student already belongs to a team
-        cursor.execute("SELECT Team_ID FROM Team_Student WHERE SRN = %s", (srn,))
-        existing = cursor.fetchone()
-        if existing:
-            flash(f"Student {srn} already belongs to Team {existing['Team_ID']}.", "danger")
-            return redirect(url_for('admin_dashboard'))
-
-        # Add student
-        cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, srn))
-        conn.commit()
-        flash(f"Student {srn} added to Team {team_id}.", "success")
+        row = call_routine(cursor, 'AdminAddTeamMember', (team_id, srn))[0]
+        if row['Status'] in TEAM_STATUS_CHANGED:
+            conn.commit()
+            audit('add_member', 'team', team_id, srn=srn)
+        flash_team_status(ADMIN_TEAM_MESSAGES, row, srn=srn)
 
     except Error as e:
         conn.rollback()
@@ -1085,6 +3116,8 @@ def admin_remove_team_member():
     try:
         cursor.execute("DELETE FROM Team_Student WHERE Team_ID = %s AND SRN = %s", (team_id, srn))
         conn.commit()
+        if cursor.rowcount:
+            audit('remove_member', 'team', team_id, srn=srn)
         flash(f"Student {srn} removed from Team {team_id}.", "success")
     except Error as e:
         conn.rollback()
@@ -1107,6 +3140,7 @@ def admin_delete_team():
         cursor.execute("DELETE FROM Team_Project WHERE Team_ID = %s", (tid,))
         cursor.execute("DELETE FROM Team WHERE Team_ID = %s", (tid,))
         conn.commit(); flash("Team deleted", "success")
+        audit('delete', 'team', tid)
     except Error as e:
         flash("Error deleting team: " + str(e), "danger")
     finally:
@@ -1122,6 +3156,7 @@ def admin_assign_faculty():
     try:
         cursor.execute("UPDATE Team SET Faculty_ID = %s WHERE Team_ID = %s", (fid, team_id))
         conn.commit(); flash("Faculty assigned", "success")
+        audit('assign_faculty', 'team', team_id, faculty_id=fid)
     except Error as e:
         flash("Error assigning faculty: " + str(e), "danger")
     finally:
@@ -1138,6 +3173,7 @@ def admin_assign_project():
         cursor.execute("DELETE FROM Team_Project WHERE Team_ID = %s", (team_id,))
         cursor.execute("INSERT INTO Team_Project (Team_ID, Project_ID) VALUES (%s, %s)", (team_id, project_id))
         conn.commit(); flash("Project assigned", "success")
+        audit('assign_project', 'team', team_id, project_id=project_id)
     except Error as e:
         flash("Error assigning project: " + str(e), "danger")
     finally:
@@ -1152,26 +3188,61 @@ def admin_edit_review():
 
     review_id = request.form.get('review_id')
     date = request.form.get('date')
+    start_time = request.form.get('start_time') or None
     venue = request.form.get('venue')
     panel_faculty_ids = request.form.get('panel_faculty_ids', '')
+    ids = [fid.strip() for fid in panel_faculty_ids.split(',') if fid.strip()]
+    if not review_id or not review_id.isdigit():
+        flash("Invalid review.", "warning")
+        return redirect(url_for('admin_dashboard'))
+    if not all(fid.isdigit() for fid in ids):
+        flash("Panel faculty IDs must be numbers.", "warning")
+        return redirect(url_for('admin_dashboard'))
+    slot = parse_review_slot(date, start_time)
+    if slot is None:
+        flash("Enter a valid date (YYYY-MM-DD) and start time (HH:MM).", "warning")
+        return redirect(url_for('admin_dashboard'))
+
+    rows = load_from_primary(fetch_dicts, "SELECT Team_ID FROM Review WHERE Review_ID=%s", (review_id,))
+    team_id = rows[0]['Team_ID'] if rows else None
+    interval = review_interval(*slot)
+    keys = ScheduleIndex.keys_for(ids, team_id, venue)
+    ref = ('review', int(review_id))
+    duration = timedelta(minutes=REVIEW_DURATION_MIN)
+    conflicts = schedule_index.conflicts(keys, *interval, ignore=ref) if interval else []
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, slot[0], duration, ignore=ref)
+        return redirect(url_for('admin_dashboard'))
 
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # Update review details
-        cursor.execute("UPDATE Review SET Date=%s, Venue=%s WHERE Review_ID=%s", (date, venue, review_id))
+        if interval:
+            check_schedule_locked(cursor, keys, *interval, ignore=ref)
 
-        # Update panel assignments
-        cursor.execute("DELETE FROM Review_Panel WHERE Review_ID=%s", (review_id,))
-        if panel_faculty_ids.strip():
-            ids = [fid.strip() for fid in panel_faculty_ids.split(',') if fid.strip()]
-            for fid in ids:
-                cursor.execute("INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, %s)", (review_id, fid))
+        # Update review details (Updated_At set explicitly: a panel-only change
+        # must still reach the other workers' schedule indexes)
+        cursor.execute("UPDATE Review SET Date=%s, Start_Time=%s, Venue=%s, Updated_At=NOW() WHERE Review_ID=%s",
+                       (slot[0], slot[1], venue, review_id))
+
+        # Replace the panel in one set-based call (mentor kept and inserted first)
+        call_routine(cursor, 'SetReviewPanelsJSON', (json.dumps([
+            {'review_id': int(review_id), 'panel': [int(fid) for fid in ids]},
+        ]),))
 
         conn.commit()
+        if interval:
+            schedule_index.book(ref, keys, *interval)
+        else:
+            schedule_index.cancel(ref)
+        audit('update', 'review', review_id, date=date, start_time=start_time, venue=venue, panel=ids)
         flash(f"Review {review_id} updated successfully.", "success")
 
+    except ScheduleConflict as e:  # booked by another worker since the index was loaded
+        conn.rollback()
+        conflicts = e.conflicts
+
     except Error as e:
         conn.rollback()
         flash("Error updating review: " + str(e), "danger")
@@ -1180,6 +3251,8 @@ def admin_edit_review():
         cursor.close()
         conn.close()
 
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, slot[0], duration, ignore=ref)
     return redirect(url_for('admin_dashboard'))
 
 @app.route('/admin_delete_review', methods=['POST'])
@@ -1198,6 +3271,9 @@ def admin_delete_review():
         cursor.execute("DELETE FROM Evaluation WHERE Review_ID=%s", (review_id,))
         cursor.execute("DELETE FROM Review WHERE Review_ID=%s", (review_id,))
         conn.commit()
+        if review_id and review_id.isdigit():
+            schedule_index.cancel(('review', int(review_id)))
+        audit('delete', 'review', review_id)
         flash(f"Review {review_id} deleted successfully.", "success")
 
     except Error as e:
@@ -1219,39 +3295,59 @@ def admin_schedule_review():
     team_id = request.form.get('team_id')
     review_type_id = request.form.get('review_type_id')
     date = request.form.get('date')
+    start_time = request.form.get('start_time') or None
     venue = request.form.get('venue')
     panel_faculty_ids = request.form.get('panel_faculty_ids', '').strip()
+    slot = parse_review_slot(date, start_time)
+    if slot is None:
+        flash("Enter a valid date (YYYY-MM-DD) and start time (HH:MM).", "warning")
+        return redirect(url_for('admin_dashboard'))
+
+    # Build panel faculty list (mentor + additional)
+    faculty_ids = set()
+    if panel_faculty_ids:
+        faculty_ids.update(fid.strip() for fid in panel_faculty_ids.split(',') if fid.strip())
+    if not all(fid.isdigit() for fid in faculty_ids):
+        flash("Panel faculty IDs must be numbers.", "warning")
+        return redirect(url_for('admin_dashboard'))
+    mentor = load_from_primary(fetch_dicts, "SELECT Faculty_ID FROM Team WHERE Team_ID = %s", (team_id,))
+    if mentor and mentor[0]['Faculty_ID']:
+        faculty_ids.add(str(mentor[0]['Faculty_ID']))
+
+    # Refuse double-booking of the team, venue or any panel member
+    interval = review_interval(*slot)
+    keys = ScheduleIndex.keys_for(faculty_ids, team_id, venue)
+    duration = timedelta(minutes=REVIEW_DURATION_MIN)
+    conflicts = schedule_index.conflicts(keys, *interval) if interval else []
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, slot[0], duration)
+        return redirect(url_for('admin_dashboard'))
 
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
-        # Insert into Review table
-        cursor.execute("""
-            INSERT INTO Review (ReviewType_ID, Team_ID, Date, Venue)
-            VALUES (%s, %s, %s, %s)
-        """, (review_type_id, team_id, date, venue))
-        review_id = cursor.lastrowid
-
-        # Build panel faculty list (mentor + additional)
-        # Get mentor from Team
-        cursor.execute("SELECT Faculty_ID FROM Team WHERE Team_ID = %s", (team_id,))
-        mentor_row = cursor.fetchone()
-        mentor_id = mentor_row[0] if mentor_row and mentor_row[0] else None
-
-        faculty_ids = set()
-        if panel_faculty_ids:
-            faculty_ids.update(fid.strip() for fid in panel_faculty_ids.split(',') if fid.strip())
-        if mentor_id:
-            faculty_ids.add(str(mentor_id))
-
-        # Insert each faculty into Review_Panel
-        for fid in faculty_ids:
-            cursor.execute("INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, %s)", (review_id, fid))
+        if interval:
+            check_schedule_locked(cursor, keys, *interval)
+
+        # Review and panel are validated and inserted by one set-based call
+        review_id = call_routine(cursor, 'AddReviewsForTeamsJSON', (json.dumps([{
+            'review_type_id': int(review_type_id), 'team_id': int(team_id),
+            'date': slot[0].isoformat(), 'start_time': slot[1] and slot[1].isoformat(), 'venue': venue,
+            'panel': sorted(int(fid) for fid in faculty_ids),
+        }]),))[0][1]
 
         conn.commit()
+        if interval:
+            schedule_index.book(('review', review_id), keys, *interval)
+        audit('create', 'review', review_id, team_id=team_id, review_type_id=review_type_id, date=date,
+              start_time=start_time, venue=venue, panel=sorted(faculty_ids))
         flash(f"Review scheduled successfully for Team {team_id}.", "success")
 
+    except ScheduleConflict as e:  # booked by another worker since the index was loaded
+        conn.rollback()
+        conflicts = e.conflicts
+
     except Exception as e:
         conn.rollback()
         flash(f"Error scheduling review: {e}", "danger")
@@ -1260,6 +3356,8 @@ def admin_schedule_review():
         cursor.close()
         conn.close()
 
+    if conflicts:
+        flash_schedule_conflict(conflicts, keys, slot[0], duration)
     return redirect(url_for('admin_dashboard'))
 
 
@@ -1268,26 +3366,10 @@ def admin_get_review_details(review_id):
     if session.get('role') != 'admin':
         return jsonify({"error": "Unauthorized"}), 403
 
-    conn = get_db_connection()
+    conn = get_db_connection(read_only=True)
     cursor = conn.cursor(dictionary=True)
 
-    cursor.execute("""
-        SELECT 
-            e.Evaluation_ID,
-            s.SRN,
-            s.Name AS StudentName,
-            r.Rubric_Name,
-            e.Marks,
-            e.Comments,
-            f.Name AS FacultyName,
-            e.Created_At
-        FROM Evaluation e
-        JOIN Student s ON e.SRN = s.SRN
-        JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
-        JOIN Faculty f ON e.Faculty_ID = f.Faculty_ID
-        WHERE e.Review_ID = %s
-        ORDER BY s.SRN, r.Rubric_Name;
-    """, (review_id,))
+    cursor.execute(REVIEW_EVALUATIONS_SQL + " WHERE e.Review_ID = %s ORDER BY s.SRN, r.Rubric_Name", (review_id,))
 
     data = cursor.fetchall()
     cursor.close()
@@ -1299,12 +3381,2828 @@ def admin_get_review_details(review_id):
 def admin_get_students():
     if session.get('role') != 'admin':
         return jsonify({'error': 'Access denied'}), 403
+    conn = get_db_connection(read_only=True)
+    students = fetch_columns(conn, 'StudentRow', "SELECT * FROM Student ORDER BY Name")
+    conn.close()
+
+    def generate():
+        # one row dict alive at a time instead of a list of them
+        for i, row in enumerate(students.iter_dicts()):
+            yield (',' if i else '[') + json.dumps(row, default=str)
+        yield ']' if students else '[]'
+    return Response(generate(), mimetype='application/json')
+
+# -----------------------------
+# Search (FULLTEXT)
+# -----------------------------
+# InnoDB maintains the FULLTEXT indexes declared in db.sql transactionally, so
+# every write route keeps search current without extra work here.
+SEARCH_MAX_PER_PAGE = 50
+SEARCH_IDENTIFIER_SCORE = 1000.0  # exact SRN / Faculty_ID hits rank above text matches
+
+SEARCH_SOURCES = {
+    'project': """
+        SELECT 'project' AS Kind, p.Project_ID AS Ref, p.Title AS Label,
+               LEFT(p.Description, 200) AS Snippet,
+               MATCH(p.Title, p.Description) AGAINST (%(q)s IN BOOLEAN MODE) AS Score
+        FROM Project p
+        WHERE MATCH(p.Title, p.Description) AGAINST (%(q)s IN BOOLEAN MODE)
+        ORDER BY Score DESC LIMIT %(limit)s
+    """,
+    'student': """
+        SELECT 'student' AS Kind, s.SRN AS Ref, s.Name AS Label, s.Email AS Snippet,
+               MATCH(s.Name, s.Email) AGAINST (%(q)s IN BOOLEAN MODE) AS Score
+        FROM Student s
+        WHERE MATCH(s.Name, s.Email) AGAINST (%(q)s IN BOOLEAN MODE)
+        ORDER BY Score DESC LIMIT %(limit)s
+    """,
+    'srn': """
+        SELECT 'student' AS Kind, s.SRN AS Ref, s.Name AS Label, s.Email AS Snippet,
+               %(id_score)s AS Score
+        FROM Student s
+        WHERE s.SRN LIKE %(prefix)s
+        ORDER BY s.SRN LIMIT %(limit)s
+    """,
+    'faculty': """
+        SELECT 'faculty' AS Kind, f.Faculty_ID AS Ref, f.Name AS Label, f.Email AS Snippet,
+               MATCH(f.Name, f.Email) AGAINST (%(q)s IN BOOLEAN MODE) AS Score
+        FROM Faculty f
+        WHERE MATCH(f.Name, f.Email) AGAINST (%(q)s IN BOOLEAN MODE)
+        ORDER BY Score DESC LIMIT %(limit)s
+    """,
+    'faculty_id': """
+        SELECT 'faculty' AS Kind, f.Faculty_ID AS Ref, f.Name AS Label, f.Email AS Snippet,
+               %(id_score)s AS Score
+        FROM Faculty f
+        WHERE f.Faculty_ID = %(faculty_id)s
+    """,
+    'meeting': """
+        SELECT 'meeting' AS Kind, m.Meeting_ID AS Ref,
+               CONCAT('Team ', m.Team_ID, ' - ', DATE_FORMAT(m.DateTime, '%%Y-%%m-%%d %%H:%%i')) AS Label,
+               LEFT(m.Feedback, 200) AS Snippet,
+               MATCH(m.Feedback) AGAINST (%(q)s IN BOOLEAN MODE) AS Score
+        FROM Meeting m
+        WHERE MATCH(m.Feedback) AGAINST (%(q)s IN BOOLEAN MODE)
+        ORDER BY Score DESC LIMIT %(limit)s
+    """,
+}
+
+# Which SQL sources each user-facing type reads from
+SEARCH_TYPES = {
+    'project': ('project',),
+    'student': ('student', 'srn'),
+    'faculty': ('faculty', 'faculty_id'),
+    'meeting': ('meeting',),
+}
+
+
+def _boolean_query(text):
+    """Turn free text into a BOOLEAN MODE query where every word is a required prefix."""
+    words = re.findall(r"\w+", text)
+    return ' '.join(f'+{w}*' for w in words)
+
+
+@app.route('/admin/search')
+def admin_search():
+    """Ranked, paginated search over projects, students, faculty and meeting feedback.
+
+    Query args: q, type (project|student|faculty|meeting, default all), page, per_page.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    text = request.args.get('q', '').strip()
+    kind = request.args.get('type')
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), SEARCH_MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    if kind and kind not in SEARCH_TYPES:
+        return jsonify({'error': f'Unknown type: {kind}'}), 400
+
+    q = _boolean_query(text)
+    if not q:
+        return jsonify({'query': text, 'page': page, 'per_page': per_page, 'has_more': False, 'results': []})
+
+    # Every source only needs its own top (offset + page + 1) rows for the merged
+    # ranking to be exact for this page; the +1 tells us whether a next page exists.
+    limit = page * per_page + 1
+    prefix = re.sub(r'([\\%_])', r'\\\1', text) + '%'
+    params = {'q': q, 'prefix': prefix, 'id_score': SEARCH_IDENTIFIER_SCORE, 'limit': limit,
+              'faculty_id': int(text) if text.isdigit() else None}
+    # Faculty_ID is an INT: only an all-digit query can name one
+    sources = [source for source in (SEARCH_TYPES[kind] if kind else SEARCH_SOURCES)
+               if source != 'faculty_id' or text.isdigit()]
+
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    hits = {}
+    try:
+        for source in sources:
+            cursor.execute(SEARCH_SOURCES[source], params)
+            for row in cursor.fetchall():
+                key = (row['Kind'], row['Ref'])
+                row['Score'] = float(row['Score'])
+                if key not in hits or hits[key]['Score'] < row['Score']:
+                    hits[key] = row
+    finally:
+        cursor.close()
+        conn.close()
+
+    ranked = sorted(hits.values(), key=lambda r: (-r['Score'], r['Kind'], str(r['Ref'])))
+    start = (page - 1) * per_page
+    return jsonify({
+        'query': text,
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(ranked) > start + per_page,
+        'results': ranked[start:start + per_page],
+    })
+
+
+SEARCH_BENCH_WORDS = ('adaptive', 'network', 'energy', 'vision', 'robot', 'sensor', 'traffic', 'health',
+                      'drone', 'learning', 'secure', 'cloud', 'campus', 'water', 'grid', 'language')
+SEARCH_BENCH_QUERIES = ('energy', 'adaptive sensor', 'robot vision learning', 'drone', 'BENCH-0012',
+                        '101', 'bench', 'traffic grid water')
+
+
+@app.cli.command('bench-search')
+@click.option('--rows', default=100000, show_default=True, help='Throwaway students and projects to add (each).')
+@click.option('--repeat', default=50, show_default=True, help='Requests per query.')
+@click.option('--target-ms', default=50.0, show_default=True, help='Fail when a query\'s p95 is above this.')
+def bench_search(rows, repeat, target_ms):
+    """Time /admin/search over a large table and check it stays under the target.
+
+    Adds BENCH- students and projects (committed, since FULLTEXT indexes only
+    see committed rows), drives the route through the test client and deletes
+    the rows again."""
+    rng = random.Random(rows)
+
+    def text(n):
+        return ' '.join(rng.choice(SEARCH_BENCH_WORDS) for _ in range(n))
+
+    try:
+        conn = get_db_connection()
+    except DatabaseUnavailable as e:
+        raise click.ClickException("Could not connect to the database: %s" % e)
+    cursor = conn.cursor()
+    try:
+        for start in range(0, rows, 5000):
+            chunk = range(start, min(start + 5000, rows))
+            cursor.executemany("INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, 1)",
+                               [('BENCH-%06d' % i, text(2), 'bench-%06d@bench.invalid' % i) for i in chunk])
+            cursor.executemany("INSERT INTO Project (Title, Description) VALUES (%s, %s)",
+                               [('BENCH ' + text(4), text(30)) for _ in chunk])
+            conn.commit()
+
+        client = app.test_client()
+        client.post('/login', data=BENCH_LOGINS['admin'])
+        click.echo("%d students, %d projects added" % (rows, rows))
+        click.echo("%-24s %8s %8s %8s %8s" % ('query', 'hits', 'p50 ms', 'p95 ms', 'max ms'))
+        slow = []
+        for q in SEARCH_BENCH_QUERIES:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = client.get('/admin/search', query_string={'q': q})
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise click.ClickException("%r answered %d" % (q, response.status_code))
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            click.echo("%-24s %8d %8.1f %8.1f %8.1f" % (
+                q, len(response.get_json()['results']), timings[len(timings) // 2], p95, timings[-1]))
+            if p95 > target_ms:
+                slow.append(q)
+        if slow:
+            raise click.ClickException("p95 above %.0f ms for: %s" % (target_ms, ', '.join(slow)))
+    finally:
+        conn.rollback()
+        cursor.execute("DELETE FROM Project WHERE Title LIKE 'BENCH %'")
+        cursor.execute("DELETE FROM Student WHERE SRN LIKE 'BENCH-%'")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+# -----------------------------
+# Rubric analytics
+# -----------------------------
+# All statistics are computed by a handful of set-based aggregate queries over
+# the (optionally semester-filtered) Evaluation rows; results are cached per
+# data version so repeated dashboard loads don't re-run them.
+ANALYTICS_HISTOGRAM_BINS = 10
+ANALYTICS_AGREEMENT_TOLERANCE = 0.10  # graders "agree" when their spread is within 10% of max marks
+
+analytics_cache = {}
+analytics_cache_lock = threading.Lock()
+
+ANALYTICS_FILTER = """
+    FROM Evaluation e
+    JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
+    JOIN Review rv ON e.Review_ID = rv.Review_ID
+    JOIN Review_Type rt ON rv.ReviewType_ID = rt.ReviewType_ID
+    JOIN Student s ON e.SRN = s.SRN
+    WHERE (%(sem)s IS NULL OR s.Sem = %(sem)s)
+"""
+
+
+def _analytics_version(cursor):
+    """Cheap fingerprint that changes whenever marks or rubrics change."""
+    cursor.execute("""
+        SELECT COUNT(*) AS n, MAX(Updated_At) AS updated, COALESCE(SUM(Evaluation_ID), 0) AS ids,
+               (SELECT COALESCE(SUM(Max_Marks), 0) FROM Rubric) AS rubric_max
+        FROM Evaluation
+    """)
+    row = cursor.fetchone()
+    return (row['n'], row['updated'], row['ids'], row['rubric_max'])
+
+
+def compute_rubric_analytics(cursor, sem):
+    params = {'sem': sem, 'bins': ANALYTICS_HISTOGRAM_BINS, 'tol': ANALYTICS_AGREEMENT_TOLERANCE}
+
+    cursor.execute("""
+        SELECT r.Rubric_ID, r.Rubric_Name, r.Max_Marks, rt.Review_Name AS ReviewType,
+               COUNT(*) AS N,
+               ROUND(AVG(e.Marks), 3) AS Mean,
+               ROUND(STDDEV_POP(e.Marks), 3) AS StdDev,
+               ROUND(AVG(e.Marks / r.Max_Marks), 4) AS MeanPct
+    """ + ANALYTICS_FILTER + """
+        GROUP BY r.Rubric_ID, r.Rubric_Name, r.Max_Marks, rt.Review_Name
+        ORDER BY r.Rubric_Name, rt.Review_Name
+    """, params)
+    rubric_stats = cursor.fetchall()
+
+    # Histogram of marks as a fraction of the rubric maximum, ANALYTICS_HISTOGRAM_BINS buckets
+    cursor.execute("""
+        SELECT r.Rubric_ID, rt.Review_Name AS ReviewType,
+               LEAST(FLOOR(e.Marks / r.Max_Marks * %(bins)s), %(bins)s - 1) AS Bin,
+               COUNT(*) AS N
+    """ + ANALYTICS_FILTER + """
+        GROUP BY r.Rubric_ID, rt.Review_Name, Bin
+    """, params)
+    histograms = defaultdict(lambda: [0] * ANALYTICS_HISTOGRAM_BINS)
+    for row in cursor.fetchall():
+        histograms[(row['Rubric_ID'], row['ReviewType'])][int(row['Bin'])] = row['N']
+    for stat in rubric_stats:
+        stat['Histogram'] = histograms[(stat['Rubric_ID'], stat['ReviewType'])]
+
+    # Leniency: how far each grader sits above/below the other graders of the
+    # same (review, student, rubric), as a fraction of max marks.
+    cursor.execute("""
+        SELECT g.Faculty_ID, f.Name AS FacultyName, COUNT(*) AS N,
+               ROUND(AVG(g.pct - g.item_mean), 4) AS LeniencyOffset
+        FROM (
+            SELECT e.Faculty_ID, e.Marks / r.Max_Marks AS pct,
+                   AVG(e.Marks / r.Max_Marks) OVER w AS item_mean,
+                   COUNT(*) OVER w AS raters
+    """ + ANALYTICS_FILTER + """
+            WINDOW w AS (PARTITION BY e.Review_ID, e.SRN, e.Rubric_ID)
+        ) g
+        JOIN Faculty f ON g.Faculty_ID = f.Faculty_ID
+        WHERE g.raters > 1
+        GROUP BY g.Faculty_ID, f.Name
+        ORDER BY LeniencyOffset DESC
+    """, params)
+    leniency = cursor.fetchall()
+
+    # Inter-rater agreement per review over items scored by 2+ graders
+    cursor.execute("""
+        SELECT i.Review_ID, i.ReviewType, i.Team_ID, COUNT(*) AS Items,
+               ROUND(1 - AVG(i.spread), 4) AS Agreement,
+               ROUND(AVG(i.spread <= %(tol)s), 4) AS WithinTolerance,
+               ROUND(AVG(i.sd), 4) AS MeanStdDevPct
+        FROM (
+            SELECT e.Review_ID, rt.Review_Name AS ReviewType, rv.Team_ID,
+                   (MAX(e.Marks) - MIN(e.Marks)) / r.Max_Marks AS spread,
+                   STDDEV_POP(e.Marks / r.Max_Marks) AS sd
+    """ + ANALYTICS_FILTER + """
+            GROUP BY e.Review_ID, rt.Review_Name, rv.Team_ID, e.SRN, e.Rubric_ID, r.Max_Marks
+            HAVING COUNT(*) > 1
+        ) i
+        GROUP BY i.Review_ID, i.ReviewType, i.Team_ID
+        ORDER BY i.Review_ID
+    """, params)
+    agreement = cursor.fetchall()
+
+    return {'sem': sem, 'rubrics': rubric_stats, 'leniency': leniency, 'agreement': agreement,
+            'histogram_bins': ANALYTICS_HISTOGRAM_BINS}
+
+
+@app.route('/admin/analytics')
+def admin_analytics():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    sem = request.args.get('sem', type=int)
+
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        version = _analytics_version(cursor)
+        with analytics_cache_lock:
+            cached = analytics_cache.get(sem)
+        if cached and cached[0] == version:
+            return jsonify(cached[1])
+        result = compute_rubric_analytics(cursor, sem)
+    finally:
+        cursor.close()
+        conn.close()
+
+    with analytics_cache_lock:
+        analytics_cache[sem] = (version, result)
+    return jsonify(result)
+
+# -----------------------------
+# Admin batch operations (JSON)
+# -----------------------------
+# Each op lists the statements its form route runs (in order) and the request
+# fields that fill their placeholders. Ops missing from here are not batchable.
+# 'audit' is the (action, entity, id field) the form route records in AuditLog.
+ADMIN_BATCH_MAX_OPS = 1000
+ADMIN_BATCH_KEY_FIELDS = ('srn', 'faculty_id', 'project_id', 'team_id')  # rows an item writes are keyed by these
+
+ADMIN_BATCH_OPS = {
+    'add_student': {
+        'fields': ('srn', 'name', 'email', 'sem'),
+        'statements': [
+            ("INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, %s)", ('srn', 'name', 'email', 'sem')),
+        ],
+    },
+    'edit_student': {
+        'fields': ('srn', 'name', 'email'),
+        'audit': ('update', 'student', 'srn'),
+        'statements': [
+            ("UPDATE Student SET Name=%s, Email=%s WHERE SRN=%s", ('name', 'email', 'srn')),
+        ],
+    },
+    'delete_student': {
+        'fields': ('srn',),
+        'audit': ('delete', 'student', 'srn'),
+        'statements': [
+            ("DELETE FROM Team_Student WHERE SRN = %s", ('srn',)),
+            ("DELETE FROM Evaluation WHERE SRN = %s", ('srn',)),
+            ("DELETE FROM Student WHERE SRN = %s", ('srn',)),
+        ],
+    },
+    'edit_faculty': {
+        'fields': ('faculty_id', 'name', 'email'),
+        'audit': ('update', 'faculty', 'faculty_id'),
+        'statements': [
+            ("UPDATE Faculty SET Name=%s, Email=%s WHERE Faculty_ID=%s", ('name', 'email', 'faculty_id')),
+        ],
+    },
+    'delete_faculty': {
+        'fields': ('faculty_id',),
+        'audit': ('delete', 'faculty', 'faculty_id'),
+        'statements': [
+            ("UPDATE Team SET Faculty_ID = NULL WHERE Faculty_ID = %s", ('faculty_id',)),
+            ("DELETE FROM Review_Panel WHERE Faculty_ID = %s", ('faculty_id',)),
+            ("DELETE FROM Faculty WHERE Faculty_ID = %s", ('faculty_id',)),
+        ],
+    },
+    'edit_project': {
+        'fields': ('project_id', 'title'),
+        'defaults': {'description': '', 'status': 'Ongoing'},
+        'audit': ('update', 'project', 'project_id'),
+        'statements': [
+            ("UPDATE Project SET Title=%s, Description=%s, Status=%s WHERE Project_ID=%s",
+             ('title', 'description', 'status', 'project_id')),
+        ],
+    },
+    'delete_project': {
+        'fields': ('project_id',),
+        'audit': ('delete', 'project', 'project_id'),
+        'statements': [
+            ("DELETE FROM Team_Project WHERE Project_ID = %s", ('project_id',)),
+            ("DELETE FROM Evaluation WHERE Project_ID = %s", ('project_id',)),
+            ("DELETE FROM Project WHERE Project_ID = %s", ('project_id',)),
+        ],
+    },
+    'delete_team': {
+        'fields': ('team_id',),
+        'audit': ('delete', 'team', 'team_id'),
+        'statements': [
+            ("DELETE FROM Team_Student WHERE Team_ID = %s", ('team_id',)),
+            ("DELETE FROM Team_Project WHERE Team_ID = %s", ('team_id',)),
+            ("DELETE FROM Team WHERE Team_ID = %s", ('team_id',)),
+        ],
+    },
+    'assign_faculty': {
+        'fields': ('team_id', 'faculty_id'),
+        'audit': ('assign_faculty', 'team', 'team_id'),
+        'statements': [
+            ("UPDATE Team SET Faculty_ID = %s WHERE Team_ID = %s", ('faculty_id', 'team_id')),
+        ],
+    },
+    'assign_project': {
+        'fields': ('team_id', 'project_id'),
+        'audit': ('assign_project', 'team', 'team_id'),
+        'statements': [
+            ("DELETE FROM Team_Project WHERE Team_ID = %s", ('team_id',)),
+            ("INSERT INTO Team_Project (Team_ID, Project_ID) VALUES (%s, %s)", ('team_id', 'project_id')),
+        ],
+    },
+    'remove_team_member': {
+        'fields': ('team_id', 'srn'),
+        'audit': ('remove_member', 'team', 'team_id'),
+        'statements': [
+            ("DELETE FROM Team_Student WHERE Team_ID = %s AND SRN = %s", ('team_id', 'srn')),
+        ],
+    },
+}
+
+
+def _batch_params(item):
+    """Validate one batch item; returns (op, params, error)."""
+    if not isinstance(item, dict):
+        return None, None, "Operation must be an object"
+    op = item.get('op')
+    if not isinstance(op, str):
+        return None, None, "op must be a string"
+    spec = ADMIN_BATCH_OPS.get(op)
+    if not spec:
+        return op, None, f"Unknown operation: {op}"
+
+    params = dict(spec.get('defaults', {}))
+    params.update({k: v for k, v in item.items() if k != 'op' and v is not None})
+    missing = [f for f in spec['fields'] if params.get(f) in (None, '')]
+    if missing:
+        return op, None, "Missing field(s): " + ', '.join(missing)
+
+    if 'sem' in params:
+        try:
+            params['sem'] = int(params['sem'])
+        except (TypeError, ValueError):
+            return op, None, "Invalid semester value"
+        if params['sem'] < 1 or params['sem'] > 8:
+            return op, None, "Semester must be between 1 and 8"
+    return op, params, None
+
+
+def _batch_groups(ops):
+    """Split (index, op, params) triples into consecutive runs of the same op,
+    so runs share statement shape but the caller's ordering is preserved.
+
+    A run executes statement by statement across its items, so an item that
+    touches a key already in the run (two assign_project for one team, say)
+    starts a new run; otherwise it would not behave like a second form post."""
+    groups, keys = [], set()
+    for entry in ops:
+        item_keys = {(f, str(entry[2][f])) for f in ADMIN_BATCH_KEY_FIELDS if f in entry[2]}
+        if groups and groups[-1][0] == entry[1] and not item_keys & keys:
+            groups[-1][1].append(entry)
+            keys |= item_keys
+        else:
+            groups.append((entry[1], [entry]))
+            keys = item_keys
+    return groups
+
+
+def _batch_execute(cursor, op, entries):
+    for sql, fields in ADMIN_BATCH_OPS[op]['statements']:
+        cursor.executemany(sql, [tuple(params[f] for f in fields) for _, _, params in entries])
+
+
+@app.route('/admin/batch', methods=['POST'])
+def admin_batch():
+    """Run many admin operations in one transaction.
+
+    Body: {"mode": "atomic" | "per_item", "operations": [{"op": "...", ...}]}.
+    In atomic mode any failure rolls back the whole batch; in per_item mode a
+    failing run is retried item by item and only the bad items are skipped.
+    """
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    mode = payload.get('mode', 'atomic')
+    operations = payload.get('operations')
+    if mode not in ('atomic', 'per_item'):
+        return jsonify({'error': "mode must be 'atomic' or 'per_item'"}), 400
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > ADMIN_BATCH_MAX_OPS:
+        return jsonify({'error': f'At most {ADMIN_BATCH_MAX_OPS} operations per batch'}), 400
+
+    results = [None] * len(operations)
+    valid = []
+    for i, item in enumerate(operations):
+        op, params, error = _batch_params(item)
+        if error:
+            results[i] = {'index': i, 'op': op, 'status': 'invalid', 'error': error}
+        else:
+            valid.append((i, op, params))
+
+    if mode == 'atomic' and len(valid) != len(operations):
+        for i, op, _ in valid:
+            results[i] = {'index': i, 'op': op, 'status': 'skipped'}
+        return jsonify({'mode': mode, 'committed': False, 'results': results}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    committed = False
+    try:
+        for op, entries in _batch_groups(valid):
+            if mode == 'atomic':
+                try:
+                    _batch_execute(cursor, op, entries)
+                except Error as e:
+                    for i, entry_op, _ in entries:
+                        results[i] = {'index': i, 'op': entry_op, 'status': 'error', 'error': str(e)}
+                    raise
+                for i, entry_op, _ in entries:
+                    results[i] = {'index': i, 'op': entry_op, 'status': 'ok'}
+                continue
+
+            # per_item: try the whole run first, fall back to one item at a time
+            cursor.execute("SAVEPOINT batch_group")
+            try:
+                _batch_execute(cursor, op, entries)
+                for i, entry_op, _ in entries:
+                    results[i] = {'index': i, 'op': entry_op, 'status': 'ok'}
+            except Error:
+                cursor.execute("ROLLBACK TO SAVEPOINT batch_group")
+                for entry in entries:
+                    i, entry_op, _ = entry
+                    cursor.execute("SAVEPOINT batch_item")
+                    try:
+                        _batch_execute(cursor, op, [entry])
+                        results[i] = {'index': i, 'op': entry_op, 'status': 'ok'}
+                    except Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT batch_item")
+                        results[i] = {'index': i, 'op': entry_op, 'status': 'error', 'error': str(e)}
+        conn.commit()
+        committed = True
+    except Error:
+        conn.rollback()
+        for i, op, _ in valid:
+            if results[i] is None or results[i]['status'] == 'ok':
+                results[i] = {'index': i, 'op': op, 'status': 'rolled_back'}
+    finally:
+        cursor.close()
+        conn.close()
+
+    if committed:
+        for i, op, params in valid:
+            spec = ADMIN_BATCH_OPS[op]
+            if 'audit' in spec and results[i]['status'] == 'ok':
+                action, entity, id_field = spec['audit']
+                details = {k: v for k, v in params.items() if k != id_field}
+                audit(action, entity, params[id_field], batch=True, **details)
+
+    return jsonify({'mode': mode, 'committed': committed, 'results': results}), (200 if committed else 409)
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+# Heavy admin work runs on a small in-process pool so it never holds a request
+# open. Job rows in MySQL are the source of truth for status, so any worker
+# process can report on (or cancel) a job started by another. Each row records
+# the process running it (Worker, host:pid); the first request a process
+# serves fails the Queued/Running rows of processes on this host that are no
+# longer alive, so a restart does not leave jobs "running" forever.
+JOB_MAX_WORKERS = 2          # keep low: jobs share the DB with interactive traffic
+JOB_MAX_PENDING = 20         # running + queued jobs this process will accept
+JOB_PROGRESS_INTERVAL = 0.5  # seconds between progress writes
+
+job_executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS, thread_name_prefix='capstone-job')
+job_slots = threading.BoundedSemaphore(JOB_MAX_PENDING)
+JOB_TYPES = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """Handed to job functions for progress reporting and cancellation checks."""
+
+    def __init__(self, job_id, params):
+        self.job_id = job_id
+        self.params = params
+        self.total = 0
+        self.done = 0
+        self._last_write = 0.0
+
+    def set_total(self, total):
+        self.total = total
+        _job_update("UPDATE Job SET Total = %s WHERE Job_ID = %s", (total, self.job_id))
+
+    def advance(self, step=1):
+        """Record progress; raises JobCancelled once the job was cancelled."""
+        self.done += step
+        now = time.monotonic()
+        if now - self._last_write < JOB_PROGRESS_INTERVAL and self.done < self.total:
+            return
+        self._last_write = now
+        updated = _job_update(
+            "UPDATE Job SET Progress = %s WHERE Job_ID = %s AND Status = 'Running'",
+            (self.done, self.job_id)
+        )
+        # MySQL counts changed rows, so an unchanged Progress also reports 0;
+        # only a Status other than Running means the job was stopped.
+        if not updated and _job_status(self.job_id) != 'Running':
+            raise JobCancelled()
+
+
+def _job_update(sql, params):
+    """Run one Job-table write on its own short connection; returns rowcount."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _job_status(job_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT Status FROM Job WHERE Job_ID = %s", (job_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _job_worker():
+    return '%s:%d' % (socket.gethostname(), os.getpid())
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # another user's process
+    return True
+
+
+def recover_stale_jobs():
+    """Fail the unfinished jobs of dead processes on this host (and rows
+    from before Worker was recorded); returns their ids."""
+    host = socket.gethostname()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT Job_ID, Worker FROM Job WHERE Status IN ('Queued', 'Running')")
+        stale = []
+        for job_id, worker in cursor.fetchall():
+            worker_host, _, pid = (worker or '').rpartition(':')
+            if worker is None or (worker_host == host and pid.isdigit() and int(pid) != os.getpid()
+                                  and not _pid_alive(int(pid))):
+                stale.append(job_id)
+        if stale:
+            cursor.execute("""
+                UPDATE Job SET Status = 'Failed', Error = 'The process running this job exited', Finished_At = NOW()
+                WHERE Job_ID IN (%s) AND Status IN ('Queued', 'Running')
+            """ % ','.join(['%s'] * len(stale)), stale)
+            conn.commit()
+        return stale
+    finally:
+        cursor.close()
+        conn.close()
+
+
+_jobs_recovered = threading.Event()
+_jobs_recovery_lock = threading.Lock()
+
+
+@app.before_request
+def recover_jobs_once():
+    """Run recover_stale_jobs on the first request this process serves."""
+    if _jobs_recovered.is_set() or not _jobs_recovery_lock.acquire(blocking=False):
+        return
+    try:
+        stale = recover_stale_jobs()
+        if stale:
+            print("Marked stale jobs as failed:", stale)
+        _jobs_recovered.set()
+    except Error as e:
+        print("Job recovery error (retried on the next request):", e)
+    finally:
+        _jobs_recovery_lock.release()
+
+
+def job_type(name):
+    def register(fn):
+        JOB_TYPES[name] = fn
+        return fn
+    return register
+
+
+def _run_job(job_id, name, params):
+    ctx = JobContext(job_id, params)
+    try:
+        started = _job_update(
+            "UPDATE Job SET Status = 'Running', Started_At = NOW() WHERE Job_ID = %s AND Status = 'Queued'",
+            (job_id,)
+        )
+        if not started:  # cancelled while still queued
+            return
+        result = JOB_TYPES[name](ctx)
+        data, content_type = result if result else (None, None)
+        _job_update("""
+            UPDATE Job SET Status = 'Completed', Progress = Total, Result = %s, Result_Type = %s, Finished_At = NOW()
+            WHERE Job_ID = %s AND Status = 'Running'
+        """, (data, content_type, job_id))
+    except JobCancelled:
+        # normally cancel already recorded it; this covers jobs that stop themselves
+        _job_update("""
+            UPDATE Job SET Status = 'Cancelled', Finished_At = NOW()
+            WHERE Job_ID = %s AND Status IN ('Queued', 'Running')
+        """, (job_id,))
+    except Exception as e:
+        _job_update("""
+            UPDATE Job SET Status = 'Failed', Error = %s, Finished_At = NOW()
+            WHERE Job_ID = %s AND Status <> 'Cancelled'
+        """, (str(e), job_id))
+    finally:
+        job_slots.release()
+
+
+def submit_job(name, params):
+    """Queue a job; returns its Job_ID, or None when this process is at capacity."""
+    if not job_slots.acquire(blocking=False):
+        return None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("INSERT INTO Job (Job_Type, Params, Worker) VALUES (%s, %s, %s)",
+                           (name, json.dumps(params), _job_worker()))
+            conn.commit()
+            job_id = cursor.lastrowid
+        finally:
+            cursor.close()
+            conn.close()
+        job_executor.submit(_run_job, job_id, name, params)
+    except Exception:
+        job_slots.release()
+        raise
+    return job_id
+
+
+@job_type('auto_generate_evaluations')
+def job_auto_generate_evaluations(ctx):
+    """Run AutoGenerateEvaluations for every (review, rubric) pair, or the given subset."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        review_ids = ctx.params.get('review_ids')
+        if not review_ids:
+            cursor.execute("SELECT Review_ID FROM Review ORDER BY Review_ID")
+            review_ids = [row[0] for row in cursor.fetchall()]
+        rubric_ids = ctx.params.get('rubric_ids')
+        if not rubric_ids:
+            cursor.execute("SELECT Rubric_ID FROM Rubric ORDER BY Rubric_ID")
+            rubric_ids = [row[0] for row in cursor.fetchall()]
+
+        ctx.set_total(len(review_ids))
+        for review_id in review_ids:
+            for rubric_id in rubric_ids:
+                cursor.callproc('AutoGenerateEvaluations', (review_id, rubric_id))
+            conn.commit()
+            ctx.advance()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@job_type('export_evaluations')
+def job_export_evaluations(ctx):
+    """CSV export of every evaluation, streamed from an unbuffered cursor."""
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM Evaluation")
+        ctx.set_total(cursor.fetchone()[0])
+
+        cursor.execute("""
+            SELECT e.Evaluation_ID, e.Review_ID, rt.Review_Name, e.SRN, s.Name, e.Faculty_ID,
+                   r.Rubric_Name, e.Marks, r.Max_Marks, e.Comments, e.Updated_At
+            FROM Evaluation e
+            JOIN Student s ON e.SRN = s.SRN
+            JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
+            JOIN Review rv ON e.Review_ID = rv.Review_ID
+            JOIN Review_Type rt ON rv.ReviewType_ID = rt.ReviewType_ID
+            ORDER BY e.Review_ID, e.SRN, r.Rubric_Name
+        """)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(['Evaluation_ID', 'Review_ID', 'ReviewType', 'SRN', 'StudentName', 'Faculty_ID',
+                         'Rubric', 'Marks', 'Max_Marks', 'Comments', 'Updated_At'])
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            writer.writerows(rows)
+            ctx.advance(len(rows))
+        return out.getvalue().encode('utf-8'), 'text/csv'
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@job_type('import_students')
+def job_import_students(ctx):
+    """Bulk insert students from CSV text (header: SRN,Name,Email,Sem)."""
+    rows = list(csv.DictReader(io.StringIO(ctx.params.get('csv', ''))))
+    ctx.set_total(len(rows))
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            cursor.executemany(
+                "INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, %s)",
+                [(r['SRN'], r['Name'], r['Email'], int(r['Sem'])) for r in chunk]
+            )
+            conn.commit()
+            shared_cache.invalidate('counts')
+            ctx.advance(len(chunk))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@job_type('recompute_project_status')
+def job_recompute_project_status(ctx):
+    """Set-based version of trg_project_status_update for every team at once."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        ctx.set_total(1)
+        cursor.execute("""
+            UPDATE Project p
+            JOIN Team_Project tp ON tp.Project_ID = p.Project_ID
+            JOIN (
+                SELECT r.Team_ID, COUNT(*) AS total_reviews,
+                       SUM(EXISTS (
+                           SELECT 1 FROM Evaluation e
+                           JOIN Team_Student ts ON e.SRN = ts.SRN
+                           WHERE ts.Team_ID = r.Team_ID AND e.Review_ID = r.Review_ID
+                       )) AS evaluated_reviews
+                FROM Review r
+                GROUP BY r.Team_ID
+            ) rv ON rv.Team_ID = tp.Team_ID
+            SET p.Status = 'Completed'
+            WHERE rv.total_reviews > 0 AND rv.total_reviews = rv.evaluated_reviews
+        """)
+        conn.commit()
+        shared_cache.invalidate('projects')
+        ctx.advance()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _job_row(job_id):
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT Job_ID, Job_Type, Status, Progress, Total, Result_Type, Error,
+               Created_At, Started_At, Finished_At
+        FROM Job WHERE Job_ID = %s
+    """, (job_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return row
+
+
+@app.route('/admin/jobs', methods=['GET', 'POST'])
+def admin_jobs():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    if request.method == 'GET':
+        conn = get_db_connection(); cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT Job_ID, Job_Type, Status, Progress, Total, Created_At, Finished_At
+            FROM Job ORDER BY Job_ID DESC LIMIT 50
+        """)
+        rows = cursor.fetchall()
+        cursor.close(); conn.close()
+        return jsonify(rows)
+
+    payload = request.get_json(silent=True) or {}
+    name = payload.get('type') or request.form.get('type')
+    params = payload.get('params') or {}
+    if 'file' in request.files:
+        params['csv'] = request.files['file'].read().decode('utf-8-sig')
+    if name not in JOB_TYPES:
+        return jsonify({'error': f'Unknown job type: {name}'}), 400
+
+    job_id = submit_job(name, params)
+    if job_id is None:
+        return jsonify({'error': 'Too many jobs pending, try again later'}), 429
+    return jsonify({'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)}), 202
+
+
+@app.route('/admin/jobs/<int:job_id>')
+def admin_job_status(job_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    row = _job_row(job_id)
+    if not row:
+        return jsonify({'error': 'Job not found'}), 404
+    row['percent'] = round(100.0 * row['Progress'] / row['Total'], 1) if row['Total'] else None
+    return jsonify(row)
+
+
+@app.route('/admin/jobs/<int:job_id>/cancel', methods=['POST'])
+def admin_job_cancel(job_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    conn = get_db_connection(); cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE Job SET Status = 'Cancelled', Finished_At = NOW()
+        WHERE Job_ID = %s AND Status IN ('Queued', 'Running')
+    """, (job_id,))
+    conn.commit()
+    cancelled = cursor.rowcount
+    cursor.close(); conn.close()
+    if not cancelled:
+        return jsonify({'error': 'Job is not queued or running'}), 409
+    return jsonify({'job_id': job_id, 'status': 'Cancelled'})
+
+
+@app.route('/admin/jobs/<int:job_id>/result')
+def admin_job_result(job_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    conn = get_db_connection(); cursor = conn.cursor()
+    cursor.execute("SELECT Status, Result, Result_Type, Job_Type FROM Job WHERE Job_ID = %s", (job_id,))
+    row = cursor.fetchone()
+    cursor.close(); conn.close()
+    if not row:
+        return jsonify({'error': 'Job not found'}), 404
+    status, data, content_type, name = row
+    if status != 'Completed' or data is None:
+        return jsonify({'error': 'No result available', 'status': status}), 409
+    ext = {'text/csv': 'csv', 'application/json': 'json', 'application/zip': 'zip'}.get(content_type, 'bin')
+    return Response(bytes(data), mimetype=content_type, headers={
+        'Content-Disposition': f'attachment; filename={name}_{job_id}.{ext}'
+    })
+
+# -----------------------------
+# Live review grading feed (Server-Sent Events)
+# -----------------------------
+# One poller thread per process runs a single change-feed query for every
+# review somebody is watching and fans the rows out to all subscribers, so N
+# admins watching review day cost one indexed range scan per interval.
+REVIEW_FEED_INTERVAL = 2.0    # seconds between change-feed queries
+REVIEW_FEED_OVERLAP = 2       # seconds re-read each poll to catch late commits
+REVIEW_FEED_HEARTBEAT = 15.0  # keep-alive comment for idle streams
+
+REVIEW_EVALUATIONS_SQL = """
+    SELECT
+        e.Evaluation_ID,
+        e.Review_ID,
+        s.SRN,
+        s.Name AS StudentName,
+        r.Rubric_Name,
+        e.Marks,
+        e.Comments,
+        f.Name AS FacultyName,
+        e.Created_At,
+        e.Updated_At
+    FROM Evaluation e
+    JOIN Student s ON e.SRN = s.SRN
+    JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
+    JOIN Faculty f ON e.Faculty_ID = f.Faculty_ID
+"""
+
+
+class ReviewChangeFeed:
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # review_id -> {queue.Queue}
+        self._cursors = {}                    # review_id -> newest Updated_At seen
+        self._seen = {}                       # review_id -> {Evaluation_ID: fingerprint}
+        self._thread = None
+
+    def subscribe(self, review_id):
+        q = queue.Queue(maxsize=1000)
+        with self._lock:
+            self._subscribers[review_id].add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='review-feed', daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, review_id, q):
+        with self._lock:
+            self._subscribers[review_id].discard(q)
+            if not self._subscribers[review_id]:
+                del self._subscribers[review_id]
+                self._cursors.pop(review_id, None)
+                self._seen.pop(review_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                review_ids = list(self._subscribers)
+                if not review_ids:
+                    self._thread = None
+                    return
+            try:
+                self._poll(review_ids)
+            except Error as e:
+                print("Review feed poll error:", e)
+
+    def _poll(self, review_ids):
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT NOW() AS now")
+            db_now = cursor.fetchone()['now']
+            clauses, params = [], []
+            with self._lock:
+                cursors = {rid: self._cursors.setdefault(rid, db_now) for rid in review_ids}
+            for review_id, since in cursors.items():
+                clauses.append("(e.Review_ID = %s AND e.Updated_At >= %s - INTERVAL %s SECOND)")
+                params += [review_id, since, REVIEW_FEED_OVERLAP]
+            cursor.execute(REVIEW_EVALUATIONS_SQL + " WHERE " + " OR ".join(clauses)
+                           + " ORDER BY e.Updated_At, e.Evaluation_ID", params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            changed = defaultdict(list)
+            for row in rows:
+                review_id = row['Review_ID']
+                if review_id not in self._subscribers:
+                    continue  # last subscriber left while we were querying
+                seen = self._seen.setdefault(review_id, {})
+                fingerprint = (row['Updated_At'], row['Marks'], row['Comments'])
+                if seen.get(row['Evaluation_ID']) == fingerprint:
+                    continue
+                seen[row['Evaluation_ID']] = fingerprint
+                changed[review_id].append(row)
+                self._cursors[review_id] = max(self._cursors.get(review_id, db_now), row['Updated_At'])
+
+            for review_id, seen in self._seen.items():
+                horizon = self._cursors.get(review_id, db_now) - timedelta(seconds=REVIEW_FEED_OVERLAP)
+                for eval_id in [k for k, fp in seen.items() if fp[0] < horizon]:
+                    del seen[eval_id]
+            for review_id, review_rows in changed.items():
+                for q in self._subscribers.get(review_id, ()):
+                    try:
+                        q.put_nowait(review_rows)
+                    except queue.Full:
+                        pass  # a stalled client; it resyncs from the snapshot on reconnect
+
+
+review_feed = ReviewChangeFeed(REVIEW_FEED_INTERVAL)
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+
+@app.route('/admin/review_stream/<int:review_id>')
+def admin_review_stream(review_id):
+    """SSE stream: one 'snapshot' event with current evaluations, then an
+    'evaluations' event for every batch of changed rows."""
+    if session.get('role') != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+
+    def generate():
+        # Subscribe before the snapshot so nothing committed in between is lost;
+        # the client upserts by Evaluation_ID, so overlap is harmless. Both
+        # happen once the stream is consumed, inside the try that unsubscribes.
+        yield "retry: 5000\n\n"
+        q = review_feed.subscribe(review_id)
+        try:
+            try:
+                conn = get_db_connection()
+                try:
+                    snapshot = fetch_dicts(conn, REVIEW_EVALUATIONS_SQL + " WHERE e.Review_ID = %s"
+                                           " ORDER BY s.SRN, r.Rubric_Name", (review_id,))
+                finally:
+                    conn.close()
+            except Error as e:
+                yield _sse_event('error', {'error': str(e)})
+                return  # the client reconnects after `retry`
+            yield _sse_event('snapshot', snapshot)
+            while True:
+                try:
+                    rows = q.get(timeout=REVIEW_FEED_HEARTBEAT)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse_event('evaluations', rows)
+        finally:
+            review_feed.unsubscribe(review_id, q)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+# -----------------------------
+# Calendar feeds (iCalendar)
+# -----------------------------
+# Calendar clients poll these without a session, so each feed URL carries a
+# signed token naming its owner. Every poll first runs one small aggregate
+# query over the feed window; unchanged feeds get a 304 from that alone.
+CALENDAR_PAST_DAYS = 30
+CALENDAR_FUTURE_DAYS = 180
+
+calendar_signer = URLSafeSerializer(app.secret_key, salt='calendar-feed')
+
+CALENDAR_QUERIES = {
+    'faculty': {
+        'version': """
+            SELECT COUNT(*) AS n, MAX(Updated_At) AS updated FROM Meeting
+            WHERE Faculty_ID = %(owner)s AND DateTime >= %(start)s AND DateTime < %(end)s
+            UNION ALL
+            SELECT COUNT(*), MAX(r.Updated_At) FROM Review_Panel rp
+            JOIN Review r ON rp.Review_ID = r.Review_ID
+            WHERE rp.Faculty_ID = %(owner)s AND r.Date >= %(start)s AND r.Date < %(end)s
+        """,
+        'meetings': """
+            SELECT m.Meeting_ID, m.Team_ID, m.DateTime, m.Feedback, m.Updated_At, f.Name AS FacultyName
+            FROM Meeting m
+            JOIN Faculty f ON m.Faculty_ID = f.Faculty_ID
+            WHERE m.Faculty_ID = %(owner)s AND m.DateTime >= %(start)s AND m.DateTime < %(end)s
+        """,
+        'reviews': """
+            SELECT r.Review_ID, r.Team_ID, r.Date, r.Start_Time, r.Venue, r.Updated_At, rt.Review_Name
+            FROM Review_Panel rp
+            JOIN Review r ON rp.Review_ID = r.Review_ID
+            JOIN Review_Type rt ON r.ReviewType_ID = rt.ReviewType_ID
+            WHERE rp.Faculty_ID = %(owner)s AND r.Date >= %(start)s AND r.Date < %(end)s
+        """,
+    },
+    'student': {
+        'version': """
+            SELECT COUNT(*) AS n, MAX(m.Updated_At) AS updated FROM Team_Student ts
+            JOIN Meeting m ON m.Team_ID = ts.Team_ID
+            WHERE ts.SRN = %(owner)s AND m.DateTime >= %(start)s AND m.DateTime < %(end)s
+            UNION ALL
+            SELECT COUNT(*), MAX(r.Updated_At) FROM Team_Student ts
+            JOIN Review r ON r.Team_ID = ts.Team_ID
+            WHERE ts.SRN = %(owner)s AND r.Date >= %(start)s AND r.Date < %(end)s
+        """,
+        'meetings': """
+            SELECT m.Meeting_ID, m.Team_ID, m.DateTime, m.Feedback, m.Updated_At, f.Name AS FacultyName
+            FROM Team_Student ts
+            JOIN Meeting m ON m.Team_ID = ts.Team_ID
+            JOIN Faculty f ON m.Faculty_ID = f.Faculty_ID
+            WHERE ts.SRN = %(owner)s AND m.DateTime >= %(start)s AND m.DateTime < %(end)s
+        """,
+        'reviews': """
+            SELECT r.Review_ID, r.Team_ID, r.Date, r.Start_Time, r.Venue, r.Updated_At, rt.Review_Name
+            FROM Team_Student ts
+            JOIN Review r ON r.Team_ID = ts.Team_ID
+            JOIN Review_Type rt ON r.ReviewType_ID = rt.ReviewType_ID
+            WHERE ts.SRN = %(owner)s AND r.Date >= %(start)s AND r.Date < %(end)s
+        """,
+    },
+}
+
+
+def calendar_feed_url(role, owner):
+    token = calendar_signer.dumps({'role': role, 'id': str(owner)})
+    return url_for('calendar_feed', token=token, _external=True)
+
+
+def _ics_escape(text):
+    return (str(text or '').replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _ics_fold(line):
+    """RFC 5545 line folding: at most 75 octets per line, continuation lines start with a space."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts, limit = [], 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_event(uid, stamp, start_line, end_line, summary, location=None, description=None):
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f"DTSTAMP:{stamp.strftime('%Y%m%dT%H%M%SZ')}",
+             start_line, end_line, f'SUMMARY:{_ics_escape(summary)}']
+    if location:
+        lines.append(f'LOCATION:{_ics_escape(location)}')
+    if description:
+        lines.append(f'DESCRIPTION:{_ics_escape(description)}')
+    lines.append('END:VEVENT')
+    return ''.join(_ics_fold(line) for line in lines)
+
+
+def _ics_meeting(m, stamp):
+    start, end = meeting_interval(m['DateTime'])
+    return _ics_event(
+        f"meeting-{m['Meeting_ID']}@capstone", stamp,
+        f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}", f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}",
+        f"Capstone meeting - Team {m['Team_ID']}", description=m['Feedback'] or f"Mentor: {m['FacultyName']}"
+    )
+
+
+def _ics_review(r, stamp):
+    if r['Start_Time'] is None:
+        start_line = f"DTSTART;VALUE=DATE:{r['Date'].strftime('%Y%m%d')}"
+        end_line = f"DTEND;VALUE=DATE:{(r['Date'] + timedelta(days=1)).strftime('%Y%m%d')}"
+    else:
+        start, end = review_interval(r['Date'], r['Start_Time'])
+        start_line = f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}"
+        end_line = f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}"
+    return _ics_event(
+        f"review-{r['Review_ID']}@capstone", stamp, start_line, end_line,
+        f"{r['Review_Name']} review - Team {r['Team_ID']}", location=r['Venue']
+    )
+
+
+@app.route('/calendar/<token>.ics')
+def calendar_feed(token):
+    try:
+        owner = calendar_signer.loads(token)
+    except BadSignature:
+        return Response("Invalid calendar link", status=404, mimetype='text/plain')
+    queries = CALENDAR_QUERIES.get(owner.get('role'))
+    if not queries:
+        return Response("Invalid calendar link", status=404, mimetype='text/plain')
+
+    today = datetime.now().date()
+    params = {
+        'owner': owner['id'],
+        'start': today - timedelta(days=CALENDAR_PAST_DAYS),
+        'end': today + timedelta(days=CALENDAR_FUTURE_DAYS),
+    }
+
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(queries['version'], params)
+    parts = cursor.fetchall()
+    last_modified = max((p['updated'] for p in parts if p['updated']), default=None)
+    if last_modified:
+        last_modified = last_modified.astimezone(timezone.utc)  # TIMESTAMPs come back as naive server-local time
+    etag = hashlib.sha1(repr((owner, params['start'], [(p['n'], p['updated']) for p in parts])).encode()).hexdigest()
+
+    if request.if_none_match.contains(etag) or (
+            last_modified and not request.if_none_match and request.if_modified_since
+            and last_modified.replace(microsecond=0) <= request.if_modified_since):
+        cursor.close()
+        conn.close()
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    def generate():
+        stamp = datetime.now(timezone.utc)
+        try:
+            yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Capstone Management//Calendar//EN\r\n'
+            yield 'CALSCALE:GREGORIAN\r\nX-WR-CALNAME:Capstone\r\n'
+            cursor.execute(queries['meetings'], params)
+            for row in cursor:
+                yield _ics_meeting(row, stamp)
+            cursor.execute(queries['reviews'], params)
+            for row in cursor:
+                yield _ics_review(row, stamp)
+            yield 'END:VCALENDAR\r\n'
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                pass  # client went away mid-stream; the connection close discards the rest
+            conn.close()
+
+    response = Response(generate(), mimetype='text/calendar')
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.max_age = 300
+    return response
+
+# -----------------------------
+# Semester archival
+# -----------------------------
+# ArchiveTerm (db.sql) moves a closed term's reviews, panels, evaluations and
+# meetings into the *_Archive tables in one transaction, so the live tables
+# every dashboard scans only hold open terms. It runs as a background job since
+# a whole cohort can be a lot of rows. Archived data is read back only through
+# /archive/<term_id>; every query there filters on Term_ID, which prunes the
+# archive tables to that term's partition.
+ARCHIVE_QUERIES = {
+    'reviews': """
+        SELECT ra.Review_ID, rt.Review_Name AS ReviewType, ra.Team_ID, ra.Date,
+               TIME_FORMAT(ra.Start_Time, '%%H:%%i') AS StartTime, ra.Venue,
+               GROUP_CONCAT(rpa.Faculty_ID ORDER BY rpa.Faculty_ID) AS FacultyPanel
+        FROM Review_Archive ra
+        LEFT JOIN Review_Type rt ON rt.ReviewType_ID = ra.ReviewType_ID
+        LEFT JOIN Review_Panel_Archive rpa ON rpa.Term_ID = ra.Term_ID AND rpa.Review_ID = ra.Review_ID
+        WHERE ra.Term_ID = %(term)s AND (%(team)s IS NULL OR ra.Team_ID = %(team)s)
+        GROUP BY ra.Review_ID, rt.Review_Name, ra.Team_ID, ra.Date, ra.Start_Time, ra.Venue
+        ORDER BY ra.Date, ra.Review_ID
+    """,
+    'evaluations': """
+        SELECT ea.Evaluation_ID, ea.Review_ID, ea.SRN, s.Name AS StudentName, ea.Faculty_ID,
+               ru.Rubric_Name AS RubricName, ea.Marks, ru.Max_Marks, ea.Comments, ea.Updated_At
+        FROM Evaluation_Archive ea
+        LEFT JOIN Student s ON s.SRN = ea.SRN
+        LEFT JOIN Rubric ru ON ru.Rubric_ID = ea.Rubric_ID
+        WHERE ea.Term_ID = %(term)s
+          AND (%(srn)s IS NULL OR ea.SRN = %(srn)s)
+          AND (%(team)s IS NULL OR ea.Review_ID IN (
+              SELECT Review_ID FROM Review_Archive WHERE Term_ID = %(term)s AND Team_ID = %(team)s
+          ))
+        ORDER BY ea.Review_ID, ea.SRN, ea.Rubric_ID
+    """,
+    'meetings': """
+        SELECT Meeting_ID, Team_ID, Faculty_ID, DateTime, Feedback
+        FROM Meeting_Archive
+        WHERE Term_ID = %(term)s AND (%(team)s IS NULL OR Team_ID = %(team)s)
+        ORDER BY DateTime
+    """,
+}
+
+
+@job_type('archive_term')
+def job_archive_term(ctx):
+    """Run ArchiveTerm for params['term_id']; the result is the row counts moved."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        ctx.set_total(1)
+        cursor.callproc('ArchiveTerm', (int(ctx.params['term_id']),))
+        moved = {}
+        for result in cursor.stored_results():
+            moved = dict(zip(result.column_names, result.fetchone()))
+        conn.commit()
+        shared_cache.invalidate('counts', 'meetings', 'schedule')
+        ctx.advance()
+        return json.dumps(moved).encode('utf-8'), 'application/json'
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/admin/terms', methods=['GET', 'POST'])
+def admin_terms():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
     conn = get_db_connection(); cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Student ORDER BY Name")
+    try:
+        if request.method == 'POST':
+            payload = request.get_json(silent=True) or request.form
+            name = (payload.get('name') or '').strip()
+            try:
+                start = datetime.strptime(payload.get('start_date') or '', '%Y-%m-%d').date()
+                end = datetime.strptime(payload.get('end_date') or '', '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'start_date and end_date must be YYYY-MM-DD'}), 400
+            if not name or end < start:
+                return jsonify({'error': 'A name and an end_date on or after start_date are required'}), 400
+            cursor.execute("INSERT INTO Term (Name, Start_Date, End_Date) VALUES (%s, %s, %s)", (name, start, end))
+            conn.commit()
+            return jsonify({'term_id': cursor.lastrowid}), 201
+
+        cursor.execute("""
+            SELECT Term_ID, Name, Start_Date, End_Date, Archived_At
+            FROM Term ORDER BY Start_Date DESC
+        """)
+        return jsonify(cursor.fetchall())
+    except Error as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/admin/terms/<int:term_id>/archive', methods=['POST'])
+def admin_archive_term(term_id):
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    job_id = submit_job('archive_term', {'term_id': term_id})
+    if job_id is None:
+        return jsonify({'error': 'Too many jobs pending, try again later'}), 429
+    return jsonify({'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)}), 202
+
+
+@app.route('/archive/<int:term_id>')
+def archive_term_data(term_id):
+    """Archived reviews, evaluations and meetings for one term. Admins may filter
+    by ?team_id= / ?srn=; students only ever see their own evaluations."""
+    role = session.get('role')
+    if role == 'admin':
+        team = request.args.get('team_id', type=int)
+        srn = request.args.get('srn') or None
+        sections = ('reviews', 'evaluations', 'meetings')
+    elif role == 'student':
+        team, srn = None, session.get('srn')
+        sections = ('evaluations',)
+    else:
+        return jsonify({'error': 'Access denied'}), 403
+
+    conn = get_db_connection(read_only=True); cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT Term_ID, Name, Start_Date, End_Date, Archived_At
+            FROM Term WHERE Term_ID = %s AND Archived_At IS NOT NULL
+        """, (term_id,))
+        term = cursor.fetchone()
+        if not term:
+            return jsonify({'error': 'Term not found or not archived'}), 404
+        data = {'term': term}
+        params = {'term': term_id, 'team': team, 'srn': srn}
+        for section in sections:
+            cursor.execute(ARCHIVE_QUERIES[section], params)
+            data[section] = cursor.fetchall()
+        return jsonify(data)
+    finally:
+        cursor.close()
+        conn.close()
+
+# -----------------------------
+# Audit log
+# -----------------------------
+# Routes that change grades, records or team membership call audit() after
+# their commit. Entries go into a bounded in-process queue and a single writer
+# thread flushes them to AuditLog with multi-row inserts, so a request pays
+# for a queue put, not a DB round-trip. When the queue is full the request
+# waits briefly for room and, failing that, writes its own entry.
+#
+# Outages and lock timeouts are retried: the writer holds its batch until the
+# database is back and the full queue pushes back on the routes. Any other
+# error means a row itself is bad, so the batch is retried row by row and the
+# rows that still fail go to the dead-letter file instead of wedging the
+# writer. Entries that cannot be stored in time - a direct write during an
+# outage, or whatever is left at shutdown - go there too. `flask audit-replay`
+# loads the file back into AuditLog. An entry is lost only if that file
+# cannot be written either (counted as 'dropped').
+AUDIT_QUEUE_SIZE = 10000     # entries buffered in memory at most
+AUDIT_BATCH_SIZE = 500       # rows per INSERT
+AUDIT_FLUSH_INTERVAL = 1.0   # seconds a partial batch may wait
+AUDIT_PUT_TIMEOUT = 0.5      # seconds a request waits for queue room
+AUDIT_RETRY_DELAY = 2        # seconds between attempts while the DB is down
+AUDIT_MAX_PER_PAGE = 200
+AUDIT_TRANSIENT_ERRNOS = {1205, 1213}  # lock wait timeout, deadlock
+AUDIT_DEAD_LETTER = os.environ.get('CAPSTONE_AUDIT_DEAD_LETTER',
+                                   os.path.join(app.instance_path, 'audit-dead-letter.jsonl'))
+
+AUDIT_INSERT_SQL = """
+    INSERT INTO AuditLog (Occurred_At, Actor_Role, Actor_ID, Action, Entity, Entity_ID, Details)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def is_transient_audit_error(exc):
+    """True when retrying the same rows later can succeed."""
+    return (isinstance(exc, DatabaseUnavailable) or is_db_outage(exc)
+            or getattr(exc, 'errno', None) in AUDIT_TRANSIENT_ERRNOS)
+
+
+class AuditWriter:
+    """Background batch writer for audit entries (tuples in AUDIT_INSERT_SQL order)."""
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # one writer at a time; flush() takes the batch over
+        self._thread = None
+        self._inflight = None                # batch taken off the queue but not stored yet
+        self._closed = False
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'direct': 0, 'failed_flushes': 0,
+                      'dead_lettered': 0, 'dropped': 0}
+
+    def submit(self, entry):
+        self._ensure_thread()
+        try:
+            self._queue.put(entry, timeout=AUDIT_PUT_TIMEOUT)
+            self._count(queued=1)
+        except queue.Full:
+            # backpressure: the writer is behind (or the DB is down), so this
+            # request pays for its own insert instead of growing the buffer
+            self._count(direct=1)
+            batch = [entry]
+            if not self._write(batch):
+                self._dead_letter(batch, 'database unavailable')
+
+    def flush(self):
+        """Write the in-flight batch and everything still buffered; used at
+        shutdown. What cannot be stored now goes to the dead-letter file."""
+        with self._write_lock:
+            self._closed = True
+            batch, self._inflight = self._inflight or [], None
+            batch.extend(self._drain(self._queue.qsize()))
+            while batch:
+                if not self._write(batch):
+                    self._dead_letter(batch, 'database unavailable at shutdown')
+                batch = self._drain(AUDIT_BATCH_SIZE)
+
+    def _count(self, **increments):
+        # request threads, the writer thread and flush() all update stats
+        with self._lock:
+            for name, n in increments.items():
+                self.stats[name] += n
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                    self._thread.start()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._closed:
+            try:
+                entry = self._queue.get(timeout=AUDIT_FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            # collect straight into _inflight so flush() sees every entry taken
+            batch = self._inflight = [entry]
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # keep the batch (and stop draining) until it is stored; the full
+            # queue then pushes back on the routes
+            while True:
+                with self._write_lock:
+                    if self._inflight is not batch:
+                        return  # flush() took it over
+                    if self._write(batch):
+                        self._inflight = None
+                        break
+                time.sleep(AUDIT_RETRY_DELAY)
+
+    def _insert(self, rows):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(AUDIT_INSERT_SQL, rows)
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        self._count(written=len(rows), batches=1)
+
+    def _write(self, batch):
+        """Store batch, dead-lettering rows the database rejects. False (with
+        batch holding the rows still to store) when the error is transient."""
+        try:
+            self._insert(batch)
+            del batch[:]
+            return True
+        except Error as e:
+            print("Audit write error:", e)
+            self._count(failed_flushes=1)
+            if is_transient_audit_error(e):
+                return False
+        # a poison row: find it by storing the rows one at a time, dropping
+        # each from batch as it is settled so a retry never duplicates rows
+        while batch:
+            try:
+                self._insert(batch[:1])
+            except Error as e:
+                if is_transient_audit_error(e):
+                    return False
+                self._dead_letter(batch[:1], str(e))
+            del batch[0]
+        return True
+
+    def _dead_letter(self, entries, reason):
+        try:
+            os.makedirs(os.path.dirname(AUDIT_DEAD_LETTER), exist_ok=True)
+            with open(AUDIT_DEAD_LETTER, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps({'entry': list(entry), 'error': reason}, default=str) + '\n')
+            self._count(dead_lettered=len(entries))
+        except OSError as e:
+            print("Audit dead-letter error, %d entries lost:" % len(entries), e)
+            self._count(dropped=len(entries))
+
+
+audit_writer = AuditWriter()
+atexit.register(audit_writer.flush)
+
+
+@app.cli.command('audit-replay')
+def audit_replay():
+    """Load dead-lettered audit entries into AuditLog; rows that still fail stay in the file."""
+    if not os.path.exists(AUDIT_DEAD_LETTER):
+        click.echo("No dead-lettered audit entries.")
+        return
+    with open(AUDIT_DEAD_LETTER, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    kept = []
+    for record in records:
+        entry = record['entry']
+        entry[0] = datetime.fromisoformat(entry[0])
+        try:
+            audit_writer._insert([tuple(entry)])
+        except Error as e:
+            record['error'] = str(e)
+            kept.append(record)
+    tmp_path = AUDIT_DEAD_LETTER + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in kept:
+            f.write(json.dumps(record, default=str) + '\n')
+    os.replace(tmp_path, AUDIT_DEAD_LETTER)
+    click.echo("Replayed %d entries, %d left in %s." % (len(records) - len(kept), len(kept), AUDIT_DEAD_LETTER))
+
+
+def audit(action, entity, entity_id, **details):
+    """Record a committed change made by the current session's user."""
+    role = session.get('role') if has_request_context() else 'system'
+    actor = {'faculty': session.get('faculty_id'), 'student': session.get('srn')}.get(role) \
+        if has_request_context() else None
+    audit_writer.submit((
+        datetime.now(), role, None if actor is None else str(actor), action, entity,
+        None if entity_id is None else str(entity_id), json.dumps(details, default=str) if details else None
+    ))
+
+
+@app.route('/admin/audit')
+def admin_audit():
+    """Audit trail, newest first. Filters: entity, entity_id, actor, action,
+    since/until (YYYY-MM-DD); page backwards with ?before=<Audit_ID>."""
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    try:
+        limit = min(int(request.args.get('limit', 50)), AUDIT_MAX_PER_PAGE)
+        before = int(request.args['before']) if request.args.get('before') else None
+        since = datetime.strptime(request.args['since'], '%Y-%m-%d') if request.args.get('since') else None
+        until = datetime.strptime(request.args['until'], '%Y-%m-%d') + timedelta(days=1) \
+            if request.args.get('until') else None
+    except ValueError:
+        return jsonify({'error': 'limit/before must be integers and since/until YYYY-MM-DD'}), 400
+
+    filters = {
+        'Entity = %s': request.args.get('entity'),
+        'Entity_ID = %s': request.args.get('entity_id'),
+        'Actor_ID = %s': request.args.get('actor'),
+        'Action = %s': request.args.get('action'),
+        'Audit_ID < %s': before,
+        'Occurred_At >= %s': since,
+        'Occurred_At < %s': until,
+    }
+    where = [clause for clause, value in filters.items() if value is not None and value != '']
+    params = [value for value in filters.values() if value is not None and value != '']
+
+    conn = get_db_connection(read_only=True); cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT Audit_ID, Occurred_At, Actor_Role, Actor_ID, Action, Entity, Entity_ID, Details
+            FROM AuditLog
+            {}
+            ORDER BY Audit_ID DESC
+            LIMIT %s
+        """.format('WHERE ' + ' AND '.join(where) if where else ''), params + [limit + 1])
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for row in rows:
+        row['Details'] = json.loads(row['Details']) if row['Details'] else None
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        'entries': rows,
+        'next_before': rows[-1]['Audit_ID'] if more else None,
+        'pending': audit_writer._queue.qsize(),
+        'writer': audit_writer.stats,
+    })
+
+# -----------------------------
+# Published result snapshots
+# -----------------------------
+# Publishing computes every student's results section (evaluations and
+# review-wise totals) in two set-based queries and stores it as one compact
+# JSON blob per student under a new Result_Release. student_dashboard then
+# reads a single row per view until the next publish. Older releases are kept
+# for RESULT_RELEASES_KEPT publishes so a bad publish can be compared against.
+RESULT_RELEASES_KEPT = 3
+RESULT_INSERT_CHUNK = 500
+RESULT_DECIMAL_FIELDS = {'Score', 'TotalMarks', 'MaxMarks'}  # stored as strings, served as Decimal
+
+RESULT_QUERIES = {
+    'evaluations': """
+        SELECT e.SRN, e.Marks AS Score, f.Name AS FacultyName, e.Comments, e.Project_ID, e.Review_ID
+        FROM Evaluation e
+        LEFT JOIN Faculty f ON e.Faculty_ID = f.Faculty_ID
+        ORDER BY e.SRN, e.Evaluation_ID
+    """,
+    'review_totals': """
+        SELECT
+            sub.SRN,
+            rt.Review_Name AS ReviewType,
+            r.Review_ID,
+            ROUND(SUM(avg_marks),2) AS TotalMarks,
+            ROUND(SUM(MaxTotal),2) AS MaxMarks
+        FROM (
+            SELECT
+                e.SRN,
+                e.Review_ID,
+                e.Rubric_ID,
+                AVG(e.Marks) AS avg_marks,
+                r2.Max_Marks AS MaxTotal
+            FROM Evaluation e
+            JOIN Rubric r2 ON e.Rubric_ID = r2.Rubric_ID
+            GROUP BY e.SRN, e.Review_ID, e.Rubric_ID
+        ) sub
+        JOIN Review r ON r.Review_ID = sub.Review_ID
+        JOIN Review_Type rt ON rt.ReviewType_ID = r.ReviewType_ID
+        GROUP BY sub.SRN, rt.Review_Name, r.Review_ID
+        ORDER BY sub.SRN, r.Review_ID
+    """,
+}
+
+
+def _decimal_fields(row):
+    for key in RESULT_DECIMAL_FIELDS.intersection(row):
+        if row[key] is not None:
+            row[key] = Decimal(row[key])
+    return row
+
+
+def load_result_payload(payload):
+    """Decode a snapshot blob; a release without a row for the student means no results."""
+    if payload is None:
+        return {'evaluations': [], 'review_totals': []}
+    return json.loads(payload, object_hook=_decimal_fields)
+
+
+@job_type('publish_results')
+def job_publish_results(ctx):
+    """Snapshot every student's results under a new release in one transaction."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        payloads = defaultdict(lambda: {'evaluations': [], 'review_totals': []})
+        for section, sql in RESULT_QUERIES.items():
+            cursor.execute(sql)
+            columns = cursor.column_names[1:]
+            for row in cursor.fetchall():
+                payloads[row[0]][section].append(dict(zip(columns, row[1:])))
+
+        ctx.set_total(len(payloads))
+        cursor.execute("INSERT INTO Result_Release (Students) VALUES (%s)", (len(payloads),))
+        release_id = cursor.lastrowid
+        rows = [
+            (release_id, srn, json.dumps(payload, separators=(',', ':'), default=str))
+            for srn, payload in payloads.items()
+        ]
+        for start in range(0, len(rows), RESULT_INSERT_CHUNK):
+            chunk = rows[start:start + RESULT_INSERT_CHUNK]
+            cursor.executemany("INSERT INTO Result_Snapshot (Release_ID, SRN, Payload) VALUES (%s, %s, %s)", chunk)
+            ctx.advance(len(chunk))
+        conn.commit()
+
+        # snapshots of dropped releases go with them (ON DELETE CASCADE)
+        cursor.execute("DELETE FROM Result_Release WHERE Release_ID <= %s", (release_id - RESULT_RELEASES_KEPT,))
+        conn.commit()
+        audit('publish', 'results', release_id, students=len(payloads))
+        return json.dumps({'release_id': release_id, 'students': len(payloads)}).encode('utf-8'), 'application/json'
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.route('/admin/results/publish', methods=['POST'])
+def admin_publish_results():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    job_id = submit_job('publish_results', {})
+    if job_id is None:
+        return jsonify({'error': 'Too many jobs pending, try again later'}), 429
+    return jsonify({'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)}), 202
+
+
+@app.route('/admin/results/releases')
+def admin_result_releases():
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    conn = get_db_connection(read_only=True); cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT Release_ID, Published_At, Students FROM Result_Release ORDER BY Release_ID DESC")
     rows = cursor.fetchall()
     cursor.close(); conn.close()
     return jsonify(rows)
 
+# -----------------------------
+# Team membership routines
+# -----------------------------
+# add_teammate, admin_add_team and admin_add_team_member each call one stored
+# procedure (see db.sql) that does every check and write server side and
+# answers with a (Status, Team_ID, Detail) row. The routes only map Status to
+# a flash message and commit, instead of holding a transaction open across up
+# to eight dependent queries. `flask bench-team-routines` compares the two.
+# The routines lock the team row before counting its members, so the 4-member
+# cap holds under concurrent joins; `flask bench-team-joins` races them.
+TEAM_STATUS_CHANGED = {'ADDED', 'JOINED', 'CREATED'}
+
+STUDENT_TEAM_MESSAGES = {
+    'STUDENT_NOT_FOUND': ("Your record was not found.", "danger"),
+    'TEAMMATE_NOT_FOUND': ("Teammate SRN not found.", "danger"),
+    'SEM_MISMATCH': ("Teammate must be in your semester.", "warning"),
+    'TEAMMATE_IN_TEAM': ("That student is already in another team.", "warning"),
+    'TEAM_FULL': ("Your team already has 4 members.", "warning"),
+    'TEAM_NOT_FOUND': ("That team does not exist.", "warning"),
+    'JOIN_TEAM_FULL': ("That team is already full (4 members).", "warning"),
+    'ADDED': ("{detail} added to your team!", "success"),
+    'JOINED': ("You have successfully joined the team!", "success"),
+    'CREATED': ("New team created successfully!", "success"),
+    'UNCHANGED': ("You are already in Team {team_id}. Enter a teammate's SRN to add them.", "info"),
+}
+
+ADMIN_TEAM_MESSAGES = {
+    'NO_MEMBERS': ("Select at least one student to form a team.", "warning"),
+    'TEAM_TOO_LARGE': ("A team cannot have more than 4 members.", "warning"),
+    'FACULTY_NOT_FOUND': ("Faculty {detail} does not exist.", "danger"),
+    'STUDENT_NOT_FOUND': ("Unknown student SRN(s): {detail}", "danger"),
+    'ALREADY_ASSIGNED': ("Cannot create team. These students are already assigned to a team: {detail}", "danger"),
+    'CREATED': ("Team {team_id} created successfully with {detail} member(s).", "success"),
+    'TEAM_NOT_FOUND': ("Team {team_id} does not exist.", "warning"),
+    'TEAM_FULL': ("Team {team_id} already has 4 members. Cannot add more.", "warning"),
+    'ALREADY_IN_TEAM': ("Student {srn} already belongs to Team {detail}.", "danger"),
+    'ADDED': ("Student {detail} added to Team {team_id}.", "success"),
+}
+
+
+def call_routine(cursor, name, args=()):
+    """CALL a stored procedure in one round trip and return its first result set.
+
+    cursor.callproc() costs three (SET of the arguments, the CALL, a SELECT of
+    the OUT values) even when every parameter is IN."""
+    cursor.execute("CALL %s(%s)" % (name, ', '.join(['%s'] * len(args))), tuple(args))
+    rows = cursor.fetchall() if cursor.with_rows else []
+    while cursor.nextset():
+        if cursor.with_rows:
+            cursor.fetchall()
+    return rows
+
+
+def flash_team_status(messages, row, **extra):
+    """Flash the message a membership routine's Status maps to, if any."""
+    if row['Status'] in messages:
+        text, category = messages[row['Status']]
+        flash(text.format(team_id=row['Team_ID'], detail=row['Detail'], **extra), category)
+
+
+def _legacy_add_member(cursor, team_id, srn):
+    """admin_add_team_member as it was before AdminAddTeamMember: one query per check."""
+    cursor.execute("SELECT COUNT(*) AS cnt FROM Team_Student WHERE Team_ID = %s", (team_id,))
+    if cursor.fetchone()['cnt'] >= 4:
+        return
+    cursor.execute("SELECT Team_ID FROM Team_Student WHERE SRN = %s", (srn,))
+    if cursor.fetchone():
+        return
+    cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (team_id, srn))
+
+
+def _legacy_create_team(cursor, srn):
+    """add_teammate's create-a-team branch as it was before StudentAddTeammate."""
+    cursor.execute("SELECT SRN, Sem FROM Student WHERE SRN = %s", (srn,))
+    cursor.fetchone()
+    cursor.execute("SELECT Team_ID FROM Team_Student WHERE SRN = %s", (srn,))
+    if cursor.fetchone():
+        return
+    cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (NULL)")
+    cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (%s, %s)", (cursor.lastrowid, srn))
+
+
+@app.cli.command('bench-team-routines')
+@click.option('--repeat', default=200, show_default=True, help='Runs per flow and mode.')
+def bench_team_routines(repeat):
+    """Round trips and latency of the membership flows, Python-side vs. one CALL.
+
+    Every run is rolled back, so the database is left as it was. Round trips
+    are the server's own count of client statements (Questions)."""
+    try:
+        conn = get_db_connection()
+    except DatabaseUnavailable as e:
+        raise click.ClickException("Could not connect to the database: %s" % e)
+    cursor = conn.cursor(dictionary=True)
+
+    def questions():
+        cursor.execute("SHOW SESSION STATUS LIKE 'Questions'")
+        return int(cursor.fetchone()['Value'])
+
+    try:
+        cursor.execute("""
+            SELECT s.SRN FROM Student s LEFT JOIN Team_Student ts ON ts.SRN = s.SRN
+            WHERE ts.SRN IS NULL LIMIT 1
+        """)
+        free = cursor.fetchone()
+        cursor.execute("SELECT Team_ID FROM Team_Student GROUP BY Team_ID HAVING COUNT(*) < 4 LIMIT 1")
+        team = cursor.fetchone()
+        if free is None or team is None:
+            raise click.ClickException("Need a student without a team and a team with fewer than 4 members")
+        srn, team_id = free['SRN'], team['Team_ID']
+        baseline = questions()
+        overhead = questions() - baseline  # the probe counts itself
+
+        flows = [
+            ('add member', lambda: _legacy_add_member(cursor, team_id, srn),
+             lambda: call_routine(cursor, 'AdminAddTeamMember', (team_id, srn))),
+            ('create team', lambda: _legacy_create_team(cursor, srn),
+             lambda: call_routine(cursor, 'StudentAddTeammate', (srn, None, None))),
+        ]
+        click.echo("%-14s %10s %10s %12s %12s" % ('flow', 'python rt', 'call rt', 'python ms', 'call ms'))
+        for label, *modes in flows:
+            trips, timings = [], []
+            for run in modes:
+                before = questions()
+                run()
+                trips.append(questions() - before - overhead)
+                conn.rollback()
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    run()
+                    conn.rollback()
+                timings.append((time.perf_counter() - started) * 1000 / repeat)
+            click.echo("%-14s %10d %10d %12.3f %12.3f" % (label, trips[0], trips[1], timings[0], timings[1]))
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+
+@app.cli.command('bench-team-joins')
+@click.option('--threads', default=16, show_default=True, help='Concurrent joining sessions.')
+@click.option('--teams', default=10, show_default=True, help='Teams to fill.')
+@click.option('--students', default=200, show_default=True, help='Students racing for the seats.')
+def bench_team_joins(threads, teams, students):
+    """Race students joining a few teams and check that none goes over 4 members.
+
+    Works on throwaway BENCH- students and teams that it creates and deletes
+    again. Each thread has its own connection (outside the pool) and each join
+    is committed, so the locks are contended the way they are in production."""
+    srns = ['BENCH-%05d' % i for i in range(students)]
+    setup = mysql.connector.connect(**db_config)
+    cursor = setup.cursor()
+    team_ids = []
+    try:
+        cursor.executemany(
+            "INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, 1)",
+            [(srn, srn, srn.lower() + '@bench.invalid') for srn in srns],
+        )
+        for _ in range(teams):
+            cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (NULL)")
+            team_ids.append(cursor.lastrowid)
+        setup.commit()
+
+        local = threading.local()
+        sessions = []
+        counts = defaultdict(int)
+        counts_lock = threading.Lock()
+
+        def join(srn):
+            if not hasattr(local, 'conn'):
+                local.conn = mysql.connector.connect(**db_config)
+                local.cursor = local.conn.cursor(dictionary=True)
+                with counts_lock:
+                    sessions.append(local.conn)
+            outcome = 'no seat'
+            for team_id in random.sample(team_ids, len(team_ids)):
+                while True:
+                    try:
+                        row = call_routine(local.cursor, 'StudentAddTeammate', (srn, None, team_id))[0]
+                        local.conn.commit()
+                        break
+                    except Error as e:
+                        local.conn.rollback()
+                        if e.errno not in (1205, 1213):  # lock wait timeout, deadlock: retry
+                            raise
+                        with counts_lock:
+                            counts['retries'] += 1
+                with counts_lock:
+                    counts['attempts'] += 1
+                if row['Status'] == 'JOINED':
+                    outcome = 'joined'
+                    break
+            with counts_lock:
+                counts[outcome] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='bench-join') as pool:
+            list(pool.map(join, srns))
+        elapsed = time.perf_counter() - started
+        for conn in sessions:
+            conn.close()
+
+        cursor.execute(
+            "SELECT Team_ID, COUNT(*) FROM Team_Student WHERE Team_ID IN (%s) GROUP BY Team_ID"
+            % ','.join(['%s'] * len(team_ids)), tuple(team_ids),
+        )
+        sizes = dict(cursor.fetchall())
+        click.echo("threads %d, teams %d, students %d: %.2fs" % (threads, teams, students, elapsed))
+        click.echo("joined %d, no seat %d, attempts %d (%.0f/s), lock retries %d" % (
+            counts['joined'], counts['no seat'], counts['attempts'], counts['attempts'] / elapsed, counts['retries']))
+        click.echo("largest team %d, members placed %d of %d seats" % (
+            max(sizes.values(), default=0), sum(sizes.values()), 4 * teams))
+        if max(sizes.values(), default=0) > 4 or sum(sizes.values()) != counts['joined']:
+            raise click.ClickException("Team size cap violated: %s" % sizes)
+    finally:
+        setup.rollback()
+        if team_ids:
+            cursor.execute("DELETE FROM Team WHERE Team_ID IN (%s)" % ','.join(['%s'] * len(team_ids)), tuple(team_ids))
+        cursor.execute("DELETE FROM Student WHERE SRN LIKE 'BENCH-%'")
+        setup.commit()
+        cursor.close()
+        setup.close()
+
+# -----------------------------
+# Faculty grading workspace (delta sync)
+# -----------------------------
+# A grading client loads the faculty member's panel reviews once, fetches a
+# review's evaluations when it is opened, and from then on only asks for what
+# changed: it sends the watermark from its last response and gets the rows
+# past it in (Updated_At, Evaluation_ID) order, read through
+# ix_eval_faculty_updated, plus the ids deleted since (Evaluation_Tombstone)
+# and the current list of its review ids (a deleted or archived review takes
+# its evaluations with it). The watermark never passes NOW() minus
+# WORKSPACE_SYNC_OVERLAP, so rows committed a little late are still picked up;
+# the client upserts by Evaluation_ID, so rows sent twice are harmless.
+# Everything reads the primary: replica lag would break the watermark.
+WORKSPACE_SYNC_LIMIT = 500        # changed rows per response; `more` means ask again
+WORKSPACE_SYNC_OVERLAP = 2        # seconds the watermark stays behind the DB clock
+WORKSPACE_TOMBSTONE_DAYS = 30     # tombstone retention in trg_eval_tombstone
+WORKSPACE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+WORKSPACE_EVALUATIONS_SQL = """
+    SELECT e.Evaluation_ID, e.Review_ID, e.SRN, s.Name AS StudentName, e.Rubric_ID,
+           r.Rubric_Name, e.Project_ID, e.Marks, e.Comments, e.Updated_At
+    FROM Evaluation e
+    JOIN Student s ON e.SRN = s.SRN
+    JOIN Rubric r ON e.Rubric_ID = r.Rubric_ID
+"""
+
+
+def _workspace_rows(rows):
+    for row in rows:
+        row['Updated_At'] = row['Updated_At'].strftime(WORKSPACE_TIME_FORMAT)
+    return rows
+
+
+def _watermark(updated_at, evaluation_id):
+    return {'since': updated_at.strftime(WORKSPACE_TIME_FORMAT), 'after_id': evaluation_id}
+
+
+@app.route('/faculty/workspace')
+def faculty_workspace():
+    """Panel reviews plus the watermark to start syncing from."""
+    if session.get('role') != 'faculty':
+        return jsonify({'error': 'Access denied'}), 403
+    faculty_id = session.get('faculty_id')
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # taken before anything is loaded, so the first sync covers the loads
+        cursor.execute("SELECT NOW() - INTERVAL %s SECOND AS since", (WORKSPACE_SYNC_OVERLAP,))
+        since = cursor.fetchone()['since']
+        reviews = run_prepared(conn, 'faculty_panel_reviews', (faculty_id,))
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify({'reviews': reviews, 'watermark': _watermark(since, 0)})
+
+
+@app.route('/faculty/workspace/reviews/<int:review_id>')
+def faculty_workspace_review(review_id):
+    """This faculty member's evaluations for one of their panel reviews."""
+    if session.get('role') != 'faculty':
+        return jsonify({'error': 'Access denied'}), 403
+    faculty_id = session.get('faculty_id')
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT 1 FROM Review_Panel WHERE Review_ID = %s AND Faculty_ID = %s", (review_id, faculty_id))
+        if cursor.fetchone() is None:
+            return jsonify({'error': 'Review not found'}), 404
+        cursor.execute(WORKSPACE_EVALUATIONS_SQL + """
+            WHERE e.Faculty_ID = %s AND e.Review_ID = %s
+            ORDER BY s.SRN, r.Rubric_Name
+        """, (faculty_id, review_id))
+        evaluations = _workspace_rows(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify({'review_id': review_id, 'evaluations': evaluations})
+
+
+@app.route('/faculty/workspace/sync')
+def faculty_workspace_sync():
+    """Evaluations changed and deleted since ?since=...&after_id=..., with the next watermark."""
+    if session.get('role') != 'faculty':
+        return jsonify({'error': 'Access denied'}), 403
+    try:
+        since = datetime.strptime(request.args['since'], WORKSPACE_TIME_FORMAT)
+        after_id = int(request.args.get('after_id', 0))
+    except (KeyError, ValueError):
+        return jsonify({'error': 'since (YYYY-MM-DD HH:MM:SS) and after_id are required'}), 400
+    faculty_id = session.get('faculty_id')
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT NOW() AS now")
+        db_now = cursor.fetchone()['now']
+        if since < db_now - timedelta(days=WORKSPACE_TOMBSTONE_DAYS):
+            # deletions that old are forgotten; reload from /faculty/workspace
+            return jsonify({'reset': True})
+
+        cursor.execute(WORKSPACE_EVALUATIONS_SQL + """
+            WHERE e.Faculty_ID = %s AND e.Updated_At >= %s
+              AND (e.Updated_At > %s OR e.Evaluation_ID > %s)
+            ORDER BY e.Updated_At, e.Evaluation_ID
+            LIMIT %s
+        """, (faculty_id, since, since, after_id, WORKSPACE_SYNC_LIMIT + 1))
+        rows = cursor.fetchall()
+        more = len(rows) > WORKSPACE_SYNC_LIMIT
+        rows = rows[:WORKSPACE_SYNC_LIMIT]
+
+        cursor.execute("SELECT Evaluation_ID FROM Evaluation_Tombstone WHERE Faculty_ID = %s AND Deleted_At >= %s",
+                       (faculty_id, since))
+        deleted = [row['Evaluation_ID'] for row in cursor.fetchall()]
+        cursor.execute("SELECT Review_ID FROM Review_Panel WHERE Faculty_ID = %s", (faculty_id,))
+        review_ids = [row['Review_ID'] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+
+    mark = (rows[-1]['Updated_At'], rows[-1]['Evaluation_ID']) if rows else (since, after_id)
+    if not more:
+        mark = min(mark, (db_now - timedelta(seconds=WORKSPACE_SYNC_OVERLAP), 0))
+    return jsonify({
+        'evaluations': _workspace_rows(rows),
+        'deleted': deleted,
+        'review_ids': review_ids,
+        'watermark': _watermark(*mark),
+        'more': more,
+        'reset': False,
+    })
+
+# -----------------------------
+# Report cards (PDF)
+# -----------------------------
+# End-of-semester report cards: team, mentor, project, meeting feedback and
+# each review's rubric marks (averaged over the panel, as on the dashboard)
+# with totals. All data comes from four bulk queries; the cards are then
+# rendered to PDF on a process pool, REPORT_CHUNK students per task, by a
+# small built-in writer (standard Helvetica, no fonts embedded, so there is
+# nothing to install). Each finished PDF is renamed into place and its data
+# digest appended to the directory's manifest, so a re-run - after an
+# interruption or at the next term - only renders students whose data changed.
+# Run it with `flask report-cards OUT_DIR [--zip FILE|-]` or as the
+# 'report_cards' job, whose result is the ZIP.
+REPORT_DIR = os.environ.get('CAPSTONE_REPORT_DIR', os.path.join(RUNTIME_DIR, 'report-cards'))
+REPORT_WORKERS = os.cpu_count() or 1
+# Workers start from a fresh interpreter, not a fork: this process has pool
+# connections and background threads (audit writer, jobs, feeds) that a forked
+# child would inherit mid-flight, locks included.
+REPORT_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+REPORT_CHUNK = 50                 # students per pool task
+REPORT_MANIFEST = '.manifest'     # "SRN digest" lines, appended as PDFs land
+
+REPORT_QUERIES = {
+    'students': """
+        SELECT s.SRN, s.Name, s.Email, s.Sem, ts.Team_ID, f.Name AS Mentor
+        FROM Student s
+        LEFT JOIN Team_Student ts ON ts.SRN = s.SRN
+        LEFT JOIN Team t ON t.Team_ID = ts.Team_ID
+        LEFT JOIN Faculty f ON f.Faculty_ID = t.Faculty_ID
+        WHERE (%(sem)s IS NULL OR s.Sem = %(sem)s)
+        ORDER BY s.SRN
+    """,
+    'projects': """
+        SELECT tp.Team_ID, p.Title, p.Status
+        FROM Team_Project tp
+        JOIN Project p ON p.Project_ID = tp.Project_ID
+        WHERE (%(sem)s IS NULL OR tp.Team_ID IN (
+            SELECT ts.Team_ID FROM Team_Student ts JOIN Student s ON s.SRN = ts.SRN WHERE s.Sem = %(sem)s
+        ))
+        ORDER BY tp.Team_ID, p.Title
+    """,
+    'meetings': """
+        SELECT m.Team_ID, m.DateTime, f.Name AS FacultyName, m.Feedback
+        FROM Meeting m
+        LEFT JOIN Faculty f ON f.Faculty_ID = m.Faculty_ID
+        WHERE (%(sem)s IS NULL OR m.Team_ID IN (
+            SELECT ts.Team_ID FROM Team_Student ts JOIN Student s ON s.SRN = ts.SRN WHERE s.Sem = %(sem)s
+        ))
+        ORDER BY m.Team_ID, m.DateTime
+    """,
+    'marks': """
+        SELECT e.SRN, e.Review_ID, rt.Review_Name, rv.Date, ru.Rubric_Name,
+               ROUND(AVG(e.Marks), 2) AS Marks, ru.Max_Marks
+        FROM Evaluation e
+        JOIN Student s ON s.SRN = e.SRN
+        JOIN Review rv ON rv.Review_ID = e.Review_ID
+        JOIN Review_Type rt ON rt.ReviewType_ID = rv.ReviewType_ID
+        JOIN Rubric ru ON ru.Rubric_ID = e.Rubric_ID
+        WHERE (%(sem)s IS NULL OR s.Sem = %(sem)s)
+        GROUP BY e.SRN, e.Review_ID, rt.Review_Name, rv.Date, e.Rubric_ID, ru.Rubric_Name, ru.Max_Marks
+        ORDER BY e.SRN, rv.Date, e.Review_ID, ru.Rubric_Name
+    """,
+}
+
+
+def load_report_cards(sem=None):
+    """One plain dict per student (picklable, so it can cross to the pool), ordered by SRN."""
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor()
+    try:
+        results = {}
+        for name, sql in REPORT_QUERIES.items():
+            cursor.execute(sql, {'sem': sem})
+            results[name] = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    cards, members = {}, defaultdict(list)
+    for srn, name, email, student_sem, team_id, mentor in results['students']:
+        cards[srn] = {'srn': srn, 'name': name, 'email': email, 'sem': student_sem, 'team_id': team_id,
+                      'mentor': mentor, 'members': members[team_id] if team_id else [],
+                      'projects': [], 'meetings': [], 'reviews': [], 'total': Decimal(0), 'max': Decimal(0)}
+        if team_id:
+            members[team_id].append(name)
+
+    projects, meetings = defaultdict(list), defaultdict(list)
+    for team_id, title, status in results['projects']:
+        projects[team_id].append((title, status))
+    for team_id, when, faculty, feedback in results['meetings']:
+        meetings[team_id].append((when, faculty, feedback))
+    for card in cards.values():
+        card['projects'] = projects.get(card['team_id'], [])
+        card['meetings'] = meetings.get(card['team_id'], [])
+
+    for srn, review_id, review_name, date, rubric, marks, max_marks in results['marks']:
+        card = cards.get(srn)
+        if card is None:
+            continue
+        if not card['reviews'] or card['reviews'][-1]['id'] != review_id:
+            card['reviews'].append({'id': review_id, 'name': review_name, 'date': date, 'rubrics': [],
+                                    'total': Decimal(0), 'max': Decimal(0)})
+        marks, max_marks = Decimal(str(marks)), Decimal(str(max_marks))
+        review = card['reviews'][-1]
+        review['rubrics'].append((rubric, marks, max_marks))
+        review['total'] += marks
+        review['max'] += max_marks
+        card['total'] += marks
+        card['max'] += max_marks
+    return list(cards.values())
+
+
+def report_card_digest(card):
+    return hashlib.sha256(json.dumps(card, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+class PdfDocument:
+    """Just enough PDF 1.4 for text reports: A4 pages, Helvetica and
+    Helvetica-Bold in WinAnsi encoding, lines flowing down the page with
+    automatic page breaks. Output is deterministic for the same content."""
+
+    WIDTH, HEIGHT, MARGIN = 595, 842, 50
+
+    def __init__(self, title):
+        self.title = title
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self._ops = []
+        self.pages.append(self._ops)
+        self._y = self.HEIGHT - self.MARGIN
+
+    def space(self, points):
+        self._y -= points
+
+    def row(self, cells, size=10, bold=False):
+        """One line of (x offset, text) cells."""
+        if self._y - size < self.MARGIN:
+            self.new_page()
+        self._y -= size * 1.4
+        font = '/F2' if bold else '/F1'
+        for x, text in cells:
+            self._ops.append(b'BT %s %d Tf %.1f %.1f Td (%s) Tj ET' % (
+                font.encode(), size, self.MARGIN + x, self._y, self._escape(text)))
+
+    def text(self, text, size=10, bold=False, indent=0):
+        """A paragraph, wrapped to the page width (Helvetica averages about half an em per glyph)."""
+        width = int((self.WIDTH - 2 * self.MARGIN - indent) / (size * 0.5))
+        for line in textwrap.wrap(str(text), width) or ['']:
+            self.row([(indent, line)], size, bold)
+
+    def rule(self):
+        self._y -= 4
+        self._ops.append(b'0.5 w %d %.1f m %d %.1f l S' % (
+            self.MARGIN, self._y, self.WIDTH - self.MARGIN, self._y))
+        self._y -= 2
+
+    @staticmethod
+    def _escape(text):
+        raw = str(text).encode('cp1252', 'replace')
+        return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+    def to_bytes(self):
+        # objects: 1 catalog, 2 page tree, 3-4 fonts, 5 info, then (page, content) pairs
+        objects = [None, None,
+                   b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+                   b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+                   b'<< /Title (%s) /Producer (capstone) >>' % self._escape(self.title)]
+        kids = []
+        for ops in self.pages:
+            stream = zlib.compress(b'\n'.join(ops))
+            page_no = len(objects) + 1
+            kids.append(b'%d 0 R' % page_no)
+            objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+                           b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>'
+                           % (self.WIDTH, self.HEIGHT, page_no + 1))
+            objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+        out = io.BytesIO()
+        out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(out.tell())
+            out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+        xref = out.tell()
+        out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        out.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+        out.write(b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                  % (len(objects) + 1, xref))
+        return out.getvalue()
+
+
+def render_report_card(card):
+    doc = PdfDocument('Report card - %s' % card['srn'])
+    doc.row([(0, 'Capstone Project Report Card')], size=16, bold=True)
+    doc.space(4)
+    doc.row([(0, card['name']), (300, 'SRN: %s' % card['srn'])], size=11, bold=True)
+    doc.row([(0, card['email']), (300, 'Semester: %s' % card['sem'])])
+    doc.rule()
+
+    doc.row([(0, 'Team')], size=12, bold=True)
+    if card['team_id']:
+        doc.row([(0, 'Team %s' % card['team_id']), (300, 'Mentor: %s' % (card['mentor'] or 'not assigned'))])
+        doc.text('Members: ' + ', '.join(card['members']))
+    else:
+        doc.row([(0, 'Not in a team')])
+    for title, status in card['projects'] or [('No project assigned', None)]:
+        doc.text('Project: %s%s' % (title, ' (%s)' % status if status else ''))
+    doc.rule()
+
+    doc.row([(0, 'Reviews')], size=12, bold=True)
+    if not card['reviews']:
+        doc.row([(0, 'No evaluations yet')])
+    for review in card['reviews']:
+        doc.space(4)
+        doc.row([(0, review['name']), (300, review['date'].strftime('%d %b %Y') if review['date'] else '')], bold=True)
+        for rubric, marks, max_marks in review['rubrics']:
+            doc.row([(12, rubric), (380, '%s / %s' % (marks, max_marks))])
+        doc.row([(12, 'Total'), (380, '%s / %s' % (review['total'], review['max']))], bold=True)
+    if card['reviews']:
+        doc.space(4)
+        doc.row([(0, 'Overall'), (380, '%s / %s' % (card['total'], card['max']))], size=11, bold=True)
+    doc.rule()
+
+    doc.row([(0, 'Meeting feedback')], size=12, bold=True)
+    if not card['meetings']:
+        doc.row([(0, 'No meetings recorded')])
+    for when, faculty, feedback in card['meetings']:
+        doc.space(2)
+        doc.row([(0, when.strftime('%d %b %Y %H:%M')), (300, faculty or '')], size=9, bold=True)
+        doc.text(feedback or 'No feedback', size=9, indent=12)
+    return doc.to_bytes()
+
+
+def _render_report_chunk(cards):
+    """Pool task: [(SRN, PDF bytes)] for a chunk of cards."""
+    return [(card['srn'], render_report_card(card)) for card in cards]
+
+
+def _read_report_manifest(out_dir):
+    digests = {}
+    try:
+        with open(os.path.join(out_dir, REPORT_MANIFEST)) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and line.endswith('\n'):  # a torn last line is ignored
+                    digests[parts[0]] = parts[1]
+    except FileNotFoundError:
+        pass
+    return digests
+
+
+def plan_report_cards(out_dir, sem=None):
+    """(cards, pending) where pending are the (card, digest) pairs without an up-to-date PDF in out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    cards = load_report_cards(sem)
+    done = _read_report_manifest(out_dir)
+    pending = []
+    for card in cards:
+        digest = report_card_digest(card)
+        if done.get(card['srn']) != digest or not os.path.exists(os.path.join(out_dir, card['srn'] + '.pdf')):
+            pending.append((card, digest))
+    return cards, pending
+
+
+def render_report_cards(out_dir, pending, workers=REPORT_WORKERS):
+    """Render pending cards on a process pool into out_dir; yields the number
+    written after each chunk. Closing the generator cancels what is left."""
+    digests = dict((card['srn'], digest) for card, digest in pending)
+    chunks = [[card for card, _ in pending[i:i + REPORT_CHUNK]] for i in range(0, len(pending), REPORT_CHUNK)]
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(REPORT_START_METHOD))
+    try:
+        with open(os.path.join(out_dir, REPORT_MANIFEST), 'a') as manifest:
+            for future in as_completed([pool.submit(_render_report_chunk, chunk) for chunk in chunks]):
+                rendered = future.result()
+                for srn, pdf in rendered:
+                    path = os.path.join(out_dir, srn + '.pdf')
+                    with open(path + '.part', 'wb') as f:
+                        f.write(pdf)
+                    os.replace(path + '.part', path)
+                manifest.write(''.join('%s %s\n' % (srn, digests[srn]) for srn, _ in rendered))
+                manifest.flush()
+                yield len(rendered)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def compact_report_manifest(out_dir, cards):
+    """Rewrite the manifest with one line per current student."""
+    path = os.path.join(out_dir, REPORT_MANIFEST)
+    with open(path + '.part', 'w') as f:
+        f.write(''.join('%s %s\n' % (card['srn'], report_card_digest(card)) for card in cards))
+    os.replace(path + '.part', path)
+
+
+def write_report_zip(out_dir, cards, stream):
+    """ZIP of the cards' PDFs; works on unseekable streams. The PDFs are already deflated, so they are stored."""
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as archive:
+        for card in cards:
+            archive.write(os.path.join(out_dir, card['srn'] + '.pdf'), card['srn'] + '.pdf')
+
+
+@app.cli.command('report-cards')
+@click.argument('out_dir', type=click.Path(file_okay=False))
+@click.option('--sem', type=int, default=None, help='Only students in this semester.')
+@click.option('--workers', default=REPORT_WORKERS, show_default=True, help='Render processes.')
+@click.option('--zip', 'zip_path', default=None, help='Also pack the cards into this ZIP ("-" for stdout).')
+def report_cards(out_dir, sem, workers, zip_path):
+    """Render a PDF report card per student into OUT_DIR.
+
+    Re-running resumes: cards already in OUT_DIR whose data is unchanged are
+    skipped."""
+    log = click.get_text_stream('stderr') if zip_path == '-' else None
+    started = time.perf_counter()
+    cards, pending = plan_report_cards(out_dir, sem)
+    click.echo("%d students, %d up to date, %d to render on %d processes"
+               % (len(cards), len(cards) - len(pending), len(pending), workers), file=log)
+    render_started = time.perf_counter()
+    rendered = 0
+    with click.progressbar(length=len(pending), label='Rendering', file=log) as bar:
+        for count in render_report_cards(out_dir, pending, workers):
+            rendered += count
+            bar.update(count)
+    render_seconds = time.perf_counter() - render_started
+    compact_report_manifest(out_dir, cards)
+
+    if zip_path:
+        if zip_path == '-':
+            write_report_zip(out_dir, cards, click.get_binary_stream('stdout'))
+        else:
+            with open(zip_path, 'wb') as f:
+                write_report_zip(out_dir, cards, f)
+    click.echo("rendered %d in %.2fs (%.1f students/s), %.2fs in total"
+               % (rendered, render_seconds, rendered / render_seconds if rendered else 0,
+                  time.perf_counter() - started), file=log)
+
+
+@job_type('report_cards')
+def job_report_cards(ctx):
+    """Render report cards (params: optional sem) into REPORT_DIR and return them as a ZIP."""
+    sem = ctx.params.get('sem')
+    sem = int(sem) if sem not in (None, '') else None
+    out_dir = os.path.join(REPORT_DIR, 'sem-%d' % sem if sem else 'all')
+    cards, pending = plan_report_cards(out_dir, sem)
+    ctx.set_total(len(cards))
+    if len(pending) < len(cards):
+        ctx.advance(len(cards) - len(pending))  # up to date from an earlier run
+
+    started = time.perf_counter()
+    rendering = render_report_cards(out_dir, pending)
+    try:
+        for count in rendering:
+            ctx.advance(count)  # raises JobCancelled; closing the generator stops the pool
+    finally:
+        rendering.close()
+    seconds = time.perf_counter() - started
+    compact_report_manifest(out_dir, cards)
+
+    out = io.BytesIO()
+    write_report_zip(out_dir, cards, out)
+    audit('generate', 'report_cards', ctx.job_id, sem=sem, rendered=len(pending), skipped=len(cards) - len(pending),
+          students_per_second=round(len(pending) / seconds, 1) if pending else None)
+    return out.getvalue(), 'application/zip'
+
+# -----------------------------
+# Integrity scanner
+# -----------------------------
+# The routes write with plain statements rather than the stored procedures, so
+# a few invariants can drift. Each check below is one set-based query that
+# uses primary keys and existing indexes only. The two checks over big tables
+# (Evaluation, Review) walk the primary key in ranges of INTEGRITY_CHUNK ids,
+# so no statement scans the whole table or holds a long-lived snapshot. With
+# repair on, violations are fixed INTEGRITY_REPAIR_BATCH at a time, each batch
+# in its own transaction. Every repair statement re-derives the fix when it
+# runs, so a row that changed after the scan is left alone or fixed correctly.
+# Evaluations are re-pointed only when the team has exactly one project, so
+# team_projects runs first. Which duplicate project a team keeps comes from the
+# audit log, since ids say nothing about which assignment was meant. A team
+# with a row the log does not cover is only reported.
+INTEGRITY_CHUNK = 50000          # primary key ids per chunked query
+INTEGRITY_REPAIR_BATCH = 1000    # violations fixed per transaction
+INTEGRITY_SAMPLE = 20            # violating rows listed per check
+
+IntegrityCheck = namedtuple('IntegrityCheck', 'description find chunk_by key repair invalidates')
+
+# Project_ID of a team's most recent audited assign_project ({team}: the Team_ID
+# column). Found through ix_audit_entity, newest first.
+TEAM_AUDITED_PROJECT_SQL = """(
+    SELECT CAST(a.Details ->> '$.project_id' AS UNSIGNED)
+    FROM AuditLog a
+    WHERE a.Entity = 'team' AND a.Entity_ID = CAST({team} AS CHAR) AND a.Action = 'assign_project'
+    ORDER BY a.Audit_ID DESC LIMIT 1
+)"""
+
+# Teams with more than one Team_Project row, with the number of those rows that
+# have no audited assign_project. Such a row may have been added after the
+# audited choice, so those teams are only reported.
+TEAM_DUPLICATE_PROJECTS_SQL = """(
+    SELECT dup.Team_ID, SUM(a.Audit_ID IS NULL) AS Unaudited
+    FROM Team_Project dup
+    LEFT JOIN AuditLog a ON a.Entity = 'team' AND a.Entity_ID = CAST(dup.Team_ID AS CHAR)
+     AND a.Action = 'assign_project' AND CAST(a.Details ->> '$.project_id' AS UNSIGNED) = dup.Project_ID
+    GROUP BY dup.Team_ID
+    HAVING COUNT(DISTINCT dup.Project_ID) > 1
+)"""
+
+INTEGRITY_CHECKS = {
+    'team_projects': IntegrityCheck(
+        "Teams with more than one Team_Project row; the project of the team's latest audited "
+        "assign_project is kept, teams without one, whose audited project is not among theirs, or "
+        "with a row no audited assign_project covers (it may be newer) are only reported",
+        find="""
+            SELECT tp.Team_ID, tp.Project_ID, k.Keep_Project_ID
+            FROM Team_Project tp
+            JOIN (
+                SELECT d.Team_ID, kept.Project_ID AS Keep_Project_ID
+                FROM """ + TEAM_DUPLICATE_PROJECTS_SQL + """ d
+                LEFT JOIN Team_Project kept ON kept.Team_ID = d.Team_ID AND d.Unaudited = 0
+                 AND kept.Project_ID = """ + TEAM_AUDITED_PROJECT_SQL.format(team='d.Team_ID') + """
+            ) k ON k.Team_ID = tp.Team_ID
+            WHERE k.Keep_Project_ID IS NULL OR tp.Project_ID <> k.Keep_Project_ID
+            ORDER BY tp.Team_ID, tp.Project_ID
+        """,
+        chunk_by=None,
+        key=('Team_ID', 'Project_ID'),
+        repair="""
+            DELETE tp FROM Team_Project tp
+            JOIN """ + TEAM_DUPLICATE_PROJECTS_SQL + """ d ON d.Team_ID = tp.Team_ID AND d.Unaudited = 0
+            JOIN Team_Project kept ON kept.Team_ID = tp.Team_ID AND kept.Project_ID <> tp.Project_ID
+            WHERE (tp.Team_ID, tp.Project_ID) IN ({keys})
+              AND kept.Project_ID = """ + TEAM_AUDITED_PROJECT_SQL.format(team='tp.Team_ID') + """
+        """,
+        invalidates=('projects',)),
+    'evaluation_projects': IntegrityCheck(
+        "Evaluations whose Project_ID is not their team's project; re-pointed when the team has "
+        "exactly one project and no identical evaluation exists for it",
+        find="""
+            SELECT e.Evaluation_ID, e.SRN, e.Project_ID, MIN(tp.Project_ID) AS Team_Project_ID,
+                   COUNT(DISTINCT tp.Project_ID) AS Team_Projects
+            FROM Evaluation e
+            JOIN Team_Student ts ON ts.SRN = e.SRN
+            JOIN Team_Project tp ON tp.Team_ID = ts.Team_ID
+            WHERE e.Evaluation_ID BETWEEN %(lo)s AND %(hi)s
+            GROUP BY e.Evaluation_ID, e.SRN, e.Project_ID
+            HAVING SUM(tp.Project_ID = e.Project_ID) = 0
+            ORDER BY e.Evaluation_ID
+        """,
+        chunk_by=('Evaluation', 'Evaluation_ID'),
+        key='Evaluation_ID',
+        repair="""
+            UPDATE IGNORE Evaluation e
+            JOIN Team_Student ts ON ts.SRN = e.SRN
+            JOIN Team_Project tp ON tp.Team_ID = ts.Team_ID
+            SET e.Project_ID = tp.Project_ID
+            WHERE e.Evaluation_ID IN ({keys})
+              AND (SELECT COUNT(*) FROM Team_Project x WHERE x.Team_ID = ts.Team_ID) = 1
+        """,
+        invalidates=()),
+    'review_panels': IntegrityCheck(
+        "Reviews whose panel does not include the team's mentor; the mentor is added",
+        find="""
+            SELECT r.Review_ID, r.Team_ID, t.Faculty_ID AS Mentor_ID
+            FROM Review r
+            JOIN Team t ON t.Team_ID = r.Team_ID
+            LEFT JOIN Review_Panel rp ON rp.Review_ID = r.Review_ID AND rp.Faculty_ID = t.Faculty_ID
+            WHERE r.Review_ID BETWEEN %(lo)s AND %(hi)s
+              AND t.Faculty_ID IS NOT NULL AND rp.Review_ID IS NULL
+            ORDER BY r.Review_ID
+        """,
+        chunk_by=('Review', 'Review_ID'),
+        key='Review_ID',
+        repair="""
+            INSERT IGNORE INTO Review_Panel (Review_ID, Faculty_ID)
+            SELECT r.Review_ID, t.Faculty_ID
+            FROM Review r
+            JOIN Team t ON t.Team_ID = r.Team_ID
+            WHERE r.Review_ID IN ({keys}) AND t.Faculty_ID IS NOT NULL
+        """,
+        invalidates=('schedule',)),
+    'meeting_mentors': IntegrityCheck(
+        "Upcoming meetings held by someone other than the team's current mentor (left over from a "
+        "mentor reassignment); moved to the current mentor, teams without one are only reported",
+        find="""
+            SELECT m.Meeting_ID, m.Team_ID, m.DateTime, m.Faculty_ID, t.Faculty_ID AS Mentor_ID
+            FROM Meeting m
+            JOIN Team t ON t.Team_ID = m.Team_ID
+            WHERE m.DateTime >= NOW() AND (t.Faculty_ID IS NULL OR m.Faculty_ID <> t.Faculty_ID)
+            ORDER BY m.DateTime
+        """,
+        chunk_by=None,
+        key='Meeting_ID',
+        repair="""
+            UPDATE Meeting m
+            JOIN Team t ON t.Team_ID = m.Team_ID
+            SET m.Faculty_ID = t.Faculty_ID
+            WHERE m.Meeting_ID IN ({keys}) AND t.Faculty_ID IS NOT NULL AND m.Faculty_ID <> t.Faculty_ID
+        """,
+        invalidates=('meetings', 'schedule')),
+}
+
+
+def _integrity_violations(conn, cursor, check):
+    """Violating rows, one list per query (per id range for chunked checks).
+    The read transaction is ended after each query so no snapshot is held."""
+    if check.chunk_by is None:
+        ranges = [(None, None)]
+    else:
+        table, column = check.chunk_by
+        cursor.execute(f"SELECT MIN({column}) AS lo, MAX({column}) AS hi FROM {table}")
+        bounds = cursor.fetchone()
+        ranges = [] if bounds['lo'] is None else [
+            (lo, lo + INTEGRITY_CHUNK - 1) for lo in range(bounds['lo'], bounds['hi'] + 1, INTEGRITY_CHUNK)
+        ]
+    for lo, hi in ranges:
+        cursor.execute(check.find, {'lo': lo, 'hi': hi})
+        rows = cursor.fetchall()
+        conn.rollback()
+        if rows:
+            yield rows
+
+
+def _integrity_repair(conn, cursor, check, rows):
+    """Fix rows in batches, one transaction each; returns the rows changed."""
+    fixed = 0
+    for start in range(0, len(rows), INTEGRITY_REPAIR_BATCH):
+        batch = rows[start:start + INTEGRITY_REPAIR_BATCH]
+        if isinstance(check.key, tuple):
+            marker = '(%s)' % ', '.join(['%s'] * len(check.key))
+            params = [row[column] for row in batch for column in check.key]
+        else:
+            marker = '%s'
+            params = [row[check.key] for row in batch]
+        cursor.execute(check.repair.format(keys=', '.join([marker] * len(batch))), params)
+        fixed += cursor.rowcount
+        conn.commit()
+    return fixed
+
+
+def scan_integrity(names=None, repair=False, on_check=None):
+    """Run the named checks (all by default, in INTEGRITY_CHECKS order) and
+    return {check: {description, violations, repaired, sample, seconds}}."""
+    conn = get_db_connection(read_only=not repair)
+    cursor = conn.cursor(dictionary=True)
+    report = {}
+    try:
+        for name in names or INTEGRITY_CHECKS:
+            check = INTEGRITY_CHECKS[name]
+            started = time.perf_counter()
+            result = report[name] = {'description': check.description, 'violations': 0, 'repaired': 0, 'sample': []}
+            for rows in _integrity_violations(conn, cursor, check):
+                result['violations'] += len(rows)
+                result['sample'] += rows[:INTEGRITY_SAMPLE - len(result['sample'])]
+                if repair:
+                    result['repaired'] += _integrity_repair(conn, cursor, check, rows)
+            if result['repaired']:
+                if check.invalidates:
+                    shared_cache.invalidate(*check.invalidates)
+                audit('repair', 'integrity', name, violations=result['violations'], repaired=result['repaired'])
+            result['seconds'] = round(time.perf_counter() - started, 3)
+            if on_check:
+                on_check(name)
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return report
+
+
+@app.cli.command('integrity-scan')
+@click.argument('checks', nargs=-1)
+@click.option('--repair', is_flag=True, help='Fix what can be fixed, in batched transactions.')
+@click.option('--sample', is_flag=True, help='Print some violating rows per check.')
+def integrity_scan(checks, repair, sample):
+    """Check the schema's cross-table invariants (all checks by default)."""
+    unknown = set(checks) - set(INTEGRITY_CHECKS)
+    if unknown:
+        raise click.BadParameter("unknown check(s): " + ', '.join(sorted(unknown)))
+    report = scan_integrity([name for name in INTEGRITY_CHECKS if name in checks] or None, repair)
+    click.echo("%-22s %10s %10s %8s" % ('check', 'violations', 'repaired', 'seconds'))
+    for name, result in report.items():
+        click.echo("%-22s %10d %10d %8.3f" % (name, result['violations'], result['repaired'], result['seconds']))
+        if sample and result['sample']:
+            click.echo("    " + result['description'])
+            for row in result['sample']:
+                click.echo("    %s" % row)
+    if not repair and any(result['violations'] for result in report.values()):
+        raise click.ClickException("Integrity violations found (re-run with --repair to fix them)")
+
+
+@job_type('integrity_scan')
+def job_integrity_scan(ctx):
+    """scan_integrity with params checks (default all) and repair (default false); the result is the report."""
+    names = [name for name in INTEGRITY_CHECKS if name in (ctx.params.get('checks') or INTEGRITY_CHECKS)]
+    ctx.set_total(len(names))
+    report = scan_integrity(names, bool(ctx.params.get('repair')), on_check=lambda name: ctx.advance())
+    return json.dumps(report, default=str).encode('utf-8'), 'application/json'
+
+
+@app.route('/admin/integrity', methods=['GET', 'POST'])
+def admin_integrity():
+    """GET scans and reports right away (?check= may repeat); POST queues a
+    repair run as the integrity_scan job."""
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    payload = request.get_json(silent=True) or {}
+    checks = request.args.getlist('check') or payload.get('checks') or []
+    unknown = set(checks) - set(INTEGRITY_CHECKS)
+    if unknown:
+        return jsonify({'error': 'Unknown check(s): ' + ', '.join(sorted(unknown))}), 400
+    checks = [name for name in INTEGRITY_CHECKS if name in checks]
+
+    if request.method == 'GET':
+        return jsonify(scan_integrity(checks or None))
+
+    job_id = submit_job('integrity_scan', {'checks': checks, 'repair': payload.get('repair', True)})
+    if job_id is None:
+        return jsonify({'error': 'Too many jobs pending, try again later'}), 429
+    return jsonify({'job_id': job_id, 'status_url': url_for('admin_job_status', job_id=job_id)}), 202
+
 # -----------------------------
 # Error handlers (optional)
 # -----------------------------
@@ -17,14 +17,16 @@ USE capstoneprojectdb;
 CREATE TABLE IF NOT EXISTS Faculty (
   Faculty_ID INT NOT NULL PRIMARY KEY,
   Name VARCHAR(100) NOT NULL,
-  Email VARCHAR(100) UNIQUE NOT NULL
+  Email VARCHAR(100) UNIQUE NOT NULL,
+  FULLTEXT KEY ft_faculty (Name, Email)
 );
 
 CREATE TABLE IF NOT EXISTS Student (
   SRN VARCHAR(20) NOT NULL PRIMARY KEY,
   Name VARCHAR(100) NOT NULL,
   Email VARCHAR(100) UNIQUE NOT NULL,
-  Sem INT NOT NULL CHECK (Sem BETWEEN 1 AND 8)
+  Sem INT NOT NULL CHECK (Sem BETWEEN 1 AND 8),
+  FULLTEXT KEY ft_student (Name, Email)
 );
 
 CREATE TABLE IF NOT EXISTS Team (
@@ -39,7 +41,8 @@ CREATE TABLE IF NOT EXISTS Project (
   Title VARCHAR(255) NOT NULL,
   Description TEXT NULL,
   Status ENUM('Ongoing', 'Completed', 'Cancelled') 
-      NOT NULL DEFAULT 'Ongoing'
+      NOT NULL DEFAULT 'Ongoing',
+  FULLTEXT KEY ft_project (Title, Description)
 );
 
 CREATE TABLE IF NOT EXISTS Rubric (
@@ -74,6 +77,11 @@ CREATE TABLE IF NOT EXISTS Meeting (
   Team_ID INT NOT NULL,
   DateTime DATETIME NOT NULL,
   Feedback TEXT NULL,
+  Updated_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  FULLTEXT KEY ft_meeting_feedback (Feedback),
+  KEY ix_meeting_datetime (DateTime),
+  KEY ix_meeting_faculty_datetime (Faculty_ID, DateTime), -- calendar feeds
+  KEY ix_meeting_team_datetime (Team_ID, DateTime),
   FOREIGN KEY (Faculty_ID) REFERENCES Faculty (Faculty_ID)
     ON DELETE CASCADE ON UPDATE CASCADE,
   FOREIGN KEY (Team_ID) REFERENCES Team (Team_ID)
@@ -90,7 +98,11 @@ CREATE TABLE IF NOT EXISTS Review (
   ReviewType_ID INT NOT NULL,
   Team_ID INT NOT NULL,
   Date DATE NOT NULL,
+  Start_Time TIME NULL, -- NULL = time not set yet (not checked for scheduling conflicts)
   Venue VARCHAR(100) NULL,
+  Updated_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY ix_review_date (Date),
+  KEY ix_review_team_date (Team_ID, Date),
   FOREIGN KEY (ReviewType_ID) REFERENCES Review_Type (ReviewType_ID)
     ON DELETE CASCADE ON UPDATE CASCADE,
   FOREIGN KEY (Team_ID) REFERENCES Team (Team_ID)
@@ -120,6 +132,8 @@ CREATE TABLE IF NOT EXISTS Evaluation (
   Created_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
   Updated_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   UNIQUE KEY ux_eval_unique (Faculty_ID, SRN, Rubric_ID, Project_ID, Review_ID),
+  KEY ix_eval_review_updated (Review_ID, Updated_At), -- live review change feed
+  KEY ix_eval_faculty_updated (Faculty_ID, Updated_At), -- faculty workspace delta sync
   FOREIGN KEY (Faculty_ID) REFERENCES Faculty (Faculty_ID)
     ON DELETE RESTRICT ON UPDATE CASCADE,
   FOREIGN KEY (SRN) REFERENCES Student (SRN)
@@ -132,6 +146,135 @@ CREATE TABLE IF NOT EXISTS Evaluation (
     ON DELETE CASCADE ON UPDATE CASCADE
 );
 
+-- Evaluations deleted by statement (not by ON DELETE CASCADE, which fires no
+-- trigger), so the faculty workspace sync can tell clients to drop them
+CREATE TABLE IF NOT EXISTS Evaluation_Tombstone (
+  Evaluation_ID INT NOT NULL PRIMARY KEY,
+  Faculty_ID INT NOT NULL,
+  Review_ID INT NOT NULL,
+  Deleted_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  KEY ix_tombstone_faculty (Faculty_ID, Deleted_At),
+  KEY ix_tombstone_deleted (Deleted_At)
+);
+
+-- Background jobs: long-running admin operations executed by the app's worker pool
+CREATE TABLE IF NOT EXISTS Job (
+  Job_ID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Job_Type VARCHAR(50) NOT NULL,
+  Params JSON NULL,
+  Status ENUM('Queued', 'Running', 'Completed', 'Failed', 'Cancelled')
+      NOT NULL DEFAULT 'Queued',
+  Progress INT NOT NULL DEFAULT 0,
+  Total INT NOT NULL DEFAULT 0,
+  Result LONGBLOB NULL,
+  Result_Type VARCHAR(100) NULL,
+  Error TEXT NULL,
+  Created_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  Started_At TIMESTAMP NULL,
+  Finished_At TIMESTAMP NULL,
+  Worker VARCHAR(100) NULL, -- host:pid of the process that runs it
+  KEY ix_job_status (Status, Created_At)
+);
+
+-- Published student results: each publish creates a release holding one
+-- compact JSON blob per student (evaluations + review-wise totals) that the
+-- student dashboard serves until the next publish
+CREATE TABLE IF NOT EXISTS Result_Release (
+  Release_ID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Published_At TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  Students INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS Result_Snapshot (
+  Release_ID INT NOT NULL,
+  SRN VARCHAR(20) NOT NULL,
+  Payload MEDIUMTEXT NOT NULL,
+  PRIMARY KEY (Release_ID, SRN),
+  FOREIGN KEY (Release_ID) REFERENCES Result_Release (Release_ID)
+    ON DELETE CASCADE
+);
+
+-- Append-only audit trail of grade, record and team-membership changes,
+-- written in batches by the app's background audit writer
+CREATE TABLE IF NOT EXISTS AuditLog (
+  Audit_ID BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Occurred_At DATETIME(6) NOT NULL,
+  Actor_Role VARCHAR(20) NULL,
+  Actor_ID VARCHAR(20) NULL,
+  Action VARCHAR(50) NOT NULL,
+  Entity VARCHAR(30) NOT NULL,
+  Entity_ID VARCHAR(50) NULL,
+  Details JSON NULL,
+  KEY ix_audit_entity (Entity, Entity_ID),
+  KEY ix_audit_actor (Actor_ID),
+  KEY ix_audit_occurred (Occurred_At)
+);
+
+-- Academic terms. Archiving a closed term moves its reviews (with panels and
+-- evaluations) and meetings out of the live tables into the *_Archive tables,
+-- so dashboard queries only ever scan open terms.
+CREATE TABLE IF NOT EXISTS Term (
+  Term_ID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Name VARCHAR(50) NOT NULL UNIQUE,
+  Start_Date DATE NOT NULL,
+  End_Date DATE NOT NULL,
+  Archived_At TIMESTAMP NULL,
+  CHECK (End_Date >= Start_Date)
+);
+
+-- Archive tables mirror the live columns plus Term_ID. InnoDB cannot partition
+-- tables that have foreign keys, so the live tables stay unpartitioned; the
+-- archives drop the FKs (history outlives deleted teams) and are partitioned
+-- by term so a per-term read prunes to a single partition.
+CREATE TABLE IF NOT EXISTS Review_Archive (
+  Term_ID INT NOT NULL,
+  Review_ID INT NOT NULL,
+  ReviewType_ID INT NOT NULL,
+  Team_ID INT NOT NULL,
+  Date DATE NOT NULL,
+  Start_Time TIME NULL,
+  Venue VARCHAR(100) NULL,
+  Updated_At TIMESTAMP NOT NULL,
+  PRIMARY KEY (Term_ID, Review_ID),
+  KEY ix_review_archive_team (Term_ID, Team_ID)
+) PARTITION BY HASH (Term_ID) PARTITIONS 8;
+
+CREATE TABLE IF NOT EXISTS Review_Panel_Archive (
+  Term_ID INT NOT NULL,
+  Review_ID INT NOT NULL,
+  Faculty_ID INT NOT NULL,
+  PRIMARY KEY (Term_ID, Review_ID, Faculty_ID)
+) PARTITION BY HASH (Term_ID) PARTITIONS 8;
+
+CREATE TABLE IF NOT EXISTS Evaluation_Archive (
+  Term_ID INT NOT NULL,
+  Evaluation_ID INT NOT NULL,
+  Faculty_ID INT NOT NULL,
+  SRN VARCHAR(20) NOT NULL,
+  Rubric_ID INT NOT NULL,
+  Project_ID INT NOT NULL,
+  Review_ID INT NOT NULL,
+  Marks DECIMAL(7,2) NOT NULL,
+  Comments TEXT NULL,
+  Created_At TIMESTAMP NOT NULL,
+  Updated_At TIMESTAMP NOT NULL,
+  PRIMARY KEY (Term_ID, Evaluation_ID),
+  KEY ix_eval_archive_review (Term_ID, Review_ID),
+  KEY ix_eval_archive_srn (Term_ID, SRN)
+) PARTITION BY HASH (Term_ID) PARTITIONS 8;
+
+CREATE TABLE IF NOT EXISTS Meeting_Archive (
+  Term_ID INT NOT NULL,
+  Meeting_ID INT NOT NULL,
+  Faculty_ID INT NOT NULL,
+  Team_ID INT NOT NULL,
+  DateTime DATETIME NOT NULL,
+  Feedback TEXT NULL,
+  Updated_At TIMESTAMP NOT NULL,
+  PRIMARY KEY (Term_ID, Meeting_ID),
+  KEY ix_meeting_archive_team (Term_ID, Team_ID)
+) PARTITION BY HASH (Term_ID) PARTITIONS 8;
+
 -- =====================================================
 -- INITIAL SAMPLE DATA (faculty, students, teams, projects, reviews, rubrics, evaluations)
 -- Note: No users table / no user mapping stored in DB (authentication simulated via DB users/roles)
@@ -212,6 +355,9 @@ INSERT INTO Evaluation (Faculty_ID, SRN, Rubric_ID, Project_ID, Review_ID, Marks
 (103, 'PES1UG21CS005', 1, 3, 3, 9.5, 'Excellent concept'),
 (103, 'PES1UG21CS006', 2, 3, 3, 8.8, 'Well executed');
 
+INSERT INTO Term (Name, Start_Date, End_Date) VALUES
+('2025 Spring', '2025-01-01', '2025-06-30');
+
 -- =====================================================
 -- FUNCTIONS: semester total and grade mapping
 -- =====================================================
@@ -405,6 +551,256 @@ END$$
 
 
 
+-- JSON-array variants of AddReviewForTeam / StudentCreateTeam: the lists are
+-- expanded with JSON_TABLE into temporary tables, validated with one query
+-- per rule and the panels / members inserted with single INSERT ... SELECT
+-- statements, so a call can create many reviews or teams at once.
+--
+-- The reviews and teams themselves are inserted one at a time and each id is
+-- read back with LAST_INSERT_ID(), so every list entry is tied to its own row
+-- no matter what else is inserting concurrently. Both procedures run in the
+-- caller's transaction (no COMMIT), like SetReviewPanelsJSON. The caller
+-- commits or rolls back.
+
+-- ADMIN: [{"review_type_id": 1, "team_id": 2, "date": "2025-03-01",
+--          "start_time": "10:00" | null, "venue": "...", "panel": [101, 102]}, ...]
+-- The team's mentor is always added to the panel. Returns (ord, Review_ID).
+CREATE PROCEDURE AddReviewsForTeamsJSON(
+    IN reviews_json JSON
+)
+BEGIN
+    DECLARE n INT DEFAULT 1;
+    DECLARE review_count INT;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_new_review, tmp_new_panel;
+    CREATE TEMPORARY TABLE tmp_new_review (
+        ord INT NOT NULL PRIMARY KEY,
+        Review_ID INT NULL,
+        ReviewType_ID INT NULL,
+        Team_ID INT NULL,
+        Rev_Date DATE NULL,
+        Start_Time TIME NULL,
+        Venue VARCHAR(100) NULL,
+        Panel JSON NULL,
+        Team_Exists BOOL NOT NULL,
+        Mentor_ID INT NULL
+    );
+    CREATE TEMPORARY TABLE tmp_new_panel (
+        ord INT NOT NULL,
+        Faculty_ID INT NOT NULL,
+        Is_Mentor BOOL NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (ord, Faculty_ID)
+    );
+
+    INSERT INTO tmp_new_review (ord, ReviewType_ID, Team_ID, Rev_Date, Start_Time, Venue, Panel, Team_Exists, Mentor_ID)
+    SELECT jt.ord, jt.review_type_id, jt.team_id, jt.rev_date, jt.start_time, jt.venue, jt.panel,
+           t.Team_ID IS NOT NULL, t.Faculty_ID
+    FROM JSON_TABLE(reviews_json, '$[*]' COLUMNS (
+        ord FOR ORDINALITY,
+        review_type_id INT PATH '$.review_type_id',
+        team_id INT PATH '$.team_id',
+        rev_date DATE PATH '$.date',
+        start_time TIME PATH '$.start_time',
+        venue VARCHAR(100) PATH '$.venue',
+        panel JSON PATH '$.panel'
+    )) jt
+    LEFT JOIN Team t ON t.Team_ID = jt.team_id;
+
+    IF EXISTS (SELECT 1 FROM tmp_new_review WHERE ReviewType_ID IS NULL OR Team_ID IS NULL OR Rev_Date IS NULL) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Each review needs review_type_id, team_id and date';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM tmp_new_review WHERE NOT Team_Exists) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Review list names a team that does not exist';
+    END IF;
+
+    INSERT IGNORE INTO tmp_new_panel (ord, Faculty_ID)
+    SELECT n.ord, p.fid
+    FROM tmp_new_review n,
+         JSON_TABLE(COALESCE(n.Panel, JSON_ARRAY()), '$[*]' COLUMNS (fid INT PATH '$')) p
+    WHERE p.fid IS NOT NULL;
+
+    INSERT INTO tmp_new_panel (ord, Faculty_ID, Is_Mentor)
+    SELECT ord, Mentor_ID, TRUE FROM tmp_new_review WHERE Mentor_ID IS NOT NULL
+    ON DUPLICATE KEY UPDATE Is_Mentor = TRUE;
+
+    IF EXISTS (
+        SELECT 1 FROM tmp_new_panel p LEFT JOIN Faculty f ON f.Faculty_ID = p.Faculty_ID
+        WHERE f.Faculty_ID IS NULL
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Panel names a faculty member that does not exist';
+    END IF;
+
+    -- ord runs 1..N (FOR ORDINALITY)
+    SELECT COUNT(*) INTO review_count FROM tmp_new_review;
+    WHILE n <= review_count DO
+        INSERT INTO Review (ReviewType_ID, Team_ID, Date, Start_Time, Venue)
+        SELECT ReviewType_ID, Team_ID, Rev_Date, Start_Time, Venue
+        FROM tmp_new_review WHERE ord = n;
+        UPDATE tmp_new_review SET Review_ID = LAST_INSERT_ID() WHERE ord = n;
+        SET n = n + 1;
+    END WHILE;
+
+    -- mentor rows first: trg_mentor_in_panel rejects other members until the mentor is on the panel
+    INSERT INTO Review_Panel (Review_ID, Faculty_ID)
+    SELECT n.Review_ID, p.Faculty_ID
+    FROM tmp_new_panel p
+    JOIN tmp_new_review n ON n.ord = p.ord
+    ORDER BY p.ord, p.Is_Mentor DESC;
+
+    SELECT ord, Review_ID FROM tmp_new_review ORDER BY ord;
+    DROP TEMPORARY TABLE tmp_new_review, tmp_new_panel;
+END$$
+
+-- ADMIN: replace the panels of existing reviews, [{"review_id": 5, "panel": [101, 103]}, ...].
+-- The team's mentor is always kept. Runs in the caller's transaction (no COMMIT)
+-- so it can be combined with an UPDATE of the reviews themselves.
+CREATE PROCEDURE SetReviewPanelsJSON(
+    IN panels_json JSON
+)
+BEGIN
+    DROP TEMPORARY TABLE IF EXISTS tmp_panel_review, tmp_panel;
+    CREATE TEMPORARY TABLE tmp_panel_review (
+        Review_ID INT NOT NULL PRIMARY KEY,
+        Mentor_ID INT NULL,
+        Panel JSON NULL
+    );
+    CREATE TEMPORARY TABLE tmp_panel (
+        Review_ID INT NOT NULL,
+        Faculty_ID INT NOT NULL,
+        Is_Mentor BOOL NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (Review_ID, Faculty_ID)
+    );
+
+    INSERT INTO tmp_panel_review (Review_ID, Mentor_ID, Panel)
+    SELECT r.Review_ID, t.Faculty_ID, jt.panel
+    FROM JSON_TABLE(panels_json, '$[*]' COLUMNS (
+        review_id INT PATH '$.review_id',
+        panel JSON PATH '$.panel'
+    )) jt
+    JOIN Review r ON r.Review_ID = jt.review_id
+    JOIN Team t ON t.Team_ID = r.Team_ID;
+
+    IF ROW_COUNT() <> JSON_LENGTH(panels_json) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Panel list names a review that does not exist';
+    END IF;
+
+    INSERT IGNORE INTO tmp_panel (Review_ID, Faculty_ID)
+    SELECT pr.Review_ID, p.fid
+    FROM tmp_panel_review pr,
+         JSON_TABLE(COALESCE(pr.Panel, JSON_ARRAY()), '$[*]' COLUMNS (fid INT PATH '$')) p
+    WHERE p.fid IS NOT NULL;
+
+    INSERT INTO tmp_panel (Review_ID, Faculty_ID, Is_Mentor)
+    SELECT Review_ID, Mentor_ID, TRUE FROM tmp_panel_review WHERE Mentor_ID IS NOT NULL
+    ON DUPLICATE KEY UPDATE Is_Mentor = TRUE;
+
+    IF EXISTS (
+        SELECT 1 FROM tmp_panel p LEFT JOIN Faculty f ON f.Faculty_ID = p.Faculty_ID
+        WHERE f.Faculty_ID IS NULL
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Panel names a faculty member that does not exist';
+    END IF;
+
+    DELETE rp FROM Review_Panel rp JOIN tmp_panel_review pr ON pr.Review_ID = rp.Review_ID;
+
+    INSERT INTO Review_Panel (Review_ID, Faculty_ID)
+    SELECT Review_ID, Faculty_ID FROM tmp_panel
+    ORDER BY Review_ID, Is_Mentor DESC;
+
+    DROP TEMPORARY TABLE tmp_panel_review, tmp_panel;
+END$$
+
+-- STUDENT/ADMIN: create many teams at once, [["SRN1", "SRN2"], ["SRN3"], ...].
+-- Same rules as StudentCreateTeam: every SRN exists, is not in a team (or in
+-- two of the new ones), teams have 1-4 members of one semester. Returns (team_ord, Team_ID).
+CREATE PROCEDURE StudentCreateTeamsJSON(
+    IN teams_json JSON
+)
+BEGIN
+    DECLARE n INT DEFAULT 1;
+    DECLARE team_count INT;
+    DECLARE bad_srn VARCHAR(20) DEFAULT NULL;
+    DECLARE bad_team INT DEFAULT NULL;
+    DECLARE tmp_msg TEXT;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_team_member, tmp_team_id;
+    CREATE TEMPORARY TABLE tmp_team_member (
+        team_ord INT NOT NULL,
+        SRN VARCHAR(20) NULL,
+        Sem INT NULL,
+        KEY (SRN)
+    );
+    CREATE TEMPORARY TABLE tmp_team_id (
+        team_ord INT NOT NULL PRIMARY KEY,
+        Team_ID INT NOT NULL
+    );
+
+    INSERT INTO tmp_team_member (team_ord, SRN, Sem)
+    SELECT jt.team_ord, jt.srn, s.Sem
+    FROM JSON_TABLE(teams_json, '$[*]' COLUMNS (
+        team_ord FOR ORDINALITY,
+        NESTED PATH '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')
+    )) jt
+    LEFT JOIN Student s ON s.SRN = jt.srn;
+
+    SELECT team_ord INTO bad_team FROM tmp_team_member WHERE SRN IS NULL LIMIT 1;
+    IF bad_team IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Team ', bad_team, ' has no members');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    SELECT SRN INTO bad_srn FROM tmp_team_member WHERE Sem IS NULL LIMIT 1;
+    IF bad_srn IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Teammate SRN not found: ', bad_srn);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    SELECT SRN INTO bad_srn FROM tmp_team_member GROUP BY SRN HAVING COUNT(*) > 1 LIMIT 1;
+    IF bad_srn IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Student listed more than once: ', bad_srn);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    SELECT team_ord INTO bad_team FROM tmp_team_member GROUP BY team_ord HAVING COUNT(*) > 4 LIMIT 1;
+    IF bad_team IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Team ', bad_team, ' has more than 4 members');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    SELECT team_ord INTO bad_team FROM tmp_team_member GROUP BY team_ord HAVING COUNT(DISTINCT Sem) > 1 LIMIT 1;
+    IF bad_team IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Semester mismatch in team ', bad_team);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    -- locking read: a concurrent call can't add the same students before we commit
+    SELECT ts.SRN INTO bad_srn
+    FROM tmp_team_member m JOIN Team_Student ts ON ts.SRN = m.SRN
+    LIMIT 1
+    FOR UPDATE;
+    IF bad_srn IS NOT NULL THEN
+        SET tmp_msg = CONCAT('Student already in a team: ', bad_srn);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = tmp_msg;
+    END IF;
+
+    -- team_ord runs 1..N (FOR ORDINALITY); every team has a member by now
+    SELECT MAX(team_ord) INTO team_count FROM tmp_team_member;
+    WHILE n <= team_count DO
+        INSERT INTO Team (Faculty_ID) VALUES (NULL);
+        INSERT INTO tmp_team_id (team_ord, Team_ID) VALUES (n, LAST_INSERT_ID());
+        SET n = n + 1;
+    END WHILE;
+
+    INSERT INTO Team_Student (Team_ID, SRN)
+    SELECT ids.Team_ID, m.SRN
+    FROM tmp_team_member m
+    JOIN tmp_team_id ids ON ids.team_ord = m.team_ord;
+
+    SELECT team_ord, Team_ID FROM tmp_team_id ORDER BY team_ord;
+    DROP TEMPORARY TABLE tmp_team_member, tmp_team_id;
+END$$
+
 -- STUDENT: add project for the team of the given SRN
 CREATE PROCEDURE StudentAddProject(
     IN srn_in VARCHAR(20),
@@ -505,6 +901,270 @@ BEGIN
     WHERE Evaluation_ID = eval_id;
 END$$
 
+-- Team membership flows of the web app, one CALL each: every check and write
+-- happens server side and the outcome comes back as a single
+-- (Status, Team_ID, Detail) row rather than a SIGNAL, so the app can map
+-- Status to its own message. They run in the caller's transaction (no COMMIT).
+--
+-- Joins are serialised per team, not globally: the students involved are
+-- locked first (in key order), then the team row FOR UPDATE, and the member
+-- count is a locking read taken after that, so two joins can't both see
+-- three members. trg_team_size_limit takes the same team lock for inserts
+-- that don't come through here.
+
+-- STUDENT: add a teammate to the caller's team, or join p_join_team_id, or
+-- create a new team (with the teammate) when the caller has none
+CREATE PROCEDURE StudentAddTeammate(
+    IN p_srn VARCHAR(20),
+    IN p_teammate_srn VARCHAR(20), -- may be NULL
+    IN p_join_team_id INT          -- may be NULL
+)
+proc: BEGIN
+    DECLARE v_sem INT DEFAULT NULL;
+    DECLARE v_mate_sem INT DEFAULT NULL;
+    DECLARE v_team INT DEFAULT NULL;
+    DECLARE v_mate_team INT DEFAULT NULL;
+    DECLARE v_count INT DEFAULT 0;
+    DECLARE v_locked INT DEFAULT NULL;
+
+    SELECT COUNT(*) INTO v_count FROM Student WHERE SRN IN (p_srn, p_teammate_srn) FOR UPDATE;
+
+    SELECT Sem INTO v_sem FROM Student WHERE SRN = p_srn;
+    IF v_sem IS NULL THEN
+        SELECT 'STUDENT_NOT_FOUND' AS Status, NULL AS Team_ID, p_srn AS Detail;
+        LEAVE proc;
+    END IF;
+
+    SELECT Team_ID INTO v_team FROM Team_Student WHERE SRN = p_srn LIMIT 1 FOR SHARE;
+
+    IF p_teammate_srn IS NOT NULL THEN
+        SELECT Sem INTO v_mate_sem FROM Student WHERE SRN = p_teammate_srn;
+        IF v_mate_sem IS NULL THEN
+            SELECT 'TEAMMATE_NOT_FOUND' AS Status, NULL AS Team_ID, p_teammate_srn AS Detail;
+            LEAVE proc;
+        END IF;
+        IF v_mate_sem <> v_sem THEN
+            SELECT 'SEM_MISMATCH' AS Status, NULL AS Team_ID, p_teammate_srn AS Detail;
+            LEAVE proc;
+        END IF;
+        SELECT Team_ID INTO v_mate_team FROM Team_Student WHERE SRN = p_teammate_srn LIMIT 1 FOR SHARE;
+        IF v_mate_team IS NOT NULL THEN
+            SELECT 'TEAMMATE_IN_TEAM' AS Status, v_mate_team AS Team_ID, p_teammate_srn AS Detail;
+            LEAVE proc;
+        END IF;
+    END IF;
+
+    IF v_team IS NOT NULL THEN
+        SELECT Team_ID INTO v_locked FROM Team WHERE Team_ID = v_team FOR UPDATE;
+        SELECT COUNT(*) INTO v_count FROM Team_Student WHERE Team_ID = v_team FOR SHARE;
+        IF v_count >= 4 THEN
+            SELECT 'TEAM_FULL' AS Status, v_team AS Team_ID, NULL AS Detail;
+            LEAVE proc;
+        END IF;
+        IF p_teammate_srn IS NULL THEN
+            SELECT 'UNCHANGED' AS Status, v_team AS Team_ID, NULL AS Detail;
+            LEAVE proc;
+        END IF;
+        INSERT INTO Team_Student (Team_ID, SRN) VALUES (v_team, p_teammate_srn);
+        SELECT 'ADDED' AS Status, v_team AS Team_ID, p_teammate_srn AS Detail;
+        LEAVE proc;
+    END IF;
+
+    IF p_join_team_id IS NOT NULL THEN
+        SELECT Team_ID INTO v_locked FROM Team WHERE Team_ID = p_join_team_id FOR UPDATE;
+        IF v_locked IS NULL THEN
+            SELECT 'TEAM_NOT_FOUND' AS Status, p_join_team_id AS Team_ID, NULL AS Detail;
+            LEAVE proc;
+        END IF;
+        SELECT COUNT(*) INTO v_count FROM Team_Student WHERE Team_ID = p_join_team_id FOR SHARE;
+        IF v_count >= 4 THEN
+            SELECT 'JOIN_TEAM_FULL' AS Status, p_join_team_id AS Team_ID, NULL AS Detail;
+            LEAVE proc;
+        END IF;
+        INSERT INTO Team_Student (Team_ID, SRN) VALUES (p_join_team_id, p_srn);
+        SELECT 'JOINED' AS Status, p_join_team_id AS Team_ID, p_srn AS Detail;
+        LEAVE proc;
+    END IF;
+
+    INSERT INTO Team (Faculty_ID) VALUES (NULL);
+    SET v_team = LAST_INSERT_ID();
+    INSERT INTO Team_Student (Team_ID, SRN) VALUES (v_team, p_srn);
+    IF p_teammate_srn IS NOT NULL THEN
+        INSERT INTO Team_Student (Team_ID, SRN) VALUES (v_team, p_teammate_srn);
+    END IF;
+    SELECT 'CREATED' AS Status, v_team AS Team_ID, p_srn AS Detail;
+END$$
+
+-- ADMIN: create a team from a JSON array of 1-4 SRNs with an optional mentor
+CREATE PROCEDURE AdminCreateTeam(
+    IN p_faculty_id INT, -- may be NULL
+    IN p_srns JSON
+)
+proc: BEGIN
+    DECLARE v_team INT;
+    DECLARE v_detail TEXT DEFAULT NULL;
+    DECLARE v_count INT DEFAULT 0;
+
+    -- distinct SRNs: a name listed twice is one member
+    SELECT COUNT(DISTINCT jt.srn) INTO v_count
+    FROM JSON_TABLE(COALESCE(p_srns, JSON_ARRAY()), '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')) jt;
+
+    IF v_count = 0 THEN
+        SELECT 'NO_MEMBERS' AS Status, NULL AS Team_ID, NULL AS Detail;
+        LEAVE proc;
+    END IF;
+    IF v_count > 4 THEN
+        SELECT 'TEAM_TOO_LARGE' AS Status, NULL AS Team_ID, v_count AS Detail;
+        LEAVE proc;
+    END IF;
+
+    IF p_faculty_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM Faculty WHERE Faculty_ID = p_faculty_id) THEN
+        SELECT 'FACULTY_NOT_FOUND' AS Status, NULL AS Team_ID, p_faculty_id AS Detail;
+        LEAVE proc;
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM Student
+    WHERE SRN IN (SELECT jt.srn FROM JSON_TABLE(p_srns, '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')) jt)
+    FOR UPDATE;
+
+    SELECT GROUP_CONCAT(jt.srn ORDER BY jt.srn SEPARATOR ', ') INTO v_detail
+    FROM JSON_TABLE(p_srns, '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')) jt
+    LEFT JOIN Student s ON s.SRN = jt.srn
+    WHERE s.SRN IS NULL;
+    IF v_detail IS NOT NULL THEN
+        SELECT 'STUDENT_NOT_FOUND' AS Status, NULL AS Team_ID, v_detail AS Detail;
+        LEAVE proc;
+    END IF;
+
+    SELECT GROUP_CONCAT(ts.SRN ORDER BY ts.SRN SEPARATOR ', ') INTO v_detail
+    FROM JSON_TABLE(p_srns, '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')) jt
+    JOIN Team_Student ts ON ts.SRN = jt.srn
+    FOR SHARE OF ts;
+    IF v_detail IS NOT NULL THEN
+        SELECT 'ALREADY_ASSIGNED' AS Status, NULL AS Team_ID, v_detail AS Detail;
+        LEAVE proc;
+    END IF;
+
+    INSERT INTO Team (Faculty_ID) VALUES (p_faculty_id);
+    SET v_team = LAST_INSERT_ID();
+    INSERT INTO Team_Student (Team_ID, SRN)
+    SELECT DISTINCT v_team, jt.srn
+    FROM JSON_TABLE(p_srns, '$[*]' COLUMNS (srn VARCHAR(20) PATH '$')) jt;
+    SELECT 'CREATED' AS Status, v_team AS Team_ID, ROW_COUNT() AS Detail;
+END$$
+
+-- ADMIN: add one student to an existing team
+CREATE PROCEDURE AdminAddTeamMember(
+    IN p_team_id INT,
+    IN p_srn VARCHAR(20)
+)
+proc: BEGIN
+    DECLARE v_count INT DEFAULT 0;
+    DECLARE v_existing INT DEFAULT NULL;
+    DECLARE v_student VARCHAR(20) DEFAULT NULL;
+    DECLARE v_locked INT DEFAULT NULL;
+
+    SELECT SRN INTO v_student FROM Student WHERE SRN = p_srn FOR UPDATE;
+    SELECT Team_ID INTO v_locked FROM Team WHERE Team_ID = p_team_id FOR UPDATE;
+
+    IF v_locked IS NULL THEN
+        SELECT 'TEAM_NOT_FOUND' AS Status, p_team_id AS Team_ID, NULL AS Detail;
+        LEAVE proc;
+    END IF;
+    IF v_student IS NULL THEN
+        SELECT 'STUDENT_NOT_FOUND' AS Status, p_team_id AS Team_ID, p_srn AS Detail;
+        LEAVE proc;
+    END IF;
+
+    SELECT COUNT(*) INTO v_count FROM Team_Student WHERE Team_ID = p_team_id FOR SHARE;
+    IF v_count >= 4 THEN
+        SELECT 'TEAM_FULL' AS Status, p_team_id AS Team_ID, NULL AS Detail;
+        LEAVE proc;
+    END IF;
+
+    SELECT Team_ID INTO v_existing FROM Team_Student WHERE SRN = p_srn LIMIT 1 FOR SHARE;
+    IF v_existing IS NOT NULL THEN
+        SELECT 'ALREADY_IN_TEAM' AS Status, p_team_id AS Team_ID, v_existing AS Detail;
+        LEAVE proc;
+    END IF;
+
+    INSERT INTO Team_Student (Team_ID, SRN) VALUES (p_team_id, p_srn);
+    SELECT 'ADDED' AS Status, p_team_id AS Team_ID, p_srn AS Detail;
+END$$
+
+-- ADMIN: move a closed term's reviews, panels, evaluations and meetings into
+-- the archive tables in one transaction; returns the number of rows moved
+CREATE PROCEDURE ArchiveTerm(
+    IN term_in INT
+)
+BEGIN
+    DECLARE start_d DATE;
+    DECLARE end_d DATE;
+    DECLARE n_reviews INT DEFAULT 0;
+    DECLARE n_panels INT DEFAULT 0;
+    DECLARE n_evaluations INT DEFAULT 0;
+    DECLARE n_meetings INT DEFAULT 0;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    SELECT Start_Date, End_Date INTO start_d, end_d
+    FROM Term
+    WHERE Term_ID = term_in AND Archived_At IS NULL
+    FOR UPDATE;
+
+    IF start_d IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Term not found or already archived';
+    END IF;
+
+    IF end_d >= CURDATE() THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Term has not ended yet';
+    END IF;
+
+    INSERT INTO Review_Archive (Term_ID, Review_ID, ReviewType_ID, Team_ID, Date, Start_Time, Venue, Updated_At)
+    SELECT term_in, Review_ID, ReviewType_ID, Team_ID, Date, Start_Time, Venue, Updated_At
+    FROM Review
+    WHERE Date BETWEEN start_d AND end_d;
+    SET n_reviews = ROW_COUNT();
+
+    INSERT INTO Review_Panel_Archive (Term_ID, Review_ID, Faculty_ID)
+    SELECT term_in, rp.Review_ID, rp.Faculty_ID
+    FROM Review_Panel rp
+    JOIN Review r ON r.Review_ID = rp.Review_ID
+    WHERE r.Date BETWEEN start_d AND end_d;
+    SET n_panels = ROW_COUNT();
+
+    INSERT INTO Evaluation_Archive (Term_ID, Evaluation_ID, Faculty_ID, SRN, Rubric_ID, Project_ID, Review_ID,
+                                    Marks, Comments, Created_At, Updated_At)
+    SELECT term_in, e.Evaluation_ID, e.Faculty_ID, e.SRN, e.Rubric_ID, e.Project_ID, e.Review_ID,
+           e.Marks, e.Comments, e.Created_At, e.Updated_At
+    FROM Evaluation e
+    JOIN Review r ON r.Review_ID = e.Review_ID
+    WHERE r.Date BETWEEN start_d AND end_d;
+    SET n_evaluations = ROW_COUNT();
+
+    INSERT INTO Meeting_Archive (Term_ID, Meeting_ID, Faculty_ID, Team_ID, DateTime, Feedback, Updated_At)
+    SELECT term_in, Meeting_ID, Faculty_ID, Team_ID, DateTime, Feedback, Updated_At
+    FROM Meeting
+    WHERE DateTime >= start_d AND DateTime < end_d + INTERVAL 1 DAY;
+    SET n_meetings = ROW_COUNT();
+
+    -- Review_Panel and Evaluation rows go with their Review (ON DELETE CASCADE)
+    DELETE FROM Review WHERE Date BETWEEN start_d AND end_d;
+    DELETE FROM Meeting WHERE DateTime >= start_d AND DateTime < end_d + INTERVAL 1 DAY;
+
+    UPDATE Term SET Archived_At = NOW() WHERE Term_ID = term_in;
+
+    COMMIT;
+
+    SELECT n_reviews AS Reviews, n_panels AS Panels, n_evaluations AS Evaluations, n_meetings AS Meetings;
+END$$
+
 DELIMITER ;
 
 -- =====================================================
@@ -536,9 +1196,16 @@ BEFORE INSERT ON Team_Student
 FOR EACH ROW
 BEGIN
     DECLARE member_count INT;
+    DECLARE locked_team INT;
+
+    -- the team row lock queues concurrent inserts for the same team; the
+    -- count is a locking read so it sees members committed while we waited
+    SELECT Team_ID INTO locked_team FROM Team WHERE Team_ID = NEW.Team_ID FOR UPDATE;
+
     SELECT COUNT(*) INTO member_count
     FROM Team_Student
-    WHERE Team_ID = NEW.Team_ID;
+    WHERE Team_ID = NEW.Team_ID
+    FOR SHARE;
 
     IF member_count >= 4 THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'A team cannot have more than 4 members';
@@ -559,6 +1226,18 @@ BEGIN
     END IF;
 END$$
 
+CREATE TRIGGER trg_eval_tombstone
+AFTER DELETE ON Evaluation
+FOR EACH ROW
+BEGIN
+    -- kept 30 days; a workspace older than that reloads from scratch
+    DELETE FROM Evaluation_Tombstone WHERE Deleted_At < NOW() - INTERVAL 30 DAY;
+
+    INSERT INTO Evaluation_Tombstone (Evaluation_ID, Faculty_ID, Review_ID)
+    VALUES (OLD.Evaluation_ID, OLD.Faculty_ID, OLD.Review_ID)
+    ON DUPLICATE KEY UPDATE Deleted_At = CURRENT_TIMESTAMP;
+END$$
+
 CREATE TRIGGER trg_mentor_in_panel
 BEFORE INSERT ON Review_Panel
 FOR EACH ROW
@@ -654,6 +1333,7 @@ GRANT SELECT ON capstoneprojectdb.Team_Project TO 'role_faculty';
 GRANT SELECT ON capstoneprojectdb.Team_Student TO 'role_faculty';
 GRANT SELECT ON capstoneprojectdb.Project TO 'role_faculty';
 GRANT SELECT ON capstoneprojectdb.Rubric TO 'role_faculty';
+GRANT SELECT ON capstoneprojectdb.Evaluation_Tombstone TO 'role_faculty';
 
 GRANT INSERT ON capstoneprojectdb.Meeting TO 'role_faculty';
 GRANT INSERT ON capstoneprojectdb.Evaluation TO 'role_faculty';
@@ -665,6 +1345,7 @@ GRANT EXECUTE ON PROCEDURE capstoneprojectdb.AutoGenerateEvaluations TO 'role_fa
 GRANT EXECUTE ON PROCEDURE capstoneprojectdb.FacultyClaimTeam TO 'role_faculty';
 GRANT EXECUTE ON PROCEDURE capstoneprojectdb.FacultyScheduleMeeting TO 'role_faculty';
 GRANT EXECUTE ON PROCEDURE capstoneprojectdb.FacultyAddMarks TO 'role_faculty';
+GRANT EXECUTE ON PROCEDURE capstoneprojectdb.AddReviewsForTeamsJSON TO 'role_faculty';
 
 -- Student role privileges
 GRANT SELECT ON capstoneprojectdb.Team TO 'role_student';
@@ -682,6 +1363,8 @@ GRANT INSERT ON capstoneprojectdb.Team_Project TO 'role_student';
 
 GRANT EXECUTE ON PROCEDURE capstoneprojectdb.StudentCreateTeam TO 'role_student';
 GRANT EXECUTE ON PROCEDURE capstoneprojectdb.StudentAddProject TO 'role_student';
+GRANT EXECUTE ON PROCEDURE capstoneprojectdb.StudentCreateTeamsJSON TO 'role_student';
+GRANT EXECUTE ON PROCEDURE capstoneprojectdb.StudentAddTeammate TO 'role_student';
 
 -- Create example MySQL users and attach roles (these are DB-level accounts to simulate 3 users)
 CREATE USER IF NOT EXISTS 'admin_user'@'%' IDENTIFIED BY 'AdminPass@123';
@@ -0,0 +1,64 @@
+"""Admission control: the per-route and global concurrency gates."""
+import threading
+import time
+
+from conftest import capstone
+
+WRITE, NORMAL = capstone.PRIORITY_WRITE, capstone.PRIORITY_NORMAL
+
+
+def test_full_queue_turns_reads_away_but_not_writes():
+    gate = capstone.AdmissionGate('test', 1, 0)
+    assert gate.acquire(NORMAL, 1)
+
+    assert not gate.acquire(NORMAL, 1)
+    assert not gate.acquire(WRITE, 0.01)  # queued, then timed out
+    assert gate.stats['rejected'] == 1 and gate.stats['timed_out'] == 1
+    assert gate.snapshot()['waiting'] == 0
+
+
+def test_waiting_write_goes_first():
+    gate = capstone.AdmissionGate('test', 1, 10)
+    gate.acquire(NORMAL, 1)
+    admitted = []
+
+    def request(name, priority):
+        if gate.acquire(priority, 5):
+            admitted.append(name)
+            gate.release()
+    threads = [threading.Thread(target=request, args=('read', NORMAL))]
+    threads[0].start()
+    while gate.snapshot()['waiting'] < 1:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=request, args=('write', WRITE)))
+    threads[1].start()
+    while gate.snapshot()['waiting'] < 2:
+        time.sleep(0.001)
+
+    gate.release()
+    for thread in threads:
+        thread.join()
+
+    assert admitted == ['write', 'read']
+    assert gate.snapshot()['active'] == 0
+
+
+def test_full_route_gate_answers_503_with_retry_after(db, login, monkeypatch):
+    client = login('student')
+    monkeypatch.setitem(capstone.admission_gates, 'student_dashboard',
+                        capstone.AdmissionGate('student_dashboard', 0, 0))
+
+    response = client.get('/student/dashboard')
+
+    assert response.status_code == 503
+    retry_after = int(response.headers['Retry-After'])
+    assert capstone.ADMISSION_RETRY_AFTER <= retry_after <= 2 * capstone.ADMISSION_RETRY_AFTER
+    assert capstone.admission_global.snapshot()['active'] == 0  # nothing held after the refusal
+
+
+def test_admitted_request_releases_its_gates(db, login):
+    client = login('student')
+
+    assert client.get('/student/dashboard').status_code == 200
+    assert capstone.admission_gates['student_dashboard'].snapshot()['active'] == 0
+    assert capstone.admission_global.snapshot()['active'] == 0
@@ -0,0 +1,108 @@
+"""Audit log: the buffered writer and the routes that record changes."""
+import json
+from datetime import datetime
+
+import pytest
+
+from conftest import capstone, query
+
+
+def entry(action='update', entity='student', entity_id='PES1UG21CS001'):
+    return (datetime.now(), 'admin', None, action, entity, entity_id, None)
+
+
+@pytest.fixture
+def writer(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(capstone, 'AUDIT_DEAD_LETTER', str(tmp_path / 'dead-letter.jsonl'))
+    writer = capstone.AuditWriter()
+    writer._thread = 'not started'  # tests drive the writer by hand
+    return writer
+
+
+def dead_letters():
+    with open(capstone.AUDIT_DEAD_LETTER) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_poison_row_is_dead_lettered_and_the_rest_written(db, writer):
+    batch = [entry(entity_id='1'), entry(entity=None), entry(entity_id='3')]  # Entity is NOT NULL
+
+    assert writer._write(batch) and batch == []
+    assert query(db, "SELECT Entity_ID FROM AuditLog ORDER BY Audit_ID") == [('1',), ('3',)]
+    assert [record['entry'][3:6] for record in dead_letters()] == [['update', None, 'PES1UG21CS001']]
+    assert writer.stats['dead_lettered'] == 1 and writer.stats['written'] == 2
+
+
+def test_outage_keeps_the_batch_for_a_retry(db, writer, monkeypatch):
+    def unavailable(rows):
+        raise capstone.DatabaseUnavailable('Database unavailable', 5)
+    monkeypatch.setattr(writer, '_insert', unavailable)
+    batch = [entry(), entry()]
+
+    assert not writer._write(batch)
+    assert len(batch) == 2 and writer.stats['dead_lettered'] == 0
+
+
+def test_flush_writes_the_inflight_batch_and_the_queue(db, writer):
+    writer._inflight = [entry(entity_id='1')]
+    writer._queue.put(entry(entity_id='2'))
+
+    writer.flush()
+
+    assert query(db, "SELECT Entity_ID FROM AuditLog ORDER BY Audit_ID") == [('1',), ('2',)]
+    assert writer._inflight is None and writer._queue.empty()
+
+
+def test_full_queue_makes_the_request_write_directly(db, writer, monkeypatch):
+    monkeypatch.setattr(capstone, 'AUDIT_PUT_TIMEOUT', 0.01)
+    for _ in range(capstone.AUDIT_QUEUE_SIZE):
+        writer._queue.put_nowait(entry())
+
+    writer.submit(entry(entity_id='direct'))
+
+    assert writer.stats['direct'] == 1
+    assert query(db, "SELECT Entity_ID FROM AuditLog") == [('direct',)]
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    class Recorder:
+        entries = []
+
+        def submit(self, entry):
+            self.entries.append(entry[3:6])
+    recorder = Recorder()
+    monkeypatch.setattr(capstone, 'audit_writer', recorder)
+    return recorder.entries
+
+
+def test_claiming_a_team_is_audited(db, login, recorded):
+    login('faculty').post('/faculty/claim_team', data={'team_id': '4'})  # team 4 has no mentor
+
+    assert recorded == [('assign_faculty', 'team', '4')]
+
+
+def test_student_project_assignment_is_audited(db, login, recorded):
+    login('student').post('/student/add_project', data={'srn': 'PES1UG21CS001', 'title': 'Campus Maps'})
+
+    [(project_id,)] = query(db, "SELECT Project_ID FROM Project WHERE Title = 'Campus Maps'")
+    assert recorded == [('create', 'project', str(project_id)), ('assign_project', 'team', '1')]
+
+
+def test_admin_project_creation_is_audited(db, login, recorded):
+    login('admin').post('/admin_add_project', data={'title': 'Library Bot', 'team_id': '4'})
+
+    [(project_id,)] = query(db, "SELECT Project_ID FROM Project WHERE Title = 'Library Bot'")
+    assert recorded == [('create', 'project', str(project_id)), ('assign_project', 'team', '4')]
+
+
+@pytest.mark.parametrize('path, form, expected', [
+    ('/admin/add_student', {'srn': 'PES1UG21CS050', 'name': 'New', 'email': 'n@univ.edu', 'sem': '7'},
+     ('create', 'student', 'PES1UG21CS050')),
+    ('/admin/add_faculty', {'faculty_id': '150', 'name': 'Dr. New', 'email': 'dn@univ.edu'},
+     ('create', 'faculty', '150')),
+])
+def test_admin_additions_are_audited(db, login, recorded, path, form, expected):
+    login('admin').post(path, data=form)
+
+    assert recorded == [expected]
@@ -0,0 +1,88 @@
+"""POST /admin/batch: per-item results in both modes.
+
+On MySQL the committed changes stay for the later tests, so they touch
+faculty 102 and team 3, which nothing else depends on."""
+from conftest import query
+
+
+def post_batch(client, mode, operations):
+    response = client.post('/admin/batch', json={'mode': mode, 'operations': operations})
+    return response.status_code, response.get_json()
+
+
+def statuses(body):
+    return [result['status'] for result in body['results']]
+
+
+def test_per_item_skips_only_the_failing_item(db, login):
+    code, body = post_batch(login('admin'), 'per_item', [
+        {'op': 'edit_faculty', 'faculty_id': 102, 'name': 'Dr. M. Iyer', 'email': 'mi@univ.edu'},
+        {'op': 'assign_project', 'team_id': 3, 'project_id': 999},  # no such project
+        {'op': 'assign_faculty', 'team_id': 3, 'faculty_id': 102},
+    ])
+
+    assert code == 200 and body['committed']
+    assert statuses(body) == ['ok', 'error', 'ok']
+    assert query(db, "SELECT Name FROM Faculty WHERE Faculty_ID = 102") == [('Dr. M. Iyer',)]
+    assert query(db, "SELECT Faculty_ID FROM Team WHERE Team_ID = 3") == [(102,)]
+    assert query(db, "SELECT Project_ID FROM Team_Project WHERE Team_ID = 3") == [(3,)]
+
+
+def test_atomic_failure_rolls_everything_back(db, login):
+    code, body = post_batch(login('admin'), 'atomic', [
+        {'op': 'edit_faculty', 'faculty_id': 101, 'name': 'Dr. R. Kumar', 'email': 'rk@univ.edu'},
+        {'op': 'assign_project', 'team_id': 4, 'project_id': 999},
+    ])
+
+    assert code == 409 and not body['committed']
+    assert statuses(body) == ['rolled_back', 'error']
+    assert query(db, "SELECT Name FROM Faculty WHERE Faculty_ID = 101") == [('Dr. Ramesh Kumar',)]
+
+
+def test_atomic_with_invalid_item_runs_nothing(db, login):
+    code, body = post_batch(login('admin'), 'atomic', [
+        {'op': 'edit_faculty', 'faculty_id': 101, 'name': 'Dr. R. Kumar', 'email': 'rk@univ.edu'},
+        {'op': 'add_student', 'srn': 'PES1UG21CS010', 'name': 'New', 'email': 'n@univ.edu', 'sem': 9},
+        {'op': 'no_such_op'},
+    ])
+
+    assert code == 400
+    assert statuses(body) == ['skipped', 'invalid', 'invalid']
+    assert query(db, "SELECT Name FROM Faculty WHERE Faculty_ID = 101") == [('Dr. Ramesh Kumar',)]
+
+
+def test_repeated_key_behaves_like_two_posts(db, login):
+    code, body = post_batch(login('admin'), 'atomic', [
+        {'op': 'assign_project', 'team_id': 1, 'project_id': 3},
+        {'op': 'assign_project', 'team_id': 1, 'project_id': 2},
+    ])
+
+    assert code == 200 and statuses(body) == ['ok', 'ok']
+    assert query(db, "SELECT Project_ID FROM Team_Project WHERE Team_ID = 1") == [(2,)]
+
+
+def test_batch_is_admin_only(db, login):
+    code, body = post_batch(login('faculty'), 'atomic', [{'op': 'delete_team', 'team_id': 1}])
+
+    assert code == 403
+    assert query(db, "SELECT COUNT(*) FROM Team WHERE Team_ID = 1") == [(1,)]
+
+
+def test_body_must_be_an_object(db, login):
+    response = login('admin').post('/admin/batch', json=[{'op': 'delete_team', 'team_id': 1}])
+
+    assert response.status_code == 400 and 'object' in response.get_json()['error']
+
+
+def test_op_must_be_a_string(db, login):
+    code, body = post_batch(login('admin'), 'atomic', [
+        {'op': ['delete_team'], 'team_id': 1},
+        {'op': None, 'team_id': 1},
+        {'op': 'delete_team', 'team_id': 2},
+    ])
+
+    assert code == 400
+    assert [(result['op'], result['status']) for result in body['results']] == [
+        (None, 'invalid'), (None, 'invalid'), ('delete_team', 'skipped')]
+    assert body['results'][0]['error'] == "op must be a string"
+    assert query(db, "SELECT COUNT(*) FROM Team WHERE Team_ID IN (1, 2)") == [(2,)]
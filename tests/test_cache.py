@@ -0,0 +1,54 @@
+"""Shared cache and the version bus that invalidates it across workers."""
+from conftest import capstone
+
+
+def test_mmap_bus_bumps_are_seen_by_other_processes(tmp_path):
+    path = str(tmp_path / 'bus' / 'versions')
+    here = capstone.MmapVersionBus(path, capstone.CACHE_NAMESPACES)
+    there = capstone.MmapVersionBus(path, capstone.CACHE_NAMESPACES)  # another worker's mapping
+
+    assert there.bump('projects') == 1 and there.bump('projects') == 2
+    assert here.version('projects') == 2 and here.version('counts') == 0
+
+
+def test_invalidation_by_another_worker_reloads(tmp_path):
+    path = str(tmp_path / 'versions')
+    cache = capstone.SharedCache(capstone.MmapVersionBus(path, capstone.CACHE_NAMESPACES))
+    other = capstone.SharedCache(capstone.MmapVersionBus(path, capstone.CACHE_NAMESPACES))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get('projects', 'all', loader) == 1
+    assert cache.get('projects', 'all', loader) == 1
+    other.invalidate('counts')
+    assert cache.get('projects', 'all', loader) == 1  # another namespace
+    other.invalidate('projects')
+    assert cache.get('projects', 'all', loader) == 2
+    assert cache.stats['projects'] == dict(cache.stats['projects'], hits=2, misses=1, stale=1)
+
+
+def test_ttl_expires_entries(tmp_path, monkeypatch):
+    cache = capstone.SharedCache(capstone.MmapVersionBus(str(tmp_path / 'versions'), capstone.CACHE_NAMESPACES))
+    now = [100.0]
+    monkeypatch.setattr(capstone.time, 'monotonic', lambda: now[0])
+    loads = iter(range(10))
+
+    assert cache.get('meetings', 101, lambda: next(loads), ttl=60) == 0
+    now[0] += 59
+    assert cache.get('meetings', 101, lambda: next(loads), ttl=60) == 0
+    now[0] += 2
+    assert cache.get('meetings', 101, lambda: next(loads), ttl=60) == 1
+
+
+def test_successful_write_route_publishes_its_namespaces(db, login):
+    client = login('admin')
+    before = capstone.cache_bus.version('counts')
+
+    client.get('/admin/dashboard')
+    assert capstone.cache_bus.version('counts') == before
+
+    client.post('/admin/add_student', data={'srn': 'PES1UG21CS060', 'name': 'New', 'email': 'n6@univ.edu', 'sem': '7'})
+    assert capstone.cache_bus.version('counts') == before + 1
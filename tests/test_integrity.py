@@ -0,0 +1,74 @@
+"""Integrity scanner: which duplicate Team_Project row is kept.
+
+Each test uses its own teams, because on MySQL the rows stay for the later tests."""
+import json
+from datetime import datetime
+
+import pytest
+
+from conftest import capstone, query
+
+
+def assign(db, team_id, *project_ids, audited=()):
+    cursor = db.cursor()
+    cursor.executemany("INSERT INTO Team_Project (Team_ID, Project_ID) VALUES (%s, %s)",
+                       [(team_id, project_id) for project_id in project_ids])
+    cursor.executemany(capstone.AUDIT_INSERT_SQL, [
+        (datetime.now(), 'admin', None, 'assign_project', 'team', str(team_id), json.dumps({'project_id': p}))
+        for p in audited
+    ])
+    cursor.close()
+    db.commit()
+
+
+def test_latest_audited_project_is_kept(db):
+    assign(db, 1, 2, 3, audited=(2, 3, '1'))  # Project 1 is already linked by the sample data
+
+    report = capstone.scan_integrity(['team_projects'])['team_projects']
+
+    assert [(row['Project_ID'], row['Keep_Project_ID']) for row in report['sample'] if row['Team_ID'] == 1] == [
+        (2, 1), (3, 1)]
+
+
+def test_team_without_audited_choice_is_only_reported(db):
+    assign(db, 2, 3, audited=(1,))  # Project 1 is not one of team 2's
+
+    report = capstone.scan_integrity(['team_projects'])['team_projects']
+
+    rows = [row for row in report['sample'] if row['Team_ID'] == 2]
+    assert [(row['Project_ID'], row['Keep_Project_ID']) for row in rows] == [(2, None), (3, None)]
+
+
+def new_team(db):
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO Team (Faculty_ID) VALUES (NULL)")
+    team_id = cursor.lastrowid
+    cursor.close()
+    return team_id
+
+
+def test_team_with_an_unaudited_row_is_only_reported(db):
+    team_id = new_team(db)
+    assign(db, team_id, 1, audited=(1,))
+    assign(db, team_id, 2)  # added without an audit row, so it may be the newer choice
+
+    report = capstone.scan_integrity(['team_projects'])['team_projects']
+
+    rows = [row for row in report['sample'] if row['Team_ID'] == team_id]
+    assert [(row['Project_ID'], row['Keep_Project_ID']) for row in rows] == [(1, None), (2, None)]
+
+
+@pytest.mark.mysql
+def test_repair_deletes_only_what_the_audit_log_decides(db):
+    assign(db, 3, 1, audited=(3, 1))  # Project 3 is team 3's in the sample data
+    assign(db, 4, 1, 2)
+    unaudited = new_team(db)
+    assign(db, unaudited, 1, audited=(1,))
+    assign(db, unaudited, 2)
+
+    capstone.scan_integrity(['team_projects'], repair=True)
+
+    assert query(db, "SELECT Project_ID FROM Team_Project WHERE Team_ID = 3") == [(1,)]
+    assert query(db, "SELECT Project_ID FROM Team_Project WHERE Team_ID = 4 ORDER BY Project_ID") == [(1,), (2,)]
+    assert query(db, "SELECT Project_ID FROM Team_Project WHERE Team_ID = %s ORDER BY Project_ID",
+                 (unaudited,)) == [(1,), (2,)]
@@ -0,0 +1,119 @@
+"""Background job bookkeeping: cancellation and stale rows left by dead processes."""
+import os
+import socket
+
+import pytest
+
+from conftest import capstone, query
+
+
+def add_job(db, status, worker):
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO Job (Job_Type, Status, Worker) VALUES ('export_evaluations', %s, %s)",
+                   (status, worker))
+    job_id = cursor.lastrowid
+    cursor.close()
+    db.commit()
+    return job_id
+
+
+def dead_pid():
+    pid = 2 ** 22
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return pid
+        except PermissionError:
+            pass
+        pid -= 1
+
+
+def test_jobs_of_dead_processes_are_failed(db):
+    host = socket.gethostname()
+    dead = add_job(db, 'Running', '%s:%d' % (host, dead_pid()))
+    unowned = add_job(db, 'Queued', None)
+    own = add_job(db, 'Running', '%s:%d' % (host, os.getpid()))
+    elsewhere = add_job(db, 'Running', 'other-host:1')
+    done = add_job(db, 'Completed', '%s:%d' % (host, dead_pid()))
+
+    stale = capstone.recover_stale_jobs()
+
+    assert {dead, unowned} <= set(stale) and not {own, elsewhere, done} & set(stale)
+    assert dict(query(db, "SELECT Job_ID, Status FROM Job WHERE Job_ID >= %s", (dead,))) == {
+        dead: 'Failed', unowned: 'Failed', own: 'Running', elsewhere: 'Running', done: 'Completed'}
+
+
+def test_failure_does_not_overwrite_cancel(db, monkeypatch):
+    job_id = add_job(db, 'Queued', None)
+
+    def cancelled_then_failing(ctx):
+        capstone._job_update("UPDATE Job SET Status = 'Cancelled' WHERE Job_ID = %s", (ctx.job_id,))
+        raise RuntimeError("failed after the cancel")
+    monkeypatch.setitem(capstone.JOB_TYPES, 'export_evaluations', cancelled_then_failing)
+    capstone.job_slots.acquire()  # _run_job releases it
+
+    capstone._run_job(job_id, 'export_evaluations', {})
+
+    assert query(db, "SELECT Status, Error FROM Job WHERE Job_ID = %s", (job_id,)) == [('Cancelled', None)]
+
+
+def run_job(db, monkeypatch, fn):
+    job_id = add_job(db, 'Queued', None)
+    monkeypatch.setitem(capstone.JOB_TYPES, 'export_evaluations', fn)
+    capstone.job_slots.acquire()  # _run_job releases it
+    capstone._run_job(job_id, 'export_evaluations', {})
+    return job_id
+
+
+def test_cancel_stops_the_job_at_its_next_advance(db, login, monkeypatch):
+    client = login('admin')
+    steps = []
+
+    def cancelled_midway(ctx):
+        ctx.set_total(2)  # the last step always writes, so it sees the cancel
+        ctx.advance()
+        steps.append(1)
+        assert client.post('/admin/jobs/%d/cancel' % ctx.job_id).status_code == 200
+        ctx.advance()
+        steps.append(2)
+        return b'done', 'text/plain'
+    job_id = run_job(db, monkeypatch, cancelled_midway)
+
+    assert steps == [1]
+    assert query(db, "SELECT Status, Progress, Result FROM Job WHERE Job_ID = %s", (job_id,)) == [('Cancelled', 1, None)]
+
+
+def test_job_that_stops_itself_is_recorded_as_cancelled(db, monkeypatch):
+    def gives_up(ctx):
+        raise capstone.JobCancelled()
+    job_id = run_job(db, monkeypatch, gives_up)
+
+    status, finished = query(db, "SELECT Status, Finished_At FROM Job WHERE Job_ID = %s", (job_id,))[0]
+    assert status == 'Cancelled' and finished is not None
+
+
+def test_unchanged_progress_is_not_a_cancel(db, monkeypatch):
+    update = capstone._job_update
+
+    def changed_rows(sql, params):  # MySQL without FOUND_ROWS: rewriting the same Progress is 0 rows
+        rowcount = update(sql, params)
+        return 0 if sql.startswith("UPDATE Job SET Progress") else rowcount
+    monkeypatch.setattr(capstone, '_job_update', changed_rows)
+
+    def nothing_to_do(ctx):
+        ctx.set_total(0)
+        ctx.advance(0)
+    job_id = run_job(db, monkeypatch, nothing_to_do)
+
+    assert query(db, "SELECT Status FROM Job WHERE Job_ID = %s", (job_id,)) == [('Completed',)]
+
+
+@pytest.mark.mysql
+def test_advance_by_zero_keeps_running_on_mysql(db, monkeypatch):
+    def nothing_to_do(ctx):
+        ctx.set_total(2)
+        ctx.advance(0)
+    job_id = run_job(db, monkeypatch, nothing_to_do)
+
+    assert query(db, "SELECT Status FROM Job WHERE Job_ID = %s", (job_id,)) == [('Completed',)]
@@ -0,0 +1,83 @@
+"""Editing and scheduling reviews (admin_edit_review, admin_schedule_review)."""
+import pytest
+
+from conftest import flashes, query
+
+SLOT_WARNING = ('warning', "Enter a valid date (YYYY-MM-DD) and start time (HH:MM).")
+
+
+def edit_review(client, **form):
+    data = {'review_id': '4', 'date': '2025-05-20', 'start_time': '10:00', 'venue': 'Auditorium',
+            'panel_faculty_ids': '101,103'}
+    data.update(form)
+    return client.post('/admin_edit_review', data=data)
+
+
+@pytest.mark.parametrize('form', [
+    {'date': '2025-13-01'},
+    {'date': '20-05-2025'},
+    {'date': ''},
+    {'start_time': '25:00'},
+    {'start_time': '10am'},
+])
+def test_edit_review_rejects_bad_slot(db, login, form):
+    client = login('admin')
+    response = edit_review(client, **form)
+
+    assert response.status_code == 302
+    assert flashes(client) == [SLOT_WARNING]
+    date, start_time = query(db, "SELECT Date, Start_Time FROM Review WHERE Review_ID = 4")[0]
+    assert (str(date), start_time) == ('2025-05-20', None)
+
+
+@pytest.mark.parametrize('form, message', [
+    ({'review_id': 'x'}, "Invalid review."),
+    ({'panel_faculty_ids': '101,abc'}, "Panel faculty IDs must be numbers."),
+])
+def test_edit_review_rejects_bad_ids(db, login, form, message):
+    client = login('admin')
+    edit_review(client, **form)
+
+    assert flashes(client) == [('warning', message)]
+
+
+def test_edit_review_is_admin_only(db, login):
+    client = login('faculty')
+    edit_review(client, date='2025-06-01')
+
+    assert query(db, "SELECT Venue FROM Review WHERE Review_ID = 4") == [('Auditorium',)]
+
+
+@pytest.mark.mysql
+def test_edit_review_saves_slot_and_panel(db, login):
+    client = login('admin')
+    edit_review(client, date='2025-05-22', start_time='14:30', venue='Room C-1', panel_faculty_ids='102')
+
+    assert flashes(client) == [('success', "Review 4 updated successfully.")]
+    row = query(db, "SELECT Date, Start_Time, Venue FROM Review WHERE Review_ID = 4")[0]
+    assert (str(row[0]), str(row[1]), row[2]) == ('2025-05-22', '14:30:00', 'Room C-1')
+    # the mentor (101) stays on the panel
+    assert sorted(query(db, "SELECT Faculty_ID FROM Review_Panel WHERE Review_ID = 4")) == [(101,), (102,)]
+
+
+@pytest.mark.mysql
+def test_edit_review_without_time_skips_conflicts(db, login):
+    client = login('admin')
+    edit_review(client, review_id='5', date='2025-05-20', start_time='', venue='Auditorium',
+                panel_faculty_ids='102,103')
+
+    assert flashes(client) == [('success', "Review 5 updated successfully.")]
+    assert query(db, "SELECT Start_Time FROM Review WHERE Review_ID = 5") == [(None,)]
+
+
+@pytest.mark.mysql
+def test_schedule_review_adds_review_and_panel(db, login):
+    client = login('admin')
+    client.post('/admin/schedule_review', data={'team_id': '2', 'review_type_id': '2', 'date': '2031-03-03',
+                                                 'start_time': '11:00', 'venue': 'Room Z', 'panel_faculty_ids': '103'})
+
+    assert flashes(client) == [('success', "Review scheduled successfully for Team 2.")]
+    [(review_id,)] = query(db, "SELECT Review_ID FROM Review WHERE Team_ID = 2 AND Date = '2031-03-03'")
+    # the mentor (102) joins the panel
+    assert sorted(query(db, "SELECT Faculty_ID FROM Review_Panel WHERE Review_ID = %s", (review_id,))) == [
+        (102,), (103,)]
@@ -0,0 +1,50 @@
+"""The data rules db.sql enforces with triggers (re-stated by the memory backend)."""
+import pytest
+
+from conftest import capstone
+
+
+def execute(conn, sql, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.lastrowid
+    finally:
+        cursor.close()
+
+
+def test_team_takes_at_most_four_members(db):
+    for n in (7, 8, 9):
+        execute(db, "INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, 7)",
+                ('PES1UG21CS00%d' % n, 'Student %d' % n, 's%d@univ.edu' % n))
+    execute(db, "INSERT INTO Team_Student (Team_ID, SRN) VALUES (1, 'PES1UG21CS007')")
+    execute(db, "INSERT INTO Team_Student (Team_ID, SRN) VALUES (1, 'PES1UG21CS008')")
+
+    with pytest.raises(capstone.Error, match='more than 4 members'):
+        execute(db, "INSERT INTO Team_Student (Team_ID, SRN) VALUES (1, 'PES1UG21CS009')")
+
+
+def test_panel_needs_the_mentor_first(db):
+    review_id = execute(db, "INSERT INTO Review (ReviewType_ID, Team_ID, Date, Venue) VALUES (2, 1, '2025-04-01', 'Room B-1')")
+
+    with pytest.raises(capstone.Error, match='mentor must be included'):
+        execute(db, "INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, 102)", (review_id,))
+
+    execute(db, "INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, 101)", (review_id,))
+    execute(db, "INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, 102)", (review_id,))
+
+
+def test_panel_of_unmentored_team_is_free(db):
+    review_id = execute(db, "INSERT INTO Review (ReviewType_ID, Team_ID, Date, Venue) VALUES (2, 4, '2025-04-01', 'Room B-1')")
+    execute(db, "INSERT INTO Review_Panel (Review_ID, Faculty_ID) VALUES (%s, 102)", (review_id,))
+
+
+@pytest.mark.parametrize('marks, allowed', [(5.0, True), (5.5, False)])
+def test_marks_capped_by_rubric(db, marks, allowed):
+    insert = """INSERT INTO Evaluation (Faculty_ID, SRN, Rubric_ID, Project_ID, Review_ID, Marks)
+                VALUES (101, 'PES1UG21CS001', 3, 1, 4, %s)"""  # Presentation: Max_Marks 5.0
+    if allowed:
+        execute(db, insert, (marks,))
+    else:
+        with pytest.raises(capstone.Error, match='exceed maximum'):
+            execute(db, insert, (marks,))
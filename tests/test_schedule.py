@@ -0,0 +1,145 @@
+"""Scheduling conflict detection: the interval tree, the schedule index and
+the booking routes."""
+import random
+from datetime import datetime, timedelta
+
+from conftest import capstone, flashes, query
+
+TOMORROW = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+MENTOR_101 = capstone.ScheduleIndex.keys_for([101])
+
+
+def execute(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    cursor.close()
+    conn.commit()
+
+
+def booked(index, keys, start):
+    return {ref for _, ref in index.conflicts(keys, start, start + timedelta(minutes=30))}
+
+
+def test_interval_index_matches_a_linear_scan():
+    rng = random.Random(7)
+    index, intervals = capstone.IntervalIndex(), {}
+    for ref in range(300):
+        start = rng.randrange(1000)
+        intervals[ref] = (start, start + rng.randrange(1, 60))
+        index.add(*intervals[ref], ref)
+    for ref in rng.sample(sorted(intervals), 100):
+        index.remove(ref)
+        del intervals[ref]
+
+    assert len(index) == 200
+    for _ in range(200):
+        start = rng.randrange(1100)
+        end = start + rng.randrange(1, 80)
+        expected = {ref for ref, (s, e) in intervals.items() if s < end and start < e}
+        assert set(index.overlapping(start, end)) == expected
+
+
+def test_interval_index_is_half_open():
+    index = capstone.IntervalIndex()
+    index.add(10, 20, 'a')
+    index.add(10, 15, 'b')  # same start
+
+    assert sorted(index.overlapping(19, 30)) == ['a']
+    assert index.overlapping(20, 30) == [] and index.overlapping(0, 10) == []
+    index.add(25, 30, 'a')  # re-adding moves it
+    assert sorted(index.overlapping(12, 21)) == ['b']
+
+
+def test_schedule_index_conflicts_per_resource(db):
+    index = capstone.ScheduleIndex()
+    ten = TOMORROW.replace(hour=10)
+    index.book(('review', 80), capstone.ScheduleIndex.keys_for(['101', '102'], 1, ' Room A '), ten, ten + timedelta(hours=1))
+
+    room_a = capstone.ScheduleIndex.keys_for([], 4, 'room a')
+    assert index.conflicts(room_a, ten + timedelta(minutes=30), ten + timedelta(hours=2)) == [(('venue', 'room a'), ('review', 80))]
+    assert index.conflicts(capstone.ScheduleIndex.keys_for(['103'], 4, 'Room B'), ten, ten + timedelta(hours=1)) == []
+    assert index.conflicts(MENTOR_101, ten, ten + timedelta(hours=1), ignore=('review', 80)) == []
+
+    index.cancel(('review', 80))
+    assert index.conflicts(room_a, ten, ten + timedelta(hours=1)) == []
+
+
+def test_free_slots_skip_bookings(db):
+    index = capstone.ScheduleIndex()
+    nine = TOMORROW.replace(hour=capstone.SCHEDULE_DAY_START)
+    index.book(('meeting', 81), MENTOR_101, nine, nine + timedelta(hours=1))
+
+    slots = index.free_slots(MENTOR_101, TOMORROW.date(), timedelta(minutes=30), count=2)
+    assert slots == [nine + timedelta(hours=1), nine + timedelta(hours=1, minutes=30)]
+
+
+def schedule_review(client, start):
+    return client.post('/admin/schedule_review', data={
+        'team_id': '1', 'review_type_id': '2', 'date': start.strftime('%Y-%m-%d'),
+        'start_time': start.strftime('%H:%M'), 'venue': 'Room A', 'panel_faculty_ids': '102'})
+
+
+def test_schedule_review_refuses_a_booked_mentor(db, login):
+    ten = TOMORROW.replace(hour=10)
+    execute(db, "INSERT INTO Meeting (Meeting_ID, Faculty_ID, Team_ID, DateTime) VALUES (93, 101, 1, %s)", (ten,))
+    client = login('admin')
+
+    schedule_review(client, ten + timedelta(minutes=15))
+
+    [(category, message)] = flashes(client)
+    assert category == 'warning' and message.startswith(
+        "Scheduling conflict: Faculty 101 is booked (meeting 93); Team 1 is booked (meeting 93).")
+    assert query(db, "SELECT COUNT(*) FROM Review WHERE Date = %s", (TOMORROW.date(),)) == [(0,)]
+
+
+def test_booking_missed_by_the_index_is_refused_in_the_transaction(db, login):
+    ten = TOMORROW.replace(hour=10)
+    capstone.schedule_index.conflicts(MENTOR_101, ten, ten)  # loaded before the meeting below
+    execute(db, "INSERT INTO Meeting (Meeting_ID, Faculty_ID, Team_ID, DateTime) VALUES (94, 101, 1, %s)", (ten,))
+    client = login('faculty')
+
+    client.post('/faculty/schedule_meeting', data={'faculty_id': '101', 'team_id': '1',
+                                                   'datetime': (ten + timedelta(minutes=15)).strftime('%Y-%m-%dT%H:%M')})
+
+    [(category, message)] = flashes(client)
+    assert category == 'warning' and 'Faculty 101 is booked (meeting 94)' in message
+    assert query(db, "SELECT Meeting_ID FROM Meeting WHERE DateTime >= %s", (TOMORROW,)) == [(94,)]
+
+
+def test_other_workers_changes_are_loaded_as_deltas(db):
+    index = capstone.ScheduleIndex()
+    ten = TOMORROW.replace(hour=10)
+    assert booked(index, MENTOR_101, ten) == set()
+    loaded_at = index._loaded_at
+
+    execute(db, "INSERT INTO Meeting (Meeting_ID, Faculty_ID, Team_ID, DateTime) VALUES (90, 101, 1, %s)", (ten,))
+    capstone.shared_cache.invalidate('schedule')  # what the writing worker publishes
+    assert booked(index, MENTOR_101, ten) == {('meeting', 90)}
+
+    execute(db, "DELETE FROM Meeting WHERE Meeting_ID = 90")
+    capstone.shared_cache.invalidate('schedule')
+    assert booked(index, MENTOR_101, ten) == set()
+    assert index._loaded_at == loaded_at  # no full rebuild
+
+
+def test_own_bump_is_not_stale(db):
+    index = capstone.ScheduleIndex()
+    ten = TOMORROW.replace(hour=10)
+    with capstone.app.test_request_context('/', method='POST'):
+        index.book(('meeting', 91), MENTOR_101, ten, ten + timedelta(minutes=30))
+        capstone.shared_cache.invalidate('schedule')
+        index.published(capstone.cache_bus.version('schedule'))
+
+    # not in the database, so any reload would drop it
+    assert booked(index, MENTOR_101, ten) == {('meeting', 91)}
+
+
+def test_bump_from_a_request_that_left_the_index_alone_reloads(db):
+    index = capstone.ScheduleIndex()
+    ten = TOMORROW.replace(hour=10)
+    index.book(('meeting', 92), MENTOR_101, ten, ten + timedelta(minutes=30))
+    with capstone.app.test_request_context('/', method='POST'):
+        capstone.shared_cache.invalidate('schedule')
+        index.published(capstone.cache_bus.version('schedule'))
+
+    assert booked(index, MENTOR_101, ten) == set()
@@ -0,0 +1,32 @@
+"""/admin/search (FULLTEXT, so MySQL only)."""
+import pytest
+
+from conftest import capstone
+
+
+def search(client, **args):
+    response = client.get('/admin/search', query_string=args)
+    return response.status_code, response.get_json()
+
+
+@pytest.mark.mysql
+def test_digits_find_faculty_by_id(db, login):
+    code, body = search(login('admin'), q='101')
+
+    assert code == 200
+    assert body['results'][0]['Kind'] == 'faculty' and body['results'][0]['Ref'] == 101
+
+
+@pytest.mark.mysql
+def test_words_do_not_match_faculty_ids(db, login):
+    code, body = search(login('admin'), q='Ramesh', type='faculty')
+
+    assert code == 200
+    assert [(row['Kind'], row['Ref']) for row in body['results']] == [('faculty', 101)]
+    assert body['results'][0]['Score'] < capstone.SEARCH_IDENTIFIER_SCORE
+
+
+def test_empty_query_returns_nothing(db, login):
+    code, body = search(login('admin'), q='  ')
+
+    assert code == 200 and body['results'] == []
@@ -0,0 +1,49 @@
+"""Team membership flows (stored routines, so MySQL only)."""
+import pytest
+
+from conftest import flashes, query
+
+
+def add_students(db, *numbers):
+    cursor = db.cursor()
+    cursor.executemany("INSERT INTO Student (SRN, Name, Email, Sem) VALUES (%s, %s, %s, 7)",
+                       [('PES1UG21CS%03d' % n, 'Student %d' % n, 's%d@univ.edu' % n) for n in numbers])
+    cursor.close()
+    db.commit()
+
+
+@pytest.mark.mysql
+def test_add_member_to_full_team(db, login):
+    add_students(db, 7, 8, 9)
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO Team_Student (Team_ID, SRN) VALUES (2, 'PES1UG21CS007'), (2, 'PES1UG21CS008')")
+    cursor.close()
+    db.commit()
+    client = login('admin')
+
+    client.post('/admin_add_team_member', data={'team_id': '2', 'srn': 'PES1UG21CS009'})
+
+    assert flashes(client) == [('warning', "Team 2 already has 4 members. Cannot add more.")]
+    assert query(db, "SELECT COUNT(*) FROM Team_Student WHERE Team_ID = 2") == [(4,)]
+
+
+@pytest.mark.mysql
+def test_student_in_team_without_teammate_is_told(db, login):
+    client = login('student')  # PES1UG21CS001, Team 1
+
+    client.post('/student/add_teammate', data={'srn': 'PES1UG21CS001', 'teammate_srn': ''})
+
+    assert flashes(client) == [('info', "You are already in Team 1. Enter a teammate's SRN to add them.")]
+
+
+@pytest.mark.mysql
+def test_create_team_counts_repeated_srns_once(db, login):
+    add_students(db, 11, 12, 13, 14)
+    client = login('admin')
+    srns = ['PES1UG21CS011', 'PES1UG21CS012', 'PES1UG21CS013', 'PES1UG21CS014', 'PES1UG21CS011']
+
+    client.post('/admin_add_team', data={'student_srns': srns})
+
+    category, message = flashes(client)[0]
+    assert category == 'success' and message.endswith('with 4 member(s).')
+    assert query(db, "SELECT COUNT(*) FROM Team_Student WHERE SRN IN (%s, %s, %s, %s)", tuple(srns[:4])) == [(4,)]
@@ -0,0 +1,57 @@
+"""Faculty grading workspace: initial load and delta sync."""
+from conftest import query
+
+
+def sync(client, watermark):
+    response = client.get('/faculty/workspace/sync', query_string=watermark)
+    return response.status_code, response.get_json()
+
+
+def test_sync_returns_changes_and_deletions(db, login):
+    client = login('faculty')  # faculty 101
+    start = client.get('/faculty/workspace').get_json()
+    assert {review['Review_ID'] for review in start['reviews']} == {1, 3, 4}
+
+    cursor = db.cursor()
+    cursor.execute("UPDATE Evaluation SET Marks = 7.0 WHERE Faculty_ID = 101 AND SRN = 'PES1UG21CS001'")
+    cursor.execute("SELECT Evaluation_ID FROM Evaluation WHERE Faculty_ID = 101 AND SRN = 'PES1UG21CS002'")
+    deleted_id = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM Evaluation WHERE Evaluation_ID = %s", (deleted_id,))
+    cursor.close()
+    db.commit()
+
+    code, body = sync(client, start['watermark'])
+
+    assert code == 200 and not body['reset']
+    changed = {row['SRN']: row for row in body['evaluations']}
+    assert float(changed['PES1UG21CS001']['Marks']) == 7.0
+    assert 'PES1UG21CS002' not in changed
+    assert deleted_id in body['deleted']
+    assert sorted(body['review_ids']) == [1, 3, 4]
+    assert set(query(db, "SELECT Faculty_ID FROM Evaluation_Tombstone")) == {(101,)}
+
+
+def test_sync_only_sends_own_evaluations(db, login):
+    client = login('faculty')
+    code, body = sync(client, client.get('/faculty/workspace').get_json()['watermark'])
+
+    assert code == 200
+    assert {row['SRN'] for row in body['evaluations']} <= {'PES1UG21CS001', 'PES1UG21CS002'}
+
+
+def test_old_watermark_asks_for_reload(db, login):
+    code, body = sync(login('faculty'), {'since': '2000-01-01 00:00:00', 'after_id': 0})
+
+    assert code == 200 and body == {'reset': True}
+
+
+def test_sync_validates_watermark(db, login):
+    code, body = sync(login('faculty'), {'since': 'yesterday'})
+
+    assert code == 400 and 'since' in body['error']
+
+
+def test_sync_is_faculty_only(db, login):
+    code, _ = sync(login('student'), {'since': '2025-01-01 00:00:00'})
+
+    assert code == 403